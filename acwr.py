@@ -0,0 +1,219 @@
+# ========== AKUT:KRÓNIKUS TERHELÉS (ACWR / EWMA) ==========
+# Napi terhelés játékosonként a "Kezdési idő" alapján, majd a teljes kereten egyszerre
+# (nap × (játékos, mutató) széles tábla): 7 napos akut és 28 napos krónikus gördülő
+# átlag, valamint EWMA (λ = 2 / (N + 1)) és a kettő aránya. A szezon tárban tartott
+# állapotból (utolsó 27 nap + EWMA értékek) egy új hét csak a saját napjait számolja.
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from arrow_store import load_workbooks
+from ingest_cache import write_parquet
+from season_store import season_path, season_workbooks
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+TIME_COL = "Kezdési idő"
+# Terhelés jellegű mutatók (a tár egységes, schema szerinti neveivel)
+LOAD_METRICS = ["Edzésterhelés", "Izomterhelés", "Teljes táv [m]", "Táv zóna 4 [m]", "Táv zóna 5 [m]"]
+# Az irodalomban "biztonságos" ACWR sáv
+SWEET_SPOT = (0.8, 1.3)
+
+DATE = "Dátum"
+PLAYER = "Játékos"
+METRIC = "Mutató"
+LOAD = "Terhelés"
+RATIO = "ACWR"
+EWMA_RATIO = "EWMA ACWR"
+RESULT_COLUMNS = [LOAD, "Akut", "Krónikus", RATIO, "EWMA akut", "EWMA krónikus", EWMA_RATIO]
+
+_STATE_VERSION = 1
+_lock = threading.Lock()
+
+
+def load_metrics(columns):
+    return [metric for metric in LOAD_METRICS if metric in columns]
+
+
+def daily_loads(df, player_col, metrics):
+    # Nap × (játékos, mutató) tábla folytonos napi indexszel; foglalkozás nélküli nap = 0
+    days = pd.to_datetime(df[TIME_COL], errors="coerce").dt.normalize()
+    data = df[metrics].apply(pd.to_numeric, errors="coerce").astype(np.float64).assign(**{DATE: days, PLAYER: df[player_col]})
+    data = data.dropna(subset=[DATE, PLAYER])
+    if data.empty:
+        return pd.DataFrame(columns=pd.MultiIndex.from_arrays([[], []], names=[PLAYER, METRIC]), dtype=np.float64)
+    data[PLAYER] = data[PLAYER].astype(str)
+    wide = data.groupby([DATE, PLAYER])[metrics].sum().unstack(PLAYER)
+    wide.columns = wide.columns.swaplevel().set_names([PLAYER, METRIC])
+    days = pd.date_range(wide.index.min(), wide.index.max(), freq="D", name=DATE)
+    return wide.sort_index(axis=1).reindex(days).fillna(0.0)
+
+
+def _ewma(frame, days, seed=None):
+    # adjust=False rekurzió: y_t = λ·x_t + (1 − λ)·y_{t−1}; a seed az előző nap EWMA értéke
+    alpha = 2 / (days + 1)
+    if seed is None:
+        return frame.ewm(alpha=alpha, adjust=False).mean()
+    seeded = pd.concat([seed.reindex(frame.columns).fillna(0.0).to_frame().T, frame])
+    return seeded.ewm(alpha=alpha, adjust=False).mean().iloc[1:]
+
+
+def compute(daily, state=None):
+    # Visszaadja a napi eredményeket (név → széles tábla) és az új állapotot.
+    # state: {"tail": utolsó CHRONIC_DAYS − 1 nap terhelése, "ewma_acute", "ewma_chronic", "last_date"}
+    if state is None:
+        full = daily
+        new_days = daily.index
+        seeds = (None, None)
+    else:
+        columns = state["tail"].columns.union(daily.columns)
+        start = state["tail"].index.min() if len(state["tail"]) else daily.index.min()
+        days = pd.date_range(start, daily.index.max(), freq="D", name=DATE)
+        full = pd.concat([state["tail"], daily]).reindex(index=days, columns=columns).fillna(0.0)
+        new_days = days[days > state["last_date"]]
+        seeds = (state["ewma_acute"], state["ewma_chronic"])
+
+    acute = full.rolling(ACUTE_DAYS, min_periods=ACUTE_DAYS).mean().loc[new_days]
+    chronic = full.rolling(CHRONIC_DAYS, min_periods=CHRONIC_DAYS).mean().loc[new_days]
+    loads = full.loc[new_days]
+    ewma_acute = _ewma(loads, ACUTE_DAYS, seeds[0])
+    ewma_chronic = _ewma(loads, CHRONIC_DAYS, seeds[1])
+
+    # 0 krónikus terhelésnél (még nem edzett játékos) nincs arány; az EWMA arány csak
+    # teljes krónikus ablak után értelmes, addig a kis nevező miatt félrevezető
+    results = {
+        LOAD: loads,
+        "Akut": acute,
+        "Krónikus": chronic,
+        RATIO: acute / chronic.where(chronic > 0),
+        "EWMA akut": ewma_acute,
+        "EWMA krónikus": ewma_chronic,
+        EWMA_RATIO: (ewma_acute / ewma_chronic.where(ewma_chronic > 0)).where(chronic.notna()),
+    }
+    new_state = {
+        "tail": full.iloc[-(CHRONIC_DAYS - 1):],
+        "ewma_acute": ewma_acute.iloc[-1],
+        "ewma_chronic": ewma_chronic.iloc[-1],
+        "last_date": full.index.max(),
+    }
+    return results, new_state
+
+
+def to_long(results):
+    # Széles eredménytáblák → Dátum, Játékos, Mutató, <eredmény oszlopok> (egy lépésben, NumPy-jal)
+    first = results[LOAD]
+    columns = first.columns
+    long = pd.DataFrame({
+        DATE: np.repeat(first.index.to_numpy(), len(columns)),
+        PLAYER: np.tile(columns.get_level_values(PLAYER).to_numpy(), len(first)),
+        METRIC: np.tile(columns.get_level_values(METRIC).to_numpy(), len(first)),
+    })
+    for name in RESULT_COLUMNS:
+        long[name] = results[name].reindex(columns=columns).to_numpy().ravel()
+    return long
+
+
+# ---------- állapot a szezon tárban ----------
+
+def _paths(season):
+    return {
+        "meta": season_path(season, "acwr_meta.json"),
+        "result": season_path(season, "acwr_eredmeny.parquet"),
+        "tail": season_path(season, "acwr_tail.parquet"),
+        "ewma": season_path(season, "acwr_ewma.parquet"),
+    }
+
+
+def _read_meta(paths):
+    try:
+        with open(paths["meta"], encoding="utf-8") as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == _STATE_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def _read_state(paths, meta):
+    tail = pd.read_parquet(paths["tail"])
+    tail = tail.set_index([DATE, PLAYER, METRIC])[LOAD].unstack([PLAYER, METRIC]).sort_index(axis=1)
+    ewma = pd.read_parquet(paths["ewma"]).set_index([PLAYER, METRIC])
+    return {
+        "tail": tail,
+        "ewma_acute": ewma["EWMA akut"],
+        "ewma_chronic": ewma["EWMA krónikus"],
+        "last_date": pd.Timestamp(meta["last_date"]),
+    }
+
+
+def _write_state(paths, meta, state, result):
+    tail = state["tail"]
+    tail_long = pd.DataFrame({
+        DATE: np.repeat(tail.index.to_numpy(), len(tail.columns)),
+        PLAYER: np.tile(tail.columns.get_level_values(PLAYER).to_numpy(), len(tail)),
+        METRIC: np.tile(tail.columns.get_level_values(METRIC).to_numpy(), len(tail)),
+        LOAD: tail.to_numpy().ravel(),
+    })
+    ewma = pd.DataFrame({"EWMA akut": state["ewma_acute"], "EWMA krónikus": state["ewma_chronic"]})
+    ewma.index = ewma.index.set_names([PLAYER, METRIC])
+    ok = (write_parquet(result, paths["result"])
+          and write_parquet(tail_long, paths["tail"])
+          and write_parquet(ewma.reset_index(), paths["ewma"]))
+    if not ok:
+        return
+    # A meta a "véglegesítés": csak a táblák sikeres kiírása után kerül lemezre
+    meta = dict(meta, version=_STATE_VERSION, last_date=state["last_date"].isoformat())
+    tmp_path = paths["meta"] + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, paths["meta"])
+
+
+def update_season(season, player_col):
+    # A szezon ACWR/EWMA eredménye hosszú formában. Ha csak új (későbbi) hetek jöttek,
+    # a tárolt állapotból folytatjuk; különben (új mutató, korábbi dátum) teljes újraszámolás.
+    with _lock:
+        hashes = [workbook["hash"] for workbook in season_workbooks(season)]
+        paths = _paths(season)
+        meta = _read_meta(paths)
+        columns = [player_col, TIME_COL] + LOAD_METRICS
+
+        if meta and meta["player_col"] == player_col and set(meta["workbooks"]) <= set(hashes):
+            new = [file_hash for file_hash in hashes if file_hash not in meta["workbooks"]]
+            if not new:
+                return pd.read_parquet(paths["result"])
+            df = load_workbooks(season, new, columns)
+            if {player_col, TIME_COL} <= set(df.columns) and set(load_metrics(df.columns)) <= set(meta["metrics"]):
+                daily = daily_loads(df.reindex(columns=columns[:2] + meta["metrics"]), player_col, meta["metrics"])
+                state = _read_state(paths, meta)
+                # A meta a véglegesítés: ha az állapot már továbbhaladt (félbeszakadt írás), teljes újraszámolás
+                consistent = state["tail"].empty or state["tail"].index.max() <= state["last_date"]
+                if consistent and (daily.empty or daily.index.min() > state["last_date"]):
+                    # Egy félbeszakadt korábbi frissítés sorai nem duplázódhatnak
+                    result = pd.read_parquet(paths["result"])
+                    result = result[result[DATE] <= state["last_date"]]
+                    if not daily.empty:
+                        results, state = compute(daily, state)
+                        result = pd.concat([result, to_long(results)], ignore_index=True)
+                    _write_state(paths, dict(meta, workbooks=hashes), state, result)
+                    return result
+
+        df = load_workbooks(season, hashes, columns)
+        metrics = load_metrics(df.columns)
+        if not metrics or not {player_col, TIME_COL} <= set(df.columns):
+            return pd.DataFrame(columns=[DATE, PLAYER, METRIC] + RESULT_COLUMNS)
+        daily = daily_loads(df, player_col, metrics)
+        if daily.empty:
+            return pd.DataFrame(columns=[DATE, PLAYER, METRIC] + RESULT_COLUMNS)
+        results, state = compute(daily)
+        result = to_long(results)
+        _write_state(paths, {"player_col": player_col, "metrics": metrics, "workbooks": hashes}, state, result)
+        return result
+
+
+def latest(result):
+    # Játékosonként és mutatónként az utolsó nap értékei
+    return result[result[DATE] == result[DATE].max()]
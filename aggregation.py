@@ -0,0 +1,98 @@
+# ========== AGGREGÁCIÓS KOCKA ==========
+# Adathalmazonként egyszer felépített játékos × hét × típus × mutató kocka (összeg,
+# darabszám, maximum). A szűrők a kocka szeletelésével válaszolhatók meg, így a
+# diagramoknak nem kell minden újrafutáskor a sorszintű táblát végigolvasni.
+
+import numpy as np
+import pandas as pd
+
+from arrow_store import batches
+
+PLAYER_COL = "Játékos neve"
+WEEK_COL = "Hét"
+TYPE_COL = "Típus"
+
+
+def tag_weeks(data, source_col="Forrás"):
+    # Hét = lapnév; a "meccs" szót tartalmazó lapok meccsek, a többi edzés
+    data[WEEK_COL] = data[source_col]
+    data[TYPE_COL] = np.where(data[source_col].astype(str).str.lower().str.contains("meccs"), "Meccs", "Edzés")
+    return data
+
+
+def build_cube(df, metrics, player_col=PLAYER_COL, week_col=WEEK_COL, type_col=TYPE_COL):
+    # A kocka szintjei mindig az egységes neveket kapják (v14: Név/Forrás, típus nélkül)
+    sources = {player_col: PLAYER_COL, week_col: WEEK_COL, type_col: TYPE_COL}
+    keys = [col for col in sources if col in df.columns]
+    grouped = df.groupby(keys, dropna=False, observed=True, sort=False)[list(metrics)]
+    # Oszlopok: (statisztika, mutató); a csoportosítás egyszer készül el, a három aggregáció azon fut
+    cube = pd.concat({"sum": grouped.sum(), "count": grouped.count(), "max": grouped.max()}, axis=1)
+    cube.index = cube.index.set_names([sources[col] for col in keys])
+    return cube
+
+
+def store_cube(seasons, metrics, player_col=PLAYER_COL, source_col="Forrás", **filters):
+    # A build_cube(tag_weeks(...)) megfelelője közvetlenül az Arrow tárból: munkafüzetenként épül
+    # egy részkocka, ezek összegződnek – egyszerre csak egy munkafüzet sorai vannak a memóriában.
+    # filters: mint az arrow_store.scan-nél (hetek, lapok, típus, játékosok)
+    columns = [player_col, source_col, *metrics]
+    parts = [build_cube(tag_weeks(batch.to_pandas().reindex(columns=columns), source_col), metrics, player_col)
+             for batch in batches(seasons, columns=columns, player_col=player_col, **filters) if batch.num_rows]
+    if not parts:
+        return build_cube(tag_weeks(pd.DataFrame(columns=columns, dtype=np.float64), source_col), metrics, player_col)
+    combined = pd.concat(parts) if len(parts) > 1 else parts[0]
+    if combined.index.is_unique:
+        # Munkafüzetenként eltérő lapnevek: a részkockák nem fednek át, nincs mit összevonni
+        return combined
+    del parts
+    grouped = combined.groupby(level=[PLAYER_COL, WEEK_COL, TYPE_COL], dropna=False, observed=True, sort=False)
+    totals, maxima = grouped.sum(), grouped.max()
+    return pd.concat({"sum": totals["sum"], "count": totals["count"], "max": maxima["max"]}, axis=1)
+
+
+def slice_cube(cube, weeks=None, tipus=None, players=None):
+    mask = np.ones(len(cube), dtype=bool)
+    if weeks is not None:
+        mask &= np.asarray(cube.index.get_level_values(WEEK_COL).isin(weeks))
+    if tipus is not None and TYPE_COL in cube.index.names:
+        mask &= np.asarray(cube.index.get_level_values(TYPE_COL) == tipus)
+    if players is not None:
+        mask &= np.asarray(cube.index.get_level_values(PLAYER_COL).isin(players))
+    return cube[mask]
+
+
+def _means(grouped_sums):
+    return grouped_sums["sum"] / grouped_sums["count"]
+
+
+def player_means(cube):
+    # Játékos × mutató táblázat; a név nélküli sorok kimaradnak
+    return _means(cube.groupby(level=PLAYER_COL, observed=True).sum())
+
+
+def team_means(cube):
+    return cube["sum"].sum() / cube["count"].sum()
+
+
+def max_values(cube):
+    return cube["max"].max()
+
+
+def weekly_means(cube, metric=None, sort=True):
+    # Hét × mutató (csapat) átlagok, vagy egy mutatóra hét × játékos pivot.
+    # sort=False esetén a hetek a betöltés sorrendjében maradnak (v14)
+    if metric is None:
+        result = _means(cube.groupby(level=WEEK_COL, observed=True).sum())
+    else:
+        per_player = cube.xs(metric, axis=1, level=1).groupby(level=[WEEK_COL, PLAYER_COL], observed=True).sum()
+        pivot = (per_player["sum"] / per_player["count"]).unstack(PLAYER_COL).sort_index(axis=1)
+        # A pivot_table-hez hasonlóan a teljesen üres sorok/oszlopok kimaradnak
+        result = pivot.dropna(how="all").dropna(how="all", axis=1)
+    if sort:
+        return result.sort_index()
+    weeks = cube.index.get_level_values(WEEK_COL).unique()
+    result = result.reindex(weeks[weeks.isin(result.index)])
+    if metric is not None:
+        players = cube.index.get_level_values(PLAYER_COL).unique()
+        result = result.reindex(columns=players[players.isin(result.columns)])
+    return result
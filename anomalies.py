@@ -0,0 +1,332 @@
+# ========== TERHELÉSI ANOMÁLIÁK ==========
+# Játékos × foglalkozás × mutató értékek a teljes kereten egyszerre (foglalkozás × (játékos,
+# mutató) széles tábla). Minden foglalkozás értékét a játékos előző BASELINE_SESSIONS azonos
+# típusú (edzés / meccs) foglalkozásához mérjük: z-érték (átlag, szórás) és robusztus z-érték
+# (medián, MAD). A heti (munkafüzetenkénti) értéket az előző hetéhez: százalékos változás.
+# A hetek sorrendje naptári (a munkafüzet első foglalkozása szerint), nem a feltöltésé.
+# A pontszámok a szezon tárban tárolódnak; egy új hét csak a saját foglalkozásait számolja
+# (típusonként az előző BASELINE_SESSIONS foglalkozás és az utolsó heti érték az állapot),
+# ha a tárolt hetek után következik – utólag feltöltött korábbi hétnél teljes újraszámolás.
+# A küszöbök csak a megjelenítéskor szűrnek, így állíthatók újraszámolás nélkül.
+
+import json
+import os
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from acwr import METRIC, PLAYER, TIME_COL
+from arrow_store import load_workbooks
+from ingest_cache import write_parquet
+from schema import metric_columns
+from season_store import season_path, season_workbooks
+
+BASELINE_SESSIONS = 30
+MIN_BASELINE = 8
+Z_LIMIT = 3.0
+MAD_LIMIT = 3.5
+SPIKE_PCT = 30.0
+# Intenzitás jellegű mutatók: hetente a foglalkozások átlaga, a többinél a heti összeg
+INTENSITY_METRICS = {"Táv/perc [m/min]", "Max sebesség [km/h]", "Átlagos pulzus [bpm]", "HRV (RMSSD)"}
+# A MAD → szórás átváltás normális eloszlásnál
+MAD_SCALE = 0.6745
+BLOCK_ROWS = 64
+
+WEEK_NO = "Hét sorszám"
+WEEK = "Hét"
+SESSION = "Foglalkozás"
+DATE = "Dátum"
+VALUE = "Érték"
+BASELINE = "Viszonyítás"
+Z = "Z"
+ROBUST_Z = "Robusztus Z"
+CHANGE = "Változás %"
+KIND = "Jelzés"
+SEVERITY = "Súlyosság"
+OUTLIER = "Kiugró érték"
+SPIKE = "Heti ugrás"
+SCORE_COLUMNS = [WEEK_NO, WEEK, SESSION, DATE, PLAYER, METRIC, VALUE, BASELINE, Z, ROBUST_Z]
+WEEKLY_COLUMNS = [WEEK_NO, WEEK, PLAYER, METRIC, VALUE, BASELINE, CHANGE]
+ALERT_COLUMNS = [KIND, SEVERITY, WEEK, SESSION, DATE, PLAYER, METRIC, VALUE, BASELINE, Z, ROBUST_Z, CHANGE]
+NUMERIC_COLUMNS = [SEVERITY, VALUE, BASELINE, Z, ROBUST_Z, CHANGE]
+
+_STATE_VERSION = 2
+_lock = threading.Lock()
+
+
+def session_table(df, player_col, metrics):
+    # Foglalkozás ((hét sorszám, lapnév), időrendben) × (játékos, mutató) széles tábla + hét nevek, dátumok
+    data = df[metrics].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    data[PLAYER] = df[player_col].astype(str)
+    data[WEEK_NO] = df[WEEK_NO].to_numpy()
+    data[SESSION] = df["Forrás"].astype(str)
+    data = data[df[player_col].notna().to_numpy()]
+    keys = [WEEK_NO, SESSION]
+    wide = data.groupby(keys + [PLAYER], sort=False)[metrics].sum(min_count=1).unstack(PLAYER)
+    wide.columns = wide.columns.swaplevel().set_names([PLAYER, METRIC])
+    dates = pd.to_datetime(df[TIME_COL], errors="coerce") if TIME_COL in df.columns else pd.Series(pd.NaT, index=df.index)
+    dates = dates[df[player_col].notna().to_numpy()].groupby([data[WEEK_NO], data[SESSION]], sort=False).min()
+    sessions = pd.DataFrame({DATE: dates.reindex(wide.index)})
+    sessions["_rend"] = np.arange(len(sessions))
+    order = sessions.sort_values([WEEK_NO, DATE, "_rend"], kind="stable").index
+    return wide.sort_index(axis=1).reindex(order), sessions.loc[order, DATE]
+
+
+def _window_scores(values, history):
+    # values: T × C új sorok; history: H × C előző sorok. Soronként az előző BASELINE_SESSIONS
+    # sor (a saját sor nélkül) adja az alapvonalat – blokkonként, NumPy-jal
+    stacked = np.vstack([history, values])
+    padded = np.vstack([np.full((BASELINE_SESSIONS, stacked.shape[1]), np.nan), stacked])
+    offset = BASELINE_SESSIONS + len(history)
+    mean, z, robust = (np.full(values.shape, np.nan) for _ in range(3))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for start in range(0, len(values), BLOCK_ROWS):
+            rows = np.arange(start, min(start + BLOCK_ROWS, len(values)))
+            # windows[i, c, k] = padded[offset + rows[i] − BASELINE_SESSIONS + k, c]
+            windows = np.stack([padded[offset + row - BASELINE_SESSIONS:offset + row] for row in rows]).transpose(0, 2, 1)
+            count = np.sum(~np.isnan(windows), axis=2)
+            enough = count >= MIN_BASELINE
+            block_mean = np.nanmean(windows, axis=2)
+            std = np.nanstd(windows, axis=2, ddof=1)
+            median = np.nanmedian(windows, axis=2)
+            mad = np.nanmedian(np.abs(windows - median[:, :, None]), axis=2)
+            x = values[rows]
+            mean[rows] = np.where(enough, block_mean, np.nan)
+            z[rows] = np.where(enough & (std > 0), (x - block_mean) / std, np.nan)
+            robust[rows] = np.where(enough & (mad > 0), MAD_SCALE * (x - median) / mad, np.nan)
+    return mean, z, robust
+
+
+def _is_match(index):
+    # A "meccs" szót tartalmazó lapok meccsek (mint az aggregációs kockában)
+    return np.asarray(index.get_level_values(SESSION).astype(str).str.lower().str.contains("meccs"), dtype=bool)
+
+
+def _scores(wide, tail):
+    # Edzések és meccsek külön alapvonallal – a meccsterhelés nem kiugrás az edzésekhez képest
+    values, history = wide.to_numpy(), tail.to_numpy()
+    match, history_match = _is_match(wide.index), _is_match(tail.index)
+    mean, z, robust = (np.full(values.shape, np.nan) for _ in range(3))
+    for kind in (False, True):
+        rows = match == kind
+        if rows.any():
+            mean[rows], z[rows], robust[rows] = _window_scores(values[rows], history[history_match == kind])
+    return mean, z, robust
+
+
+def _last_sessions(full):
+    # Típusonként az utolsó BASELINE_SESSIONS foglalkozás – a következő hét alapvonala
+    match = pd.Series(_is_match(full.index))
+    return full[match.groupby(match).cumcount(ascending=False).to_numpy() < BASELINE_SESSIONS]
+
+
+def _long(wide, columns, **tables):
+    # Széles táblák (azonos alak) → hosszú forma; csak a kitöltött értékű cellák maradnak
+    long = pd.DataFrame({
+        name: np.repeat(wide.index.get_level_values(name).to_numpy(), len(columns)) for name in wide.index.names
+    })
+    long[PLAYER] = np.tile(columns.get_level_values(PLAYER).to_numpy(), len(wide))
+    long[METRIC] = np.tile(columns.get_level_values(METRIC).to_numpy(), len(wide))
+    for name, table in tables.items():
+        long[name] = np.asarray(table).ravel()
+    return long[long[VALUE].notna()].reset_index(drop=True)
+
+
+def compute(wide, dates, weeks, state=None):
+    # wide: az új foglalkozások; weeks: hét sorszám → hét név. Visszaadja (pontszámok, heti, új állapot)
+    # state: {"tail": típusonként az utolsó BASELINE_SESSIONS foglalkozás (széles), "last_week": utolsó heti érték}
+    if state is not None:
+        columns = state["tail"].columns.union(wide.columns)
+        tail = state["tail"].reindex(columns=columns)
+        wide = wide.reindex(columns=columns)
+    else:
+        columns = wide.columns
+        tail = wide.iloc[:0]
+    mean, z, robust = _scores(wide, tail)
+    scores = _long(wide, columns, **{VALUE: wide.to_numpy(), BASELINE: mean, Z: z, ROBUST_Z: robust})
+    scores[WEEK] = scores[WEEK_NO].map(weeks)
+    scores[DATE] = scores.set_index([WEEK_NO, SESSION]).index.map(dates).to_numpy()
+
+    # Heti érték: terhelésnél összeg, intenzitásnál átlag; az előző hét az állapotból folytatódik
+    by_week = wide.groupby(level=WEEK_NO, sort=False)
+    intensity = columns.get_level_values(METRIC).isin(INTENSITY_METRICS)
+    weekly = by_week.sum(min_count=1)
+    weekly.loc[:, intensity] = by_week.mean().loc[:, intensity]
+    previous = weekly.shift(1)
+    if state is not None and len(weekly):
+        previous.iloc[0] = state["last_week"].reindex(columns).to_numpy()
+    change = 100 * (weekly - previous) / previous.where(previous > 0)
+    weekly_long = _long(weekly, columns, **{VALUE: weekly.to_numpy(), BASELINE: previous.to_numpy(),
+                                            CHANGE: change.to_numpy()})
+    weekly_long[WEEK] = weekly_long[WEEK_NO].map(weeks)
+
+    last_week = weekly.iloc[-1] if len(weekly) else state["last_week"].reindex(columns)
+    new_state = {"tail": _last_sessions(pd.concat([tail, wide])), "last_week": last_week}
+    return scores[SCORE_COLUMNS], weekly_long[WEEKLY_COLUMNS], new_state
+
+
+def alerts(scores, weekly, z_limit=Z_LIMIT, mad_limit=MAD_LIMIT, spike_pct=SPIKE_PCT, players=None, metrics=None):
+    # A küszöböt átlépő foglalkozások (|z| vagy |robusztus z|) és heti ugrások egy táblában,
+    # súlyosság (a küszöb hányszorosa) szerint csökkenő sorrendben
+    if players is not None:
+        scores, weekly = scores[scores[PLAYER].isin(players)], weekly[weekly[PLAYER].isin(players)]
+    if metrics is not None:
+        scores, weekly = scores[scores[METRIC].isin(metrics)], weekly[weekly[METRIC].isin(metrics)]
+    severity = np.fmax(scores[Z].abs() / z_limit, scores[ROBUST_Z].abs() / mad_limit)
+    outliers = scores[severity >= 1].assign(**{KIND: OUTLIER, SEVERITY: severity[severity >= 1]})
+    spikes = weekly[weekly[CHANGE] >= spike_pct]
+    spikes = spikes.assign(**{KIND: SPIKE, SEVERITY: spikes[CHANGE] / spike_pct})
+    frames = [frame for frame in (outliers, spikes) if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    result = pd.concat(frames, ignore_index=True).reindex(columns=ALERT_COLUMNS)
+    return result.sort_values(SEVERITY, ascending=False, kind="stable").reset_index(drop=True)
+
+
+# ---------- állapot a szezon tárban ----------
+
+def _paths(season):
+    return {
+        "meta": season_path(season, "anomalia_meta.json"),
+        "scores": season_path(season, "anomalia_pontok.parquet"),
+        "weekly": season_path(season, "anomalia_heti.parquet"),
+        "tail": season_path(season, "anomalia_tail.parquet"),
+        "last_week": season_path(season, "anomalia_utolso_het.parquet"),
+    }
+
+
+def _read_meta(paths):
+    try:
+        with open(paths["meta"], encoding="utf-8") as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == _STATE_VERSION and meta.get("baseline") == BASELINE_SESSIONS else None
+    except (OSError, ValueError):
+        return None
+
+
+def _read_state(paths):
+    tail = pd.read_parquet(paths["tail"])
+    tail = tail.set_index([WEEK_NO, SESSION, PLAYER, METRIC])[VALUE].unstack([PLAYER, METRIC])
+    order = pd.read_parquet(paths["tail"], columns=[WEEK_NO, SESSION]).drop_duplicates()
+    last_week = pd.read_parquet(paths["last_week"]).set_index([PLAYER, METRIC])[VALUE]
+    return {"tail": tail.reindex(pd.MultiIndex.from_frame(order)).sort_index(axis=1), "last_week": last_week}
+
+
+def _write_state(paths, meta, state, scores, weekly):
+    tail = state["tail"]
+    tail_long = pd.DataFrame({
+        WEEK_NO: np.repeat(tail.index.get_level_values(WEEK_NO).to_numpy(), len(tail.columns)),
+        SESSION: np.repeat(tail.index.get_level_values(SESSION).to_numpy(), len(tail.columns)),
+        PLAYER: np.tile(tail.columns.get_level_values(PLAYER).to_numpy(), len(tail)),
+        METRIC: np.tile(tail.columns.get_level_values(METRIC).to_numpy(), len(tail)),
+        VALUE: tail.to_numpy().ravel(),
+    })
+    last_week = state["last_week"].rename(VALUE).rename_axis([PLAYER, METRIC]).reset_index()
+    ok = (write_parquet(scores, paths["scores"])
+          and write_parquet(weekly, paths["weekly"])
+          and write_parquet(tail_long, paths["tail"])
+          and write_parquet(last_week, paths["last_week"]))
+    if not ok:
+        return
+    meta = dict(meta, version=_STATE_VERSION, baseline=BASELINE_SESSIONS)
+    tmp_path = paths["meta"] + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, paths["meta"])
+
+
+def _load(season, workbooks, player_col, metrics=None):
+    # Munkafüzetenként a sorok, az első és az utolsó foglalkozás időpontja (NaT, ha nincs kezdési idő)
+    columns = [player_col, TIME_COL, "Forrás"] + (metrics or [])
+    frames, starts, ends = [], [], []
+    for workbook in workbooks:
+        df = load_workbooks(season, [workbook["hash"]], columns if metrics else None)
+        dates = pd.to_datetime(df[TIME_COL], errors="coerce") if TIME_COL in df.columns else pd.Series(pd.NaT)
+        frames.append(df)
+        starts.append(dates.min())
+        ends.append(dates.max())
+    return frames, starts, ends
+
+
+def week_order(starts):
+    # A munkafüzetek (tárbeli sorrend) naptári sorrendje az első foglalkozás szerint; a kezdési
+    # idő nélküli hét a tárban előtte álló után marad, egyezésnél a feltöltés sorrendje dönt
+    keys = pd.Series(pd.to_datetime(starts)).ffill().fillna(pd.Timestamp.min)
+    return list(keys.sort_values(kind="stable").index)
+
+
+def _numbered(frames, order, start=0):
+    # A munkafüzetek sorai naptári hét sorszámmal (start-tól)
+    frames = [frames[position].assign(**{WEEK_NO: week_no}) for week_no, position in enumerate(order, start=start)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _iso(timestamp):
+    return None if pd.isna(timestamp) else pd.Timestamp(timestamp).isoformat()
+
+
+def _latest(dates):
+    # A kitöltött időpontok legkésőbbike ISO formában (a meta "last_date" mezője)
+    return max((_iso(date) for date in dates if pd.notna(date)), key=pd.Timestamp, default=None)
+
+
+def _empty():
+    return pd.DataFrame(columns=SCORE_COLUMNS), pd.DataFrame(columns=WEEKLY_COLUMNS)
+
+
+def update_anomalies(season, player_col):
+    # (pontszámok, heti változások) hosszú formában. Ha csak új, a tároltaknál későbbi hetek
+    # jöttek, a tárolt állapotból folytatjuk; különben (korábbi hét, új mutató, eltérő tár)
+    # teljes újraszámolás – ugyanúgy, mint az acwr.update_season a korábbi dátumoknál.
+    with _lock:
+        workbooks = season_workbooks(season)
+        hashes = [workbook["hash"] for workbook in workbooks]
+        paths = _paths(season)
+        meta = _read_meta(paths)
+
+        if meta and meta["player_col"] == player_col and hashes[:len(meta["workbooks"])] == meta["workbooks"]:
+            if len(hashes) == len(meta["workbooks"]):
+                return pd.read_parquet(paths["scores"]), pd.read_parquet(paths["weekly"])
+            start = len(meta["workbooks"])
+            frames, starts, ends = _load(season, workbooks[start:], player_col, meta["metrics"])
+            order = week_order([pd.Timestamp(date) if date else pd.NaT for date in meta["starts"]] + starts)
+            # Az új hetek a tároltak után következnek, és egyik foglalkozásuk sem régebbi a tárolt utolsónál
+            later = sorted(order[:start]) == list(range(start)) and not (
+                meta["last_date"] and any(date <= pd.Timestamp(meta["last_date"]) for date in starts if pd.notna(date)))
+            state = _read_state(paths)
+            # Egy félbeszakadt korábbi frissítés állapota már az új heteket is tartalmazhatja –
+            # ilyenkor nem folytatható, teljes újraszámolás következik
+            tail_weeks = state["tail"].index.get_level_values(WEEK_NO)
+            consistent = later and (not len(tail_weeks) or tail_weeks.max() < start)
+            df = _numbered(frames, [position - start for position in order[start:]], start) if consistent else pd.DataFrame()
+            if {player_col, "Forrás"} <= set(df.columns) and set(metric_columns(df.columns)) <= set(meta["metrics"]):
+                weeks = {week_no: workbooks[position]["name"] for week_no, position in enumerate(order)}
+                wide, dates = session_table(df.reindex(columns=[player_col, TIME_COL, "Forrás", WEEK_NO] + meta["metrics"]),
+                                            player_col, meta["metrics"])
+                scores, weekly, state = compute(wide, dates, weeks, state)
+                old_scores = pd.read_parquet(paths["scores"])
+                old_weekly = pd.read_parquet(paths["weekly"])
+                scores = pd.concat([old_scores[old_scores[WEEK_NO] < start], scores], ignore_index=True)
+                weekly = pd.concat([old_weekly[old_weekly[WEEK_NO] < start], weekly], ignore_index=True)
+                _write_state(paths, dict(meta, workbooks=hashes, starts=meta["starts"] + [_iso(date) for date in starts],
+                                         last_date=_latest(ends + [meta["last_date"]])), state, scores, weekly)
+                return scores, weekly
+
+        frames, starts, ends = _load(season, workbooks, player_col)
+        order = week_order(starts)
+        df = _numbered(frames, order)
+        metrics = metric_columns(df.columns)
+        if not metrics or not {player_col, "Forrás"} <= set(df.columns):
+            return _empty()
+        wide, dates = session_table(df, player_col, metrics)
+        if wide.empty:
+            return _empty()
+        weeks = {week_no: workbooks[position]["name"] for week_no, position in enumerate(order)}
+        scores, weekly, state = compute(wide, dates, weeks)
+        meta = {"player_col": player_col, "metrics": metrics, "workbooks": hashes,
+                "starts": [_iso(date) for date in starts], "last_date": _latest(ends)}
+        _write_state(paths, meta, state, scores, weekly)
+        return scores, weekly
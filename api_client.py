@@ -0,0 +1,48 @@
+# ========== AGGREGÁTUM API KLIENS ==========
+# Az api_server lekérdezése (urllib, külső függőség nélkül). Ha az EDZES_API_URL
+# be van állítva, a dashboard a kockát a szervertől kéri, és nem maga építi fel.
+
+import json
+import os
+from urllib.parse import quote, urlencode
+from urllib.request import urlopen
+
+import pandas as pd
+
+API_URL = os.environ.get("EDZES_API_URL")
+TIMEOUT = 60
+
+
+def get_json(path, params=None, base_url=None):
+    # params: {név: érték vagy lista} – a lista ismételt paraméterként megy (week=..&week=..)
+    url = (base_url or API_URL).rstrip("/") + path
+    if params:
+        url += "?" + urlencode({k: v for k, v in params.items() if v is not None}, doseq=True)
+    with urlopen(url, timeout=TIMEOUT) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _labels(labels, names):
+    if len(names) > 1:
+        return pd.MultiIndex.from_tuples([tuple(label) for label in labels], names=names)
+    return pd.Index(labels, name=names[0])
+
+
+def frame_from_payload(payload):
+    columns = payload["columns"]
+    if columns and isinstance(columns[0], list):
+        columns = pd.MultiIndex.from_tuples([tuple(label) for label in columns])
+    return pd.DataFrame(payload["data"], index=_labels(payload["index"], payload["index_names"]),
+                        columns=columns, dtype=None)
+
+
+def fetch_table(season, resource, base_url=None, **params):
+    # Egy táblázatos erőforrás (players, team, trend, benchmark, acwr) DataFrame-ként
+    payload = get_json(f"/api/{quote(season, safe='')}/{resource}", params, base_url)
+    return frame_from_payload(payload[resource])
+
+
+def fetch_cube(season, base_url=None):
+    # (szezon tartalmi kulcs, kocka) – ugyanaz a szerkezet, mint az aggregation.build_cube-é
+    payload = get_json(f"/api/{quote(season, safe='')}/cube", base_url=base_url)
+    return payload["key"], frame_from_payload(payload["cube"])
@@ -0,0 +1,270 @@
+# ========== AGGREGÁTUM API SZERVER ==========
+# Kis helyi HTTP/JSON szolgáltatás a szezon tár fölött, csak a standard könyvtárral
+# (asyncio). A kockát szezononként (tartalmi kulcs szerint) egyszer építi fel – a
+# dashboardok, a riport és a táblázatkezelők innen kérdeznek, nem munkamenetenként
+# számolnak. A számolás szálban fut, az eseményhurok közben a többi kérést kiszolgálja.
+#
+#   python api_server.py --port 8765
+#
+#   GET /api/seasons                         szezonok + tartalmi kulcsok
+#   GET /api/<szezon>/cube                   játékos × hét × típus kocka (a kliens szeletel)
+#   GET /api/<szezon>/players                játékosátlagok
+#   GET /api/<szezon>/team                   csapat- és meccsátlag + benchmark mutatónként
+#   GET /api/<szezon>/trend?metric=M         heti átlag játékosonként + csapat + benchmark
+#   GET /api/<szezon>/benchmark              benchmark táblázat
+#   GET /api/<szezon>/acwr?metric=M          legutóbbi napi ACWR / EWMA értékek
+#   GET /api/<szezon>/rows                   nyers foglalkozás sorok (a szűrők az Arrow tár fájljain futnak)
+#
+# Szűrők: week=..&week=.., player=.., metric=.. (ismételhetők), tipus=Edzés|Meccs,
+# profile=<benchmark profil> (alap: alap).
+# format=csv esetén a táblázatos válaszok CSV-ként jönnek (pl. Excel Power Query-hez).
+
+import argparse
+import asyncio
+import json
+import math
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from acwr import METRIC, PLAYER, latest, update_season
+from aggregation import PLAYER_COL, player_means, slice_cube, store_cube, team_means, weekly_means
+from arrow_store import load, season_columns
+from benchmarks import DEFAULT_PROFILE, benchmark_table, cached_benchmarks, load_profile
+from schema import METRICS, metric_columns
+from season_store import list_seasons, season_key
+from shared_cache import LRUCache, shared_cache
+
+HOST = "127.0.0.1"
+PORT = 8765
+# A kész (szerializált) válaszok külön, kisebb kerete – az ismételt lekérdezés csak bájtmásolás
+RESPONSES = LRUCache(64 * 1024 * 1024, sizeof=lambda response: len(response[1]))
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@shared_cache("api-kocka")
+def load_cube(season_key, season):
+    # Közvetlenül az Arrow tárból: a szezon sorai nem kerülnek a memóriába, csak a kocka
+    return store_cube(season, metric_columns(season_columns(season)))
+
+
+@shared_cache("api-acwr")
+def load_acwr(season_key, season):
+    return update_season(season, PLAYER_COL)
+
+
+def _json_value(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return _json_value(value.item())
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+def frame_payload(df):
+    # {"index": [...], "columns": [...], "data": [[...]]} – NaN → null, többszintű címke → lista
+    def labels(index):
+        return [list(label) if isinstance(label, tuple) else _json_value(label) for label in index]
+    return {
+        "index_names": list(df.index.names),
+        "index": labels(df.index),
+        "columns": labels(df.columns),
+        "data": [[_json_value(value) for value in row] for row in df.itertuples(index=False)],
+    }
+
+
+def _filters(params):
+    return {
+        "weeks": params.get("week"),
+        "players": params.get("player"),
+        "tipus": (params.get("tipus") or [None])[0],
+        "metrics": params.get("metric"),
+        "profile": (params.get("profile") or [DEFAULT_PROFILE])[0],
+    }
+
+
+def _selected_metrics(cube, metrics):
+    available = cube["sum"].columns.tolist()
+    if not metrics:
+        return available
+    unknown = [metric for metric in metrics if metric not in available]
+    if unknown:
+        raise ApiError(404, f"Ismeretlen mutató: {', '.join(unknown)}")
+    return metrics
+
+
+def _benchmarks(key, week_cube, f):
+    try:
+        profile = load_profile(f["profile"])
+    except (FileNotFoundError, ValueError) as error:
+        raise ApiError(404, str(error)) from None
+    return cached_benchmarks(key, profile, week_cube, weeks=f["weeks"], tipus=f["tipus"])
+
+
+def season_tables(season, resource, params):
+    # Visszaadja (szezon kulcs, név → DataFrame vagy érték); a szinkron számolás szálban fut
+    key = season_key(season) if season in list_seasons() else None
+    if key is None:
+        raise ApiError(404, f"Üres vagy ismeretlen szezon: {season}")
+    f = _filters(params)
+    if resource == "rows":
+        # Csak a kért hetek / típus / játékosok / mutatók sorai kerülnek a memóriába – kocka nélkül
+        columns = [PLAYER_COL, "Forrás", "Kezdési idő"] + (f["metrics"] or METRICS)
+        return key, {"rows": load(season, sources=f["weeks"], tipus=f["tipus"], players=f["players"], columns=columns)}
+    cube = load_cube(key, season)
+    week_cube = slice_cube(cube, weeks=f["weeks"], tipus=f["tipus"])
+    player_cube = slice_cube(week_cube, players=f["players"])
+
+    if resource == "cube":
+        return key, {"cube": cube}
+    if resource == "players":
+        metrics = _selected_metrics(cube, f["metrics"])
+        return key, {"players": player_means(player_cube).reindex(columns=metrics)}
+    if resource == "team":
+        metrics = _selected_metrics(cube, f["metrics"])
+        result = _benchmarks(key, week_cube, f)
+        return key, {"team": pd.DataFrame({
+            "Csapatátlag": team_means(player_cube).reindex(metrics),
+            "Meccsátlag": result["meccs_avg"].reindex(metrics),
+            "Benchmark": result["level"].reindex(metrics),
+        })}
+    if resource == "benchmark":
+        metrics = _selected_metrics(cube, f["metrics"])
+        return key, {"benchmark": benchmark_table(_benchmarks(key, week_cube, f), metrics).set_index("Mutató")}
+    if resource == "trend":
+        if not f["metrics"] or len(f["metrics"]) != 1:
+            raise ApiError(400, "A trendhez pontosan egy metric paraméter kell.")
+        metric = _selected_metrics(cube, f["metrics"])[0]
+        trend = weekly_means(player_cube, metric)
+        trend["Csapatátlag"] = weekly_means(week_cube)[metric].reindex(trend.index)
+        trend["Benchmark"] = _benchmarks(key, week_cube, f)["weekly"][metric].reindex(trend.index)
+        return key, {"trend": trend}
+    if resource == "acwr":
+        result = latest(load_acwr(key, season))
+        if f["metrics"]:
+            result = result[result[METRIC].isin(f["metrics"])]
+        if f["players"]:
+            result = result[result[PLAYER].isin(f["players"])]
+        return key, {"acwr": result.reset_index(drop=True)}
+    raise ApiError(404, f"Ismeretlen erőforrás: {resource}")
+
+
+def render(path, query):
+    # Útvonal + lekérdezés → (tartalomtípus, törzs bájtok); hibánál ApiError
+    params = parse_qs(query)
+    parts = [unquote(part) for part in path.strip("/").split("/")]
+    if parts[:1] != ["api"]:
+        raise ApiError(404, "Ismeretlen útvonal")
+    if parts[1:] == ["seasons"]:
+        seasons = [{"season": season, "key": season_key(season)} for season in list_seasons()]
+        return "application/json", json.dumps({"seasons": seasons}, ensure_ascii=False).encode("utf-8")
+    if len(parts) != 3:
+        raise ApiError(404, "Ismeretlen útvonal")
+    key, tables = season_tables(parts[1], parts[2], params)
+
+    if (params.get("format") or ["json"])[0] == "csv":
+        if len(tables) != 1 or parts[2] == "cube":
+            raise ApiError(400, "CSV csak táblázatos erőforráshoz kérhető.")
+        table = next(iter(tables.values()))
+        return "text/csv; charset=utf-8", table.to_csv().encode("utf-8-sig")
+    payload = {"season": parts[1], "key": key}
+    payload.update({name: frame_payload(table) for name, table in tables.items()})
+    return "application/json", json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+
+
+def _cached_render(target):
+    # A válasz a szezon tartalmi kulcsával együtt cache-elődik: új hét → új kulcs → új válasz
+    url = urlsplit(target)
+    parts = [unquote(part) for part in url.path.strip("/").split("/")]
+    key = season_key(parts[1]) if len(parts) == 3 and parts[0] == "api" else None
+    if key is None:
+        return render(url.path, url.query)
+    return RESPONSES.get_or_compute((key, target), lambda: render(url.path, url.query))
+
+
+def _response(status, reason, content_type, body, keep_alive):
+    head = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("ascii") + body
+
+
+def _error_body(message):
+    return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+async def handle(reader, writer):
+    # HTTP/1.1 keep-alive kapcsolat: kérésenként egy GET, a számolás a szálkészletben
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                return
+            headers = {name.strip().lower(): value.strip()
+                       for name, _, value in (line.partition(":") for line in lines[1:] if line)}
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+
+            if method not in ("GET", "HEAD"):
+                status, content_type, body = 405, "application/json", _error_body("Csak GET kérés támogatott.")
+            else:
+                try:
+                    content_type, body = await asyncio.to_thread(_cached_render, target)
+                    status = 200
+                except ApiError as error:
+                    status, content_type, body = error.status, "application/json", _error_body(str(error))
+                except Exception as error:  # noqa: BLE001 – a szerver ne álljon le egy hibás kérés miatt
+                    status, content_type, body = 500, "application/json", _error_body(repr(error))
+            response = _response(status, REASONS[status], content_type, body, keep_alive)
+            if method == "HEAD":
+                response = response[:len(response) - len(body)]
+            writer.write(response)
+            await writer.drain()
+            if not keep_alive:
+                return
+    finally:
+        writer.close()
+
+
+async def serve(host=HOST, port=PORT):
+    server = await asyncio.start_server(handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Aggregátum API: http://{host}:{port}/api/seasons")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Helyi aggregátum API a szezon tár fölött.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
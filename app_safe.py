@@ -4,42 +4,29 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from compact import compact_frame, format_savings
+from ingest import dataset_key
+from instrumentation import diagnostics, render_panel
+from preprocessing import preprocess_workbooks
+from shared_cache import format_stats, shared_cache
+
 st.set_page_config(page_title="Edzésterhelés Elemzés", layout="wide")
 st.title("🏆 Heti edzésterhelés elemző alkalmazás")
 
+diag = diagnostics("app_safe")
 uploaded_file = st.file_uploader("📤 Excel fájl feltöltése (5 edzés + 1 meccs munkalappal)", type="xlsx")
 
-@st.cache_data
-def load_excel(file):
-    excel = pd.ExcelFile(file)
+# Tartalmi hash szerint, munkamenetek között megosztva – a visszaadott táblát nem módosítjuk
+@shared_cache("excel")
+def load_excel(file_key, file):
     dfs = []
-    for sheet in excel.sheet_names:
-        df = pd.read_excel(file, sheet_name=sheet)
+    # Csak az elemzéshez szükséges oszlopok, végső típussal, előfeldolgozva – lemezen
+    # cache-elve, így egy már látott fájlnál sem az Excel, sem a konverzió nem fut újra
+    for sheet, df in preprocess_workbooks([file])[0].items():
         df["Forrás"] = sheet
         dfs.append(df)
-    return pd.concat(dfs, ignore_index=True)
-
-def safe_convert(df, col):
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
-
-def preprocess(df):
-    df = df[df["Játékos neve"].notna()].copy()
-    df["Kezdési idő"] = pd.to_datetime(df["Kezdési idő"], errors="coerce")
-    cols_to_convert = [
-        "Átlagos pulzus [bpm]", "Izomterhelés", "HRV (RMSSD)",
-        "Max sebesség [km/h]", "Sprintek száma", "Zóna 5 gyorsulás",
-        "Zóna 5 lassulás", "Zóna 5-6 táv"
-    ]
-    for col in cols_to_convert:
-        df = safe_convert(df, col)
-
-    if "Időtartam" in df.columns:
-        df["Időtartam"] = pd.to_timedelta(df["Időtartam"], errors="coerce")
-        df["Időtartam perc"] = df["Időtartam"].dt.total_seconds() / 60
-
-    return df
+    # Kategória kulcsok + szűkített mutatók: kevesebb memória munkamenetenként
+    return compact_frame(pd.concat(dfs, ignore_index=True))
 
 def plot_radar(player_data, avg_data, labels):
     fig = go.Figure()
@@ -49,12 +36,15 @@ def plot_radar(player_data, avg_data, labels):
     return fig
 
 if uploaded_file:
-    raw_df = load_excel(uploaded_file)
-    df = preprocess(raw_df)
+    with diag.stage("betöltés + előfeldolgozás") as stage:
+        df, mem_before, mem_after = load_excel(dataset_key([uploaded_file]), uploaded_file)
+        stage.rows = len(df)
 
     st.sidebar.header("🎯 Szűrés")
     players = df["Játékos neve"].dropna().unique().tolist()
     selected_player = st.sidebar.selectbox("Játékos kiválasztása", players)
+    st.sidebar.caption(format_savings(mem_before, mem_after))
+    st.sidebar.caption(format_stats())
 
     df_player = df[df["Játékos neve"] == selected_player]
 
@@ -73,8 +63,11 @@ if uploaded_file:
         radar_labels = available_cols
         player_vals = [agg[col].values[0] for col in radar_labels]
         industry_vals = [160, 70, 60, 32, 30, 15, 15, 500][:len(radar_labels)]
-        radar_fig = plot_radar(player_vals, industry_vals, radar_labels)
-        st.plotly_chart(radar_fig, use_container_width=True)
+        with diag.stage("pókháló (ábra + küldés)", rows=len(df_player)):
+            radar_fig = plot_radar(player_vals, industry_vals, radar_labels)
+            st.plotly_chart(radar_fig, use_container_width=True)
 
 else:
     st.info("Tölts fel egy Excel fájlt az elemzéshez.")
+
+render_panel(diag)
@@ -0,0 +1,201 @@
+# ========== ARROW TÁR ==========
+# A szezon tár olvasási oldala: munkafüzetenként egy tömörítetlen Arrow IPC (Feather v2)
+# fájl, szezon és hét szerint particionálva (<tár>/<szezon>/arrow/het=<nnn>/<hash>.arrow).
+# A fájlok memóriába leképezve (mmap) nyílnak meg, így olvasáskor nincs másolás: a szűrés
+# a partíciók szintjén kezdődik (csak a kért szezonok / hetek / lapok fájljai nyílnak meg),
+# az oszlopok közül csak a kértek kerülnek a táblába, a típus (lapnév) és a játékos szűrő
+# pedig a leképezett puffereken fut – csak a kiválasztott sorok jönnek létre a memóriában.
+# A Parquet tár marad az elsődleges; az Arrow fájlok olvasáskor, hiány esetén készülnek el.
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from season_store import season_path, season_workbooks
+from schema import canonical_name
+
+PLAYER_COL = "Játékos neve"
+SOURCE_COL = "Forrás"
+TIME_COL = "Kezdési idő"
+
+_MMAP_FS = pafs.LocalFileSystem(use_mmap=True)
+_lock = threading.Lock()
+
+
+def _is_match(sheet):
+    # Ugyanaz a szabály, mint a tag_weeks-ben: a "meccs" szót tartalmazó lapok meccsek
+    return "meccs" in str(sheet).lower()
+
+
+def _workbook_path(season, week, file_hash):
+    return os.path.join(season_path(season, "arrow"), f"het={week:03d}", f"{file_hash}.arrow")
+
+
+def _canonical_table(table):
+    # A régi nevű oszlopok átnevezése, mint a schema.canonicalize-ban; a pandas metaadat
+    # a régi nevekre hivatkozna, ezért elhagyjuk
+    names = table.column_names
+    present = set(names)
+    renamed = [canonical_name(name) if canonical_name(name) not in present else name for name in names]
+    keep = [i for i, name in enumerate(renamed) if name not in renamed[:i]]
+    table = table.select(keep).rename_columns([renamed[i] for i in keep])
+    return table.replace_schema_metadata(None)
+
+
+def _write_arrow(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    # Tömörítetlen IPC fájl: csak így képezhető le közvetlenül a memóriába
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def sync_season(season):
+    # A manifest még hiányzó munkafüzeteinek kiírása Arrow fájlba; visszaadja (hét, munkafüzet) listát
+    workbooks = list(enumerate(season_workbooks(season), start=1))
+    missing = [(week, workbook) for week, workbook in workbooks
+               if not os.path.exists(_workbook_path(season, week, workbook["hash"]))]
+    if missing:
+        with _lock:
+            for week, workbook in missing:
+                path = _workbook_path(season, week, workbook["hash"])
+                if not os.path.exists(path):
+                    source = pq.read_table(season_path(season, f"{workbook['hash']}.parquet"))
+                    _write_arrow(_canonical_table(source), path)
+    return workbooks
+
+
+def _selected_files(season, weeks=None, hashes=None, sheets=None):
+    # Partíciószintű szűrés: [(fájl, a munkafüzet kért lapjai, kimaradt-e lap)]
+    selected = []
+    for week, workbook in sync_season(season):
+        if weeks is not None and week not in weeks:
+            continue
+        if hashes is not None and workbook["hash"] not in hashes:
+            continue
+        wanted = workbook["sheets"] if sheets is None else [sheet for sheet in workbook["sheets"] if sheets(sheet)]
+        if wanted:
+            selected.append((_workbook_path(season, week, workbook["hash"]), wanted, len(wanted) < len(workbook["sheets"])))
+    return selected
+
+
+def _unified_schema(paths):
+    # A fájlonként eltérő oszlopkészlet és egész/lebegőpontos típus egyesítése – mint a pd.concat
+    return pa.unify_schemas([pa.ipc.open_file(pa.memory_map(path)).schema for path in paths],
+                            promote_options="permissive")
+
+
+def season_columns(season):
+    # A szezon egységes oszlopnevei a fájlok sémájából – sorok olvasása nélkül
+    paths = [path for path, _, _ in _selected_files(season)]
+    return _unified_schema(paths).names if paths else []
+
+
+def _sheet_filter(sources, tipus):
+    if sources is None and tipus is None:
+        return None
+    sources = None if sources is None else set(sources)
+    return lambda sheet: ((sources is None or sheet in sources)
+                          and (tipus is None or _is_match(sheet) == (tipus == "Meccs")))
+
+
+def _datasets(seasons, weeks=None, sources=None, tipus=None, players=None, columns=None, hashes=None,
+              period=None, player_col=PLAYER_COL):
+    # Szezononként (szezon, adathalmaz, oszlopok, szűrőfeltétel) – a scan és a batches közös része
+    if isinstance(seasons, str):
+        seasons = [seasons]
+    weeks = None if weeks is None else set(weeks)
+    hashes = None if hashes is None else set(hashes)
+    columns = None if columns is None else set(columns)
+    sheets = _sheet_filter(sources, tipus)
+    for season in seasons:
+        files = _selected_files(season, weeks, hashes, sheets)
+        if not files:
+            continue
+        paths = [path for path, _, _ in files]
+        schema = _unified_schema(paths)
+        dataset = ds.dataset(paths, schema=schema, format="ipc", filesystem=_MMAP_FS)
+        names = schema.names if columns is None else [name for name in schema.names if name in columns]
+        condition = None
+        if any(partial for _, _, partial in files) and SOURCE_COL in schema.names:
+            condition = ds.field(SOURCE_COL).isin(sorted({sheet for _, wanted, _ in files for sheet in wanted}))
+        if players is not None:
+            if player_col not in schema.names:
+                continue
+            # A halmaz típusa a mezőé – üres lista esetén sem null típusú
+            player_filter = ds.field(player_col).isin(pa.array(list(players), type=schema.field(player_col).type))
+            condition = player_filter if condition is None else condition & player_filter
+        season_period = period.get(season) if isinstance(period, dict) else period
+        if season_period is not None:
+            if TIME_COL not in schema.names:
+                continue
+            start, end = (pa.scalar(pd.Timestamp(value).to_datetime64(), schema.field(TIME_COL).type)
+                          for value in season_period)
+            time_filter = (ds.field(TIME_COL) >= start) & (ds.field(TIME_COL) <= end)
+            condition = time_filter if condition is None else condition & time_filter
+        yield season, dataset, names, condition
+
+
+def scan(seasons, weeks=None, sources=None, tipus=None, players=None, columns=None, hashes=None,
+         period=None, season_col=None, player_col=PLAYER_COL):
+    # Arrow tábla a kiválasztott sorokból. weeks: a hetek sorszáma a szezonban (1-től),
+    # sources: lapnevek ("Forrás"), tipus: "Meccs" / "Edzés", players: játékosnevek,
+    # period: (kezdet, vég) a kezdési időre, szezononként {szezon: (kezdet, vég)} is lehet,
+    # columns: egységes oszlopnevek (a tárban nem szereplők kimaradnak), hashes: munkafüzetek.
+    # season_col megadásakor a szezon neve oszlopként kerül a táblába (több szezonhoz)
+    tables = []
+    for season, dataset, names, condition in _datasets(seasons, weeks, sources, tipus, players, columns, hashes,
+                                                       period, player_col):
+        table = dataset.to_table(columns=names, filter=condition)
+        if season_col is not None:
+            codes = pa.array(np.zeros(table.num_rows, dtype=np.int32))
+            table = table.append_column(season_col, pa.DictionaryArray.from_arrays(codes, pa.array([season])))
+        tables.append(table)
+    if not tables:
+        return pa.table({})
+    return pa.concat_tables(tables, promote_options="permissive") if len(tables) > 1 else tables[0]
+
+
+def batches(seasons, **filters):
+    # A kiválasztott sorok kötegenként (munkafüzet fájlonként), a teljes tábla összeállítása
+    # nélkül – a streamelt feldolgozásokhoz (pl. aggregációs kocka). filters: mint a scan-nél
+    for _, dataset, names, condition in _datasets(seasons, **filters):
+        yield from dataset.to_batches(columns=names, filter=condition)
+
+
+def unique_values(seasons, column, **filters):
+    # Egy oszlop különböző (nem hiányzó) értékei az első előfordulás sorrendjében – csak ez az
+    # egy oszlop olvasódik, kötegenként
+    values = {}
+    for batch in batches(seasons, columns=[column], **filters):
+        if batch.num_columns:
+            values.update(dict.fromkeys(pc.unique(batch.column(0).drop_null()).to_pylist()))
+    return list(values)
+
+
+def to_frame(table):
+    # Oszloponként külön blokk: a számoszlopok átvétele másolás nélkül, blokkösszevonás nélkül
+    if not table.num_columns:
+        return pd.DataFrame()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def load(seasons, **filters):
+    return to_frame(scan(seasons, **filters))
+
+
+def load_workbooks(season, hashes, columns=None):
+    # A season_store.load_workbooks megfelelője: a megadott munkafüzetek sorai, tárbeli sorrendben
+    return load(season, hashes=hashes, columns=columns) if hashes else pd.DataFrame()
+
+
+def load_season(season, columns=None):
+    return load(season, columns=columns)
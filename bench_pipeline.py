@@ -0,0 +1,212 @@
+# ========== FELDOLGOZÁSI LÁNC TELJESÍTMÉNYMÉRÉS ==========
+# Szintetikus heti munkafüzeteken (synthetic_data) méri a lánc lépéseit – betöltés
+# (hideg és cache-ből), előfeldolgozás, aggregálás, ábraépítés – kis, szezon és
+# több-szezon méretben. Az eredmény JSON; egy korábbi futással összevethető.
+#
+#   python bench_pipeline.py --scales small season --repeat 3
+#   python bench_pipeline.py --compare bench_results/alap.json
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly
+
+import ingest_cache
+from aggregation import build_cube, max_values, player_means, slice_cube, tag_weeks, team_means, weekly_means
+from benchmarks import benchmark_ratios, load_profile
+from charts import plot_bar, plot_pizza, plot_trend, plot_trend_panel
+from compact import compact_frame
+from ingest import read_workbooks
+from preprocessing import preprocess
+from schema import ALL_FIELDS, metric_columns
+from synthetic_data import generate_season
+
+SCALES = {
+    "small": dict(players=12, weeks=2, sheets=6, metrics=10),
+    "season": dict(players=25, weeks=40, sheets=6, metrics=16),
+    "multi-season": dict(players=25, weeks=120, sheets=6, metrics=16),
+}
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bench_data")
+OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results")
+
+
+def _dataset(scale, data_dir):
+    # A generált munkafüzetek újrahasznosíthatók, ha a paraméterek nem változtak
+    params = SCALES[scale]
+    scale_dir = os.path.join(data_dir, scale + "-" + "-".join(str(v) for v in params.values()))
+    files = sorted(os.path.join(scale_dir, name) for name in os.listdir(scale_dir)) \
+        if os.path.isdir(scale_dir) else []
+    if len(files) != params["weeks"]:
+        shutil.rmtree(scale_dir, ignore_errors=True)
+        files = generate_season(scale_dir, **params)
+    return files
+
+
+def _ingest(files, cache_dir):
+    # Friss cache könyvtár = hideg betöltés; ugyanaz másodszor = cache-ből.
+    # A dashboardokhoz hasonlóan sémás (szűkített, típusos) olvasás
+    ingest_cache.CACHE_DIR = cache_dir
+    return read_workbooks(files, fields=ALL_FIELDS)
+
+
+def _frame(workbooks):
+    frames = []
+    for sheets in workbooks:
+        for sheet, df in sheets.items():
+            df = df.copy()
+            df["Forrás"] = sheet
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _preprocess(data):
+    df = preprocess(data)
+    return compact_frame(df)[0]
+
+
+def _aggregate(data):
+    cube = build_cube(tag_weeks(data.copy()), metric_columns(data.columns))
+    metrics = [col for col in cube["sum"].columns if col in load_profile().values]
+    meccs_cube = slice_cube(cube, tipus="Meccs")
+    return {
+        "cube": cube,
+        "metrics": metrics,
+        "player_avg": player_means(cube)[metrics],
+        "team_avg": team_means(cube)[metrics],
+        "meccs_avg": team_means(meccs_cube).reindex(metrics),
+        "team_weekly": weekly_means(cube),
+        "meccs_weekly": weekly_means(meccs_cube),
+        "pivots": {metric: weekly_means(cube, metric) for metric in metrics},
+        "max_val": max_values(cube)[metrics].max(),
+    }
+
+
+def _figures(agg):
+    # Az ábrák JSON szerializálása is mérve – a böngészőbe küldés is ezt csinálja
+    metrics = agg["metrics"]
+    benchmark = benchmark_ratios(metrics) * agg["meccs_avg"]
+    figures = [plot_bar(m, agg["player_avg"][m], agg["team_avg"][m], benchmark[m]) for m in metrics]
+    figures += [plot_trend(m, agg["pivots"][m], agg["team_weekly"][m], agg["meccs_weekly"][m] * benchmark_ratios([m])[m])
+                for m in metrics]
+    figures.append(plot_pizza(agg["player_avg"], agg["team_avg"], (benchmark / agg["max_val"] * 100).tolist(),
+                              agg["max_val"], metrics))
+    figures.append(plot_trend_panel(agg["pivots"], benchmark.to_dict(), list(agg["player_avg"].index)))
+    return sum(len(fig.to_json()) for fig in figures)
+
+
+def _time(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_scale(scale, repeat=3, data_dir=DATA_DIR):
+    files = _dataset(scale, data_dir)
+    stages = {name: [] for name in ("ingest_cold", "ingest_cached", "preprocess", "aggregate", "figures")}
+    rows = json_bytes = 0
+    for _ in range(repeat):
+        cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+        try:
+            elapsed, workbooks = _time(_ingest, files, cache_dir)
+            stages["ingest_cold"].append(elapsed)
+            elapsed, workbooks = _time(_ingest, files, cache_dir)
+            stages["ingest_cached"].append(elapsed)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        data = _frame(workbooks)
+        rows = len(data)
+
+        elapsed, _ = _time(_preprocess, data)
+        stages["preprocess"].append(elapsed)
+        elapsed, agg = _time(_aggregate, data)
+        stages["aggregate"].append(elapsed)
+        elapsed, json_bytes = _time(_figures, agg)
+        stages["figures"].append(elapsed)
+
+    return {
+        "params": SCALES[scale],
+        "workbooks": len(files),
+        "rows": rows,
+        "figure_json_bytes": json_bytes,
+        "stages": {
+            stage: {
+                "min_s": round(min(runs), 5),
+                "median_s": round(statistics.median(runs), 5),
+                "runs": [round(run, 5) for run in runs],
+            }
+            for stage, runs in stages.items()
+        },
+    }
+
+
+def compare(current, baseline, threshold=0.2, min_delta=0.01):
+    # Kiírja a változást lépésenként; True, ha valamelyik lépés a küszöbnél jobban lassult.
+    # A min_delta (s) alatti eltérés zajnak számít
+    regressed = False
+    for scale, result in current["results"].items():
+        base_stages = baseline.get("results", {}).get(scale, {}).get("stages", {})
+        for stage, timing in result["stages"].items():
+            if stage not in base_stages:
+                continue
+            base = base_stages[stage]["min_s"]
+            ratio = timing["min_s"] / base if base else float("inf")
+            flag = ""
+            if abs(timing["min_s"] - base) < min_delta:
+                pass
+            elif ratio > 1 + threshold:
+                flag, regressed = "  ← LASSABB", True
+            elif ratio < 1 - threshold:
+                flag = "  ← gyorsabb"
+            print(f"{scale:>13} {stage:<14} {base:9.4f} s → {timing['min_s']:9.4f} s  ({ratio:5.2f}×){flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="A feldolgozási lánc lépéseinek időmérése szintetikus adaton.")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "season"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="a generált munkafüzetek helye (újrahasznosítva)")
+    parser.add_argument("--out", help=f"eredmény JSON (alap: {OUT_DIR}/bench_<időbélyeg>.json)")
+    parser.add_argument("--compare", help="korábbi eredmény JSON az összevetéshez")
+    parser.add_argument("--threshold", type=float, default=0.2, help="lassulási küszöb arányban (alap: 0.2)")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="zajküszöb másodpercben (alap: 0.01)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plotly": plotly.__version__,
+        "cpu_count": os.cpu_count(),
+        "results": {},
+    }
+    for scale in args.scales:
+        report["results"][scale] = result = bench_scale(scale, args.repeat, args.data_dir)
+        for stage, timing in result["stages"].items():
+            print(f"{scale:>13} {stage:<14} {timing['min_s']:9.4f} s (medián {timing['median_s']:.4f} s)")
+
+    out = args.out or os.path.join(OUT_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Eredmény: {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if compare(report, json.load(f), args.threshold, args.min_delta):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# ========== BENCHMARK PROFILOK ÉS MOTOR ==========
+# A benchmark profilok a benchmark_profiles/ mappa verziózott JSON fájljai (korosztályonként,
+# keretenként egy-egy). "ratio" profil: mutatónkénti szorzó × a csapat meccsátlaga;
+# "absolute" profil: rögzített érték mutatónként. A motor egy vektoros lépésben számolja
+# az összes mutató benchmark szintjét és heti sorát; adathalmaz + profil + szűrők szerint
+# a közös cache-ben tárolódik, és minden ábra, táblázat ebből dolgozik.
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from aggregation import WEEK_COL, slice_cube, team_means, weekly_means
+from ingest_cache import content_hash
+from shared_cache import DATASETS, freeze
+
+# A csomaggal szállított profilok; az alapprofil (alap.json) mindig innen is elérhető
+BUNDLED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_profiles")
+PROFILE_DIR = os.environ.get("EDZES_BENCHMARK_DIR", BUNDLED_DIR)
+DEFAULT_PROFILE = "alap"
+RATIO = "ratio"
+ABSOLUTE = "absolute"
+MODES = {RATIO: "meccsátlag × szorzó", ABSOLUTE: "abszolút érték"}
+ALAP_ARANY = 1.0
+
+
+class BenchmarkProfile:
+    def __init__(self, name, label, version, mode, values, default=None, digest=""):
+        if mode not in MODES:
+            raise ValueError(f"Ismeretlen benchmark mód ({name}): {mode}")
+        self.name = name
+        self.label = label
+        self.version = version
+        self.mode = mode
+        self.values = values
+        # Profilban nem szereplő mutató: arányos profilnál 1,0 szorzó, abszolútnál nincs benchmark
+        self.default = (ALAP_ARANY if mode == RATIO else np.nan) if default is None else default
+        self.digest = digest
+
+    @property
+    def key(self):
+        # A cache kulcsa a verzió mellett a fájl tartalmát is követi
+        return (self.name, self.version, self.digest)
+
+    def factors(self, metrics):
+        return pd.Series([self.values.get(m, self.default) for m in metrics], index=list(metrics), dtype=float)
+
+
+def list_profiles(profile_dir=PROFILE_DIR):
+    # Az alapprofil saját mappa esetén is választható (a szállított alap.json)
+    names = {DEFAULT_PROFILE}
+    if os.path.isdir(profile_dir):
+        names.update(name[:-5] for name in os.listdir(profile_dir) if name.endswith(".json"))
+    return sorted(names)
+
+
+@lru_cache(maxsize=64)
+def _read_profile(path, mtime):
+    with open(path, "rb") as f:
+        raw = f.read()
+    config = json.loads(raw)
+    name = os.path.basename(path)[:-5]
+    return BenchmarkProfile(name, config.get("label", name), int(config.get("version", 1)), config.get("mode", RATIO),
+                            {str(m): float(v) for m, v in config.get("values", {}).items()},
+                            config.get("default"), content_hash(raw)[:12])
+
+
+def load_profile(name=DEFAULT_PROFILE, profile_dir=PROFILE_DIR):
+    path = os.path.join(profile_dir, f"{name}.json")
+    if not os.path.exists(path) and name == DEFAULT_PROFILE:
+        # Egyetlen forrás: a szállított alap.json – ha az is hiányzik, a telepítés hibás
+        path = os.path.join(BUNDLED_DIR, f"{DEFAULT_PROFILE}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Nincs ilyen benchmark profil: {name} ({profile_dir})")
+    return _read_profile(path, os.path.getmtime(path))
+
+
+def compute_benchmarks(profile, week_cube, metrics=None):
+    # week_cube: a hét/típus szerint szűrt kocka (játékosszűrés nélkül, mint a csapatátlagnál).
+    # level: mutató → benchmark; weekly: hét × mutató benchmark sor; meccs_avg: mutató → meccsátlag
+    metrics = week_cube["sum"].columns.tolist() if metrics is None else list(metrics)
+    meccs_cube = slice_cube(week_cube, tipus="Meccs")
+    factors = profile.factors(metrics)
+    meccs_avg = team_means(meccs_cube).reindex(metrics)
+    if profile.mode == RATIO:
+        level = factors * meccs_avg
+        weekly = weekly_means(meccs_cube).reindex(columns=metrics) * factors
+    else:
+        level = factors
+        weeks = pd.Index(week_cube.index.get_level_values(WEEK_COL).unique(), name=WEEK_COL).sort_values()
+        weekly = pd.DataFrame(np.broadcast_to(factors.to_numpy(), (len(weeks), len(metrics))),
+                              index=weeks, columns=factors.index)
+    return {"profile": profile, "factors": factors, "meccs_avg": meccs_avg, "level": level, "weekly": weekly}
+
+
+def cached_benchmarks(dataset_key, profile, week_cube, **filters):
+    # Adathalmazonként, profilonként és szűrőállapotonként egyszer – a szekciók ugyanazt kapják
+    return DATASETS.get_or_compute(("benchmark", dataset_key, profile.key, freeze(filters)),
+                                   lambda: compute_benchmarks(profile, week_cube))
+
+
+def benchmark_table(benchmarks, metrics=None):
+    # A motor eredményéből; arányos profilnál a szorzó oszloppal
+    metrics = benchmarks["level"].index if metrics is None else list(metrics)
+    meccs_avg = benchmarks["meccs_avg"].reindex(metrics)
+    columns = {"Mutató": list(metrics), "Meccsátlag": meccs_avg.round(2).to_numpy()}
+    if benchmarks["profile"].mode == RATIO:
+        columns["Benchmark szorzó"] = benchmarks["factors"].reindex(metrics).to_numpy()
+    columns["Benchmark érték"] = benchmarks["level"].reindex(metrics).round(2).to_numpy()
+    return pd.DataFrame(columns)
+
+
+def benchmark_ratios(metrics):
+    # Az alapprofil szorzói – a mérőszkript és a régi hívók ezt használják
+    return load_profile().factors(metrics)
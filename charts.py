@@ -0,0 +1,149 @@
+# ========== KÖZÖS DIAGRAMÉPÍTŐK ==========
+# Mutatónként külön Plotly ábra helyett egyetlen, mutatók szerint felosztott ábra
+# WebGL (Scattergl) nyomvonalakkal; csak a ténylegesen megjelenített mutatók
+# kerülnek szerializálásra.
+
+from functools import lru_cache
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from acwr import DATE, METRIC, PLAYER, SWEET_SPOT
+from downsample import LTTB, downsample, trace_budget
+
+TREND_PAGE_SIZE = 4
+TREND_ROW_HEIGHT = 260
+
+
+@lru_cache(maxsize=1)
+def _empty_polar():
+    return px.line_polar(r=[], theta=[], line_close=True)
+
+
+def _polar_figure():
+    # Az üres px.line_polar alapábra másolata – a px felépítése ábránként többszöröse a másolásnak
+    return go.Figure(_empty_polar())
+
+
+def player_colors(players):
+    palette = px.colors.qualitative.Plotly
+    return {player: palette[i % len(palette)] for i, player in enumerate(players)}
+
+
+def plot_trend_panel(pivots, benchmark_values, players):
+    # pivots: {mutató: hét × játékos átlagok}; players: a színek sorrendje
+    features = list(pivots)
+    fig = make_subplots(rows=len(features), cols=1, subplot_titles=[f"Trend – {f}" for f in features],
+                        vertical_spacing=0.3 / max(len(features), 1))
+    colors = player_colors(players)
+    shown = set()
+    for row, feature in enumerate(features, start=1):
+        pivot = pivots[feature]
+        x = [str(week) for week in pivot.index]
+        for player in pivot.columns:
+            fig.add_trace(go.Scattergl(
+                x=x, y=pivot[player].to_numpy(), mode="lines+markers", name=str(player),
+                legendgroup=str(player), showlegend=player not in shown,
+                line=dict(color=colors.get(player)), marker=dict(color=colors.get(player)),
+            ), row=row, col=1)
+            shown.add(player)
+
+        # Benchmark vonal
+        benchmark_value = benchmark_values.get(feature, 0)
+        fig.add_trace(go.Scattergl(
+            x=x, y=[benchmark_value] * len(x), mode="lines", name="Benchmark", legendgroup="Benchmark",
+            showlegend=row == 1, line=dict(color="green", dash="dash"),
+        ), row=row, col=1)
+        fig.update_yaxes(title_text=feature, row=row, col=1)
+
+    fig.update_xaxes(type="category")
+    fig.update_xaxes(title_text="Hét", row=len(features), col=1)
+    fig.update_layout(height=TREND_ROW_HEIGHT * len(features) + 80, showlegend=True)
+    return fig
+
+
+def plot_session_panel(sessions, features, benchmark_values, players, time_col, player_col, method=LTTB):
+    # Foglalkozásonkénti idősor: játékosonként a látható tartomány pontjai, nyomvonalanként
+    # ritkítva – a pontszám a tartománytól függetlenül korlátos. Visszaadja (ábra, eredeti, küldött pontszám).
+    fig = make_subplots(rows=len(features), cols=1, subplot_titles=[f"Trend – {f}" for f in features],
+                        vertical_spacing=0.3 / max(len(features), 1), shared_xaxes=True)
+    colors = player_colors(players)
+    by_player = {player: group for player, group in sessions.groupby(player_col, observed=True, sort=False)}
+    threshold = trace_budget(len(by_player))
+    shown = set()
+    total = sent = 0
+    for row, feature in enumerate(features, start=1):
+        for player in players:
+            group = by_player.get(player)
+            if group is None:
+                continue
+            x, y = downsample(group[time_col].to_numpy(), group[feature].to_numpy(dtype="float64", na_value=float("nan")),
+                              threshold, method)
+            total += len(group)
+            sent += len(x)
+            fig.add_trace(go.Scattergl(
+                x=x, y=y, mode="lines", name=str(player), legendgroup=str(player),
+                showlegend=player not in shown, line=dict(color=colors.get(player)),
+            ), row=row, col=1)
+            shown.add(player)
+
+        # Benchmark vonal a teljes tartományon – két pont elég
+        fig.add_trace(go.Scattergl(
+            x=[sessions[time_col].min(), sessions[time_col].max()], y=[benchmark_values.get(feature, 0)] * 2,
+            mode="lines", name="Benchmark", legendgroup="Benchmark", showlegend=row == 1,
+            line=dict(color="green", dash="dash"),
+        ), row=row, col=1)
+        fig.update_yaxes(title_text=feature, row=row, col=1)
+
+    fig.update_xaxes(title_text="Kezdési idő", row=len(features), col=1)
+    fig.update_layout(height=TREND_ROW_HEIGHT * len(features) + 80, showlegend=True)
+    return fig, total, sent
+
+
+# Mutatónkénti oszlop-, trend- és pizzadiagramok (V13, parancssori riport)
+
+def plot_bar(metric, player_values, team_avg, benchmark):
+    chart_data = []
+    for p, p_val in player_values.items():
+        chart_data.append({"Játékos": p, "Érték": p_val, "Típus": "Játékos"})
+    chart_data.append({"Játékos": "Csapatátlag", "Érték": team_avg, "Típus": "Csapatátlag"})
+    chart_data.append({"Játékos": "Benchmark", "Érték": benchmark, "Típus": "Benchmark"})
+    return px.bar(pd.DataFrame(chart_data), x="Játékos", y="Érték", color="Típus", barmode="group",
+                  title=f"{metric} – játékos vs csapat vs benchmark")
+
+
+def plot_trend(metric, pivot, team_avg, bm_series):
+    pivot = pivot.reset_index()
+    fig = px.line(pivot, x="Hét", y=pivot.columns[1:], markers=True, title=f"{metric} – trend")
+    team_avg = team_avg.reset_index()
+    fig.add_scatter(x=team_avg["Hét"], y=team_avg[metric], mode="lines+markers", name="Csapatátlag")
+    fig.add_scatter(x=bm_series.index, y=bm_series.values, mode="lines", name="Benchmark", line=dict(dash="dot"))
+    return fig
+
+
+def plot_pizza(player_avg, team_avg, benchmark_r, max_val, metrics):
+    fig = _polar_figure()
+    for p, values in player_avg.iterrows():
+        fig.add_scatterpolar(r=(values / max_val * 100).values, theta=values.index, fill='toself', name=p)
+    fig.add_scatterpolar(r=(team_avg / max_val * 100).values, theta=team_avg.index, name="Csapatátlag")
+    fig.add_scatterpolar(r=benchmark_r, theta=metrics, name="Benchmark", line=dict(dash="dot"))
+    fig.update_layout(title="Pizza – összes játékos")
+    return fig
+
+
+def plot_player_pizza(p, values, max_val):
+    fig = _polar_figure()
+    fig.add_scatterpolar(r=(values / max_val * 100).values, theta=values.index, fill='toself', name=p)
+    fig.update_layout(title=f"{p} – pizzadiagram")
+    return fig
+
+
+def plot_acwr(acwr, metric, players, ratio_col):
+    # Játékosonkénti ACWR/EWMA arány idősor a "biztonságos" sávval
+    data = acwr[(acwr[METRIC] == metric) & acwr[PLAYER].isin(players)]
+    fig = px.line(data, x=DATE, y=ratio_col, color=PLAYER, title=f"{metric} – {ratio_col}")
+    fig.add_hrect(y0=SWEET_SPOT[0], y1=SWEET_SPOT[1], fillcolor="green", opacity=0.1, line_width=0)
+    fig.add_hline(y=1.5, line=dict(color="red", dash="dot"))
+    return fig
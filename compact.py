@@ -0,0 +1,45 @@
+# ========== TÖMÖR MEMÓRIABELI ÁBRÁZOLÁS ==========
+# Betöltés után a kulcsoszlopok (játékos, hét, típus) kategóriává alakulnak, a
+# mutatók pedig float32/egész típusra szűkülnek – de csak ha ez veszteségmentes.
+
+import numpy as np
+import pandas as pd
+
+KEY_COLS = ["Játékos neve", "Név", "Hét", "Forrás", "Típus"]
+
+
+# Az egész értékű mutatók legszűkebb típusa: int8/int16 oszlopon a későbbi műveletek
+# (összeg, különbség, x * 100) csendben túlcsordulnának
+_INT = np.iinfo(np.int32)
+
+
+def _downcast(series):
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = values[~np.isnan(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+        if series.dtype.itemsize > 4 and (not len(finite) or (_INT.min <= finite.min() and finite.max() <= _INT.max)):
+            return series.astype(np.int32)
+        return series
+    if series.dtype.kind == "f" and series.dtype.itemsize > 4:
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+            return series.astype(np.float32)
+    return series
+
+
+def compact_frame(df, key_cols=KEY_COLS):
+    # Visszaadja a tömörített táblát, valamint a memóriahasználatot előtte/utána (bájt)
+    before = int(df.memory_usage(deep=True).sum())
+    df = df.copy(deep=False)
+    for col in key_cols:
+        if col in df.columns and df[col].dtype != "category":
+            df[col] = df[col].astype("category")
+    for col in df.select_dtypes(include="number").columns:
+        df[col] = _downcast(df[col])
+    after = int(df.memory_usage(deep=True).sum())
+    return df, before, after
+
+
+def format_savings(before, after):
+    saved = 100 * (before - after) / before if before else 0
+    return f"💾 Memória: {before / 1e6:.2f} MB → {after / 1e6:.2f} MB (−{saved:.0f}%)"
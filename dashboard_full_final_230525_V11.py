@@ -2,9 +2,13 @@
 # ⚽ V11 – Edzésterhelés Dashboard – végleges verzió benchmarkkal és trenddel
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 
+from aggregation import build_cube, max_values, player_means, slice_cube, team_means, weekly_means
+from ingest import dataset_key, read_workbooks
+from schema import ALL_FIELDS, metric_columns
+from shared_cache import shared_cache
+
 st.set_page_config(page_title="Edzésterhelés V11", layout="wide")
 st.title("⚽ Edzésterhelés Dashboard – V11 (benchmark, csapatátlag, trend)")
 
@@ -21,21 +25,26 @@ BENCHMARK_ARANY = {
     "Max sebesség [km/h]": 1.0
 }
 
-uploaded_files = st.file_uploader("📥 Excel fájl(ok) feltöltése", type="xlsx", accept_multiple_files=True)
-if uploaded_files:
+# Játékos × hét × típus aggregátum-kocka – adathalmazonként egyszer épül fel, munkamenetek között megosztva
+@shared_cache("kocka")
+def load_cube(dataset_key, uploaded_files):
     dfs = []
-    for file in uploaded_files:
-        xls = pd.ExcelFile(file)
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
+    # Csak a sémában szereplő oszlopok, egységes néven és végső típussal
+    for sheets in read_workbooks(uploaded_files, fields=ALL_FIELDS):
+        for sheet, df in sheets.items():
             df["Hét"] = sheet
             df["Típus"] = "Meccs" if "meccs" in sheet.lower() else "Edzés"
             dfs.append(df)
     data = pd.concat(dfs, ignore_index=True)
+    return build_cube(data, metric_columns(data.columns))
 
-    players = sorted(data["Játékos neve"].dropna().unique())
-    weeks = sorted(data["Hét"].unique())
-    numeric_cols = data.select_dtypes(include="number").columns
+uploaded_files = st.file_uploader("📥 Excel fájl(ok) feltöltése", type="xlsx", accept_multiple_files=True)
+if uploaded_files:
+    cube = load_cube(dataset_key(uploaded_files), uploaded_files)
+
+    players = sorted(cube.index.get_level_values("Játékos neve").dropna().unique())
+    weeks = sorted(cube.index.get_level_values("Hét").unique())
+    numeric_cols = cube["sum"].columns
     metrics = [col for col in numeric_cols if col in BENCHMARK_ARANY]
 
     st.sidebar.header("🎛 Szűrés")
@@ -44,19 +53,26 @@ if uploaded_files:
     selected_metrics = st.sidebar.multiselect("Mutatók", metrics, default=metrics[:5])
     tipus = st.sidebar.radio("Típus", ["Mindkettő", "Edzés", "Meccs"])
 
-    df = data[data["Hét"].isin(selected_weeks)]
-    if tipus != "Mindkettő":
-        df = df[df["Típus"] == tipus]
+    # A szűrők a kocka szeletelésével – a nyers sorok újraolvasása nélkül
+    week_cube = slice_cube(cube, weeks=selected_weeks, tipus=None if tipus == "Mindkettő" else tipus)
+
+    if not week_cube.empty and selected_metrics:
+        meccs_cube = slice_cube(week_cube, tipus="Meccs")
+        player_avg_all = player_means(week_cube).reindex(index=selected_players, columns=selected_metrics)
+        team_avg_all = team_means(week_cube).reindex(selected_metrics)
+        meccs_avg_all = team_means(meccs_cube).reindex(selected_metrics)
+        trend_cube = slice_cube(week_cube, players=selected_players)
+        team_weekly = weekly_means(week_cube)
+        meccs_weekly = weekly_means(meccs_cube)
 
-    if not df.empty and selected_metrics:
         st.subheader("📊 Egyéni vs Csapat vs Benchmark")
         for metric in selected_metrics:
-            csapat_meccs = df[df["Típus"] == "Meccs"][metric].mean()
+            csapat_meccs = meccs_avg_all[metric]
             benchmark = BENCHMARK_ARANY.get(metric, 1.0) * csapat_meccs
-            csapat_avg = df[metric].mean()
+            csapat_avg = team_avg_all[metric]
             chart_data = []
             for player in selected_players:
-                val = df[df["Játékos neve"] == player][metric].mean()
+                val = player_avg_all.at[player, metric]
                 chart_data.append({
                     "Típus": "Játékos",
                     "Játékos": player,
@@ -71,27 +87,26 @@ if uploaded_files:
 
         st.subheader("🍕 Pizzadiagram – Edzés + Meccs")
         for tipus_val in ["Edzés", "Meccs"]:
-            pizza_df = df[df["Típus"] == tipus_val]
-            max_val = pizza_df[selected_metrics].max().max()
+            tipus_cube = slice_cube(week_cube, tipus=tipus_val)
+            tipus_avg = player_means(tipus_cube).reindex(index=selected_players, columns=selected_metrics)
+            max_val = max_values(tipus_cube)[selected_metrics].max()
             fig = px.line_polar(r=[], theta=[], line_close=True, title=f"{tipus_val} Pizza")
             for player in selected_players:
-                avg = pizza_df[pizza_df["Játékos neve"] == player][selected_metrics].mean()
+                avg = tipus_avg.loc[player]
                 fig.add_scatterpolar(r=avg.values / max_val * 100, theta=avg.index, fill='toself', name=player)
-            team_avg = pizza_df[selected_metrics].mean()
+            team_avg = team_means(tipus_cube).reindex(selected_metrics)
             fig.add_scatterpolar(r=team_avg.values / max_val * 100, theta=team_avg.index, fill='toself', name="Csapatátlag")
-            meccs_df = df[df["Típus"] == "Meccs"]
-            ref = [BENCHMARK_ARANY.get(m, 1.0) * meccs_df[m].mean() / max_val * 100 for m in selected_metrics]
+            ref = [BENCHMARK_ARANY.get(m, 1.0) * meccs_avg_all[m] / max_val * 100 for m in selected_metrics]
             fig.add_scatterpolar(r=ref, theta=selected_metrics, name="Benchmark", line=dict(dash="dot"))
             st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("📈 Trend – Játékosok, Csapat, Benchmark")
         for metric in selected_metrics:
-            trend_df = df[df["Játékos neve"].isin(selected_players)]
-            pivot = trend_df.pivot_table(index="Hét", columns="Játékos neve", values=metric, aggfunc="mean").reset_index()
+            pivot = weekly_means(trend_cube, metric).reset_index()
             fig = px.line(pivot, x="Hét", y=pivot.columns[1:], title=f"{metric} – Trend")
-            cs_avg = df.groupby("Hét")[metric].mean().reset_index()
+            cs_avg = team_weekly[metric].reset_index()
             fig.add_scatter(x=cs_avg["Hét"], y=cs_avg[metric], mode="lines+markers", name="Csapatátlag")
-            meccs_df = df[df["Típus"] == "Meccs"].groupby("Hét")[metric].mean()
+            meccs_df = meccs_weekly[metric]
             bench = [BENCHMARK_ARANY.get(metric, 1.0) * v for v in meccs_df]
             fig.add_scatter(x=meccs_df.index, y=bench, mode="lines", name="Benchmark", line=dict(dash="dot"))
             st.plotly_chart(fig, use_container_width=True)
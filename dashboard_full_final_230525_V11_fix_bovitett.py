@@ -5,6 +5,10 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 
+from aggregation import build_cube, max_values, player_means, slice_cube, team_means, weekly_means
+from ingest import dataset_key, read_workbooks
+from shared_cache import shared_cache
+
 st.set_page_config(page_title="Edzésterhelés V11_bővített", layout="wide")
 st.title("⚽ Edzésterhelés – V11 FIX (bővített)")
 
@@ -23,22 +27,26 @@ BENCHMARK_ARANY = {
     "Max sebesség [km/h]": 1.0
 }
 
-uploaded_files = st.file_uploader("📥 Excel fájl(ok) feltöltése", type="xlsx", accept_multiple_files=True)
-
-if uploaded_files:
+# Játékos × hét × típus aggregátum-kocka – adathalmazonként egyszer épül fel, munkamenetek között megosztva
+@shared_cache("kocka")
+def load_cube(dataset_key, uploaded_files):
     dfs = []
-    for file in uploaded_files:
-        xls = pd.ExcelFile(file)
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
+    for sheets in read_workbooks(uploaded_files):
+        for sheet, df in sheets.items():
             df["Hét"] = sheet
             df["Típus"] = "Meccs" if "meccs" in sheet.lower() else "Edzés"
             dfs.append(df)
     data = pd.concat(dfs, ignore_index=True)
+    return build_cube(data, data.select_dtypes(include=np.number).columns)
 
-    players = sorted(data["Játékos neve"].dropna().unique())
-    weeks = sorted(data["Hét"].unique())
-    numeric_cols = data.select_dtypes(include="number").columns
+uploaded_files = st.file_uploader("📥 Excel fájl(ok) feltöltése", type="xlsx", accept_multiple_files=True)
+
+if uploaded_files:
+    cube = load_cube(dataset_key(uploaded_files), uploaded_files)
+
+    players = sorted(cube.index.get_level_values("Játékos neve").dropna().unique())
+    weeks = sorted(cube.index.get_level_values("Hét").unique())
+    numeric_cols = cube["sum"].columns
     metrics = sorted([col for col in numeric_cols if col not in ["Évfolyam"]])  # minden számszerű oszlop megjelenik
 
     st.sidebar.header("🎛 Szűrés")
@@ -47,20 +55,28 @@ if uploaded_files:
     selected_metrics = st.sidebar.multiselect("Mutatók", metrics, default=metrics[:5])
     tipus = st.sidebar.radio("Típus", ["Mindkettő", "Edzés", "Meccs"])
 
-    df = data[data["Hét"].isin(selected_weeks)]
-    if tipus != "Mindkettő":
-        df = df[df["Típus"] == tipus]
+    # A szűrők a kocka szeletelésével – a nyers sorok újraolvasása nélkül
+    week_cube = slice_cube(cube, weeks=selected_weeks, tipus=None if tipus == "Mindkettő" else tipus)
+
+    if not week_cube.empty and selected_metrics:
+        meccs_cube = slice_cube(week_cube, tipus="Meccs")
+        player_avg_all = player_means(week_cube).reindex(index=selected_players, columns=selected_metrics)
+        team_avg_all = team_means(week_cube).reindex(selected_metrics)
+        meccs_avg_all = team_means(meccs_cube).reindex(selected_metrics)
+        trend_cube = slice_cube(week_cube, players=selected_players)
+        team_weekly = weekly_means(week_cube)
+        meccs_weekly = weekly_means(meccs_cube)
+        tipusok = set(week_cube.index.get_level_values("Típus"))
 
-    if not df.empty and selected_metrics:
         st.subheader("📊 Egyéni vs Csapat vs Benchmark")
         for metric in selected_metrics:
-            meccs_val = df[df["Típus"] == "Meccs"][metric].mean()
+            meccs_val = meccs_avg_all[metric]
             benchmark_szorzó = BENCHMARK_ARANY.get(metric, ALAP_BENCHMARK_ARANY)
             benchmark = benchmark_szorzó * meccs_val if not np.isnan(meccs_val) else None
-            csapat_avg = df[metric].mean()
+            csapat_avg = team_avg_all[metric]
             chart_data = []
             for player in selected_players:
-                val = df[df["Játékos neve"] == player][metric].mean()
+                val = player_avg_all.at[player, metric]
                 chart_data.append({"Játékos": player, "Érték": val, "Típus": "Játékos"})
             chart_data.append({"Játékos": "Csapatátlag", "Érték": csapat_avg, "Típus": "Csapatátlag"})
             if benchmark is not None:
@@ -71,29 +87,28 @@ if uploaded_files:
 
         st.subheader("🍕 Pizza diagram – Edzés & Meccs")
         for tipus_val in ["Edzés", "Meccs"]:
-            pizza_df = df[df["Típus"] == tipus_val]
-            if not pizza_df.empty:
-                max_val = pizza_df[selected_metrics].max().max()
+            if tipus_val in tipusok:
+                tipus_cube = slice_cube(week_cube, tipus=tipus_val)
+                tipus_avg = player_means(tipus_cube).reindex(index=selected_players, columns=selected_metrics)
+                max_val = max_values(tipus_cube)[selected_metrics].max()
                 fig = px.line_polar(r=[], theta=[], line_close=True, title=f"{tipus_val} – Pizza")
                 for player in selected_players:
-                    átlag = pizza_df[pizza_df["Játékos neve"] == player][selected_metrics].mean()
+                    átlag = tipus_avg.loc[player]
                     fig.add_scatterpolar(r=(átlag / max_val * 100).values, theta=átlag.index, fill='toself', name=player)
-                csapat_átlag = pizza_df[selected_metrics].mean()
+                csapat_átlag = team_means(tipus_cube).reindex(selected_metrics)
                 fig.add_scatterpolar(r=(csapat_átlag / max_val * 100).values, theta=csapat_átlag.index, fill='toself', name="Csapatátlag")
-                meccs_df = df[df["Típus"] == "Meccs"]
-                ref = [(BENCHMARK_ARANY.get(m, ALAP_BENCHMARK_ARANY) * meccs_df[m].mean()) / max_val * 100 if not np.isnan(meccs_df[m].mean()) else 0 for m in selected_metrics]
+                ref = [(BENCHMARK_ARANY.get(m, ALAP_BENCHMARK_ARANY) * meccs_avg_all[m]) / max_val * 100 if not np.isnan(meccs_avg_all[m]) else 0 for m in selected_metrics]
                 fig.add_scatterpolar(r=ref, theta=selected_metrics, name="Benchmark", line=dict(dash="dot"))
                 st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("📈 Trenddiagram – Hétre bontva")
         for metric in selected_metrics:
-            trend_df = df[df["Játékos neve"].isin(selected_players)]
-            if not trend_df.empty:
-                pivot = trend_df.pivot_table(index="Hét", columns="Játékos neve", values=metric, aggfunc="mean").reset_index()
+            if not trend_cube.empty:
+                pivot = weekly_means(trend_cube, metric).reset_index()
                 fig = px.line(pivot, x="Hét", y=pivot.columns[1:], title=f"{metric} – Játékos trend")
-                cs_avg = df.groupby("Hét")[metric].mean().reset_index()
+                cs_avg = team_weekly[metric].reset_index()
                 fig.add_scatter(x=cs_avg["Hét"], y=cs_avg[metric], mode="lines+markers", name="Csapatátlag")
-                meccs_df = df[df["Típus"] == "Meccs"].groupby("Hét")[metric].mean()
+                meccs_df = meccs_weekly[metric]
                 benchmark_vals = [(BENCHMARK_ARANY.get(metric, ALAP_BENCHMARK_ARANY) * v) if not np.isnan(v) else None for v in meccs_df]
                 fig.add_scatter(x=meccs_df.index, y=benchmark_vals, mode="lines", name="Benchmark", line=dict(dash="dot"))
                 st.plotly_chart(fig, use_container_width=True)
@@ -5,6 +5,11 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 
+from aggregation import build_cube, max_values, player_means, slice_cube, team_means, weekly_means
+from ingest import dataset_key, read_workbooks
+from schema import ALL_FIELDS, metric_columns
+from shared_cache import shared_cache
+
 st.set_page_config(page_title="Edzésterhelés – V12", layout="wide")
 st.title("⚽ Edzésterhelés Dashboard – V12 végleges")
 
@@ -22,25 +27,30 @@ BENCHMARK_ARANY = {
 }
 DEFAULT_BENCHMARK = 1.0
 
-uploaded_files = st.file_uploader("📁 Excel fájl(ok) feltöltése (több hét)", type="xlsx", accept_multiple_files=True)
-
-if uploaded_files:
+# Játékos × hét × típus aggregátum-kocka – adathalmazonként egyszer épül fel, munkamenetek között megosztva
+@shared_cache("kocka")
+def load_cube(dataset_key, uploaded_files):
     dfs = []
-    for file in uploaded_files:
-        xls = pd.ExcelFile(file)
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
+    # Csak a sémában szereplő oszlopok, egységes néven és végső típussal
+    for sheets in read_workbooks(uploaded_files, fields=ALL_FIELDS):
+        for sheet, df in sheets.items():
             df["Hét"] = sheet
             df["Típus"] = "Meccs" if "meccs" in sheet.lower() else "Edzés"
             dfs.append(df)
     data = pd.concat(dfs, ignore_index=True)
+    return build_cube(data, metric_columns(data.columns))
+
+uploaded_files = st.file_uploader("📁 Excel fájl(ok) feltöltése (több hét)", type="xlsx", accept_multiple_files=True)
+
+if uploaded_files:
+    cube = load_cube(dataset_key(uploaded_files), uploaded_files)
 
-    all_metrics = data.select_dtypes(include=np.number).columns.tolist()
+    all_metrics = cube["sum"].columns.tolist()
     metrics = [m for m in all_metrics if m in BENCHMARK_ARANY]
 
     st.sidebar.header("🎛 Szűrők")
-    all_players = sorted(data["Játékos neve"].dropna().unique())
-    all_weeks = sorted(data["Hét"].unique())
+    all_players = sorted(cube.index.get_level_values("Játékos neve").dropna().unique())
+    all_weeks = sorted(cube.index.get_level_values("Hét").unique())
 
     selected_players = st.sidebar.multiselect("Játékos(ok)", all_players, default=all_players)
     selected_weeks = st.sidebar.multiselect("Hét(ek)", all_weeks, default=all_weeks)
@@ -48,22 +58,27 @@ if uploaded_files:
     selected_típus = st.sidebar.radio("Típus", ["Mindkettő", "Edzés", "Meccs"])
     pizza_mode = st.sidebar.radio("🍕 Pizza nézet", ["Összes egyben", "Játékosonként külön"])
 
-    df = data[data["Hét"].isin(selected_weeks)]
-    if selected_típus != "Mindkettő":
-        df = df[df["Típus"] == selected_típus]
+    # A szűrők a kocka szeletelésével – a nyers sorok újraolvasása nélkül
+    week_cube = slice_cube(cube, weeks=selected_weeks, tipus=None if selected_típus == "Mindkettő" else selected_típus)
+    player_cube = slice_cube(week_cube, players=selected_players)
 
-    filtered_df = df[df["Játékos neve"].isin(selected_players)]
+    if not player_cube.empty and selected_metrics:
+        meccs_cube = slice_cube(week_cube, tipus="Meccs")
+        player_avg_all = player_means(week_cube).reindex(index=selected_players, columns=selected_metrics)
+        team_avg_all = team_means(week_cube).reindex(selected_metrics)
+        meccs_avg_all = team_means(meccs_cube).reindex(selected_metrics)
+        team_weekly = weekly_means(week_cube)
+        meccs_weekly = weekly_means(meccs_cube)
 
-    if not filtered_df.empty and selected_metrics:
         st.subheader("📊 Összehasonlító oszlopdiagram (Játékos vs Csapat vs Benchmark)")
         for metric in selected_metrics:
-            meccs_avg = df[df["Típus"] == "Meccs"][metric].mean()
+            meccs_avg = meccs_avg_all[metric]
             benchmark_value = BENCHMARK_ARANY.get(metric, DEFAULT_BENCHMARK) * meccs_avg
-            team_avg = df[metric].mean()
+            team_avg = team_avg_all[metric]
 
             chart_data = []
             for player in selected_players:
-                player_avg = df[df["Játékos neve"] == player][metric].mean()
+                player_avg = player_avg_all.at[player, metric]
                 chart_data.append({"Név": player, "Érték": player_avg, "Típus": "Játékos"})
             chart_data.append({"Név": "Csapatátlag", "Érték": team_avg, "Típus": "Csapatátlag"})
             chart_data.append({"Név": "Benchmark", "Érték": benchmark_value, "Típus": "Benchmark"})
@@ -74,42 +89,34 @@ if uploaded_files:
 
         st.subheader("📈 Trenddiagram – Játékos(ok), Csapatátlag, Benchmark")
         for metric in selected_metrics:
-            pivot = df[df["Játékos neve"].isin(selected_players)].pivot_table(index="Hét", columns="Játékos neve", values=metric, aggfunc="mean").reset_index()
+            pivot = weekly_means(player_cube, metric).reset_index()
             fig = px.line(pivot, x="Hét", y=pivot.columns[1:], markers=True, title=f"{metric} – trend játékosonként")
 
-            team_avg = df.groupby("Hét")[metric].mean().reset_index()
+            team_avg = team_weekly[metric].reset_index()
             fig.add_scatter(x=team_avg["Hét"], y=team_avg[metric], mode="lines+markers", name="Csapatátlag")
 
-            meccs_benchmark = df[df["Típus"] == "Meccs"].groupby("Hét")[metric].mean() * BENCHMARK_ARANY.get(metric, DEFAULT_BENCHMARK)
+            meccs_benchmark = meccs_weekly[metric] * BENCHMARK_ARANY.get(metric, DEFAULT_BENCHMARK)
             fig.add_scatter(x=meccs_benchmark.index, y=meccs_benchmark.values, mode="lines", name="Benchmark", line=dict(dash="dot"))
 
             st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("🍕 Pizzadiagram(ok) – Játékos(ok), Csapatátlag, Benchmark")
-
-        def get_pizza_data(df_input):
-            max_val = df_input[selected_metrics].max().max()
-            scaled = df_input[selected_metrics].mean() / max_val * 100 if max_val > 0 else df_input[selected_metrics].mean()
-            return scaled
-
+        max_val = max_values(player_cube)[selected_metrics].max()
         if pizza_mode == "Összes egyben":
             fig = px.line_polar(r=[], theta=[], line_close=True)
-            max_val = filtered_df[selected_metrics].max().max()
             for player in selected_players:
-                p_avg = filtered_df[filtered_df["Játékos neve"] == player][selected_metrics].mean()
+                p_avg = player_avg_all.loc[player]
                 fig.add_scatterpolar(r=(p_avg / max_val * 100).values, theta=p_avg.index, fill='toself', name=player)
-            team_avg = filtered_df[selected_metrics].mean()
+            team_avg = team_means(player_cube).reindex(selected_metrics)
             fig.add_scatterpolar(r=(team_avg / max_val * 100).values, theta=team_avg.index, fill='toself', name="Csapatátlag")
-            meccs_df = df[df["Típus"] == "Meccs"]
-            ref = [(BENCHMARK_ARANY.get(m, DEFAULT_BENCHMARK) * meccs_df[m].mean()) / max_val * 100 if not np.isnan(meccs_df[m].mean()) else 0 for m in selected_metrics]
+            ref = [(BENCHMARK_ARANY.get(m, DEFAULT_BENCHMARK) * meccs_avg_all[m]) / max_val * 100 if not np.isnan(meccs_avg_all[m]) else 0 for m in selected_metrics]
             fig.add_scatterpolar(r=ref, theta=selected_metrics, name="Benchmark", line=dict(dash="dot"))
             fig.update_layout(title="🍕 Összesített pizzadiagram")
             st.plotly_chart(fig, use_container_width=True)
         else:
             for player in selected_players:
                 fig = px.line_polar(r=[], theta=[], line_close=True)
-                p_avg = filtered_df[filtered_df["Játékos neve"] == player][selected_metrics].mean()
-                max_val = filtered_df[selected_metrics].max().max()
+                p_avg = player_avg_all.loc[player]
                 fig.add_scatterpolar(r=(p_avg / max_val * 100).values, theta=p_avg.index, fill='toself', name=player)
                 fig.update_layout(title=f"🍕 {player} – pizzadiagram")
                 st.plotly_chart(fig, use_container_width=True)
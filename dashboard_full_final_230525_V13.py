@@ -2,113 +2,193 @@
 # ⚽ V13 – végleges, működő Streamlit alkalmazás
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
+
+from acwr import EWMA_RATIO, METRIC, PLAYER, RATIO, RESULT_COLUMNS, latest, update_season
+from aggregation import max_values, player_means, slice_cube, store_cube, team_means, weekly_means
+from anomalies import KIND, MAD_LIMIT, NUMERIC_COLUMNS, OUTLIER, SPIKE, SPIKE_PCT, Z_LIMIT, alerts, update_anomalies
+from api_client import API_URL, fetch_cube
+from arrow_store import season_columns
+from benchmarks import DEFAULT_PROFILE, benchmark_table, cached_benchmarks, list_profiles, load_profile
+from charts import plot_acwr, plot_bar, plot_player_pizza, plot_pizza, plot_trend
+from figure_cache import cached_figure, format_figure_stats
+from ingest_queue import upload_panel
+from instrumentation import diagnostics, render_panel
+from schema import metric_columns
+from normalization import SCALE_MODES
+from season_store import DEFAULT_SEASON, list_seasons, season_key
+from shared_cache import shared_cache
+from similarity import METHODS as SIMILARITY_METHODS, SCALES, WINDOW_DAYS, cached_similarity, similarity_table, store_key
 
 st.set_page_config(layout="wide")
 st.title("⚽ Edzésterhelés – V13")
 
-BENCHMARK_ARANY = {
-    "Teljes táv [m]": 2.5,
-    "Táv/perc [m/min]": 0.7,
-    "Táv zóna 4 [m]": 1.5,
-    "Táv zóna 5 [m]": 1.5,
-    "Sprint szám": 2.0,
-    "Gyorsulások száma": 1.5,
-    "Lassítások száma": 1.5,
-    "Izomterhelés": 2.5,
-    "Edzésterhelés": 3.0,
-    "Max sebesség [km/h]": 1.0
-}
+# Játékos × hét × típus aggregátum-kocka – adathalmazonként egyszer épül fel, munkamenetek között megosztva
+@shared_cache("kocka")
+def load_cube(season_key, season):
+    if API_URL:
+        # Az aggregátum szerver (api_server) adathalmazonként egyszer építi fel – itt csak letöltjük
+        return fetch_cube(season)[1]
+    return store_cube(season, metric_columns(season_columns(season)))
+
+diag = diagnostics("V13")
+
+@shared_cache("acwr")
+def load_acwr(season_key, season):
+    return update_season(season, "Játékos neve")
+
+@shared_cache("anomalia")
+def load_anomalies(season_key, season):
+    return update_anomalies(season, "Játékos neve")
+
+# ========== SZEKCIÓK ==========
+# Fragmentből oldalsávba nem lehet írni, ezért a vezérlők a szekcióban vannak.
+
+@st.fragment
+def pizza_section(data_key, player_cube, player_avg, benchmarks, selected_players, selected_metrics, filter_state):
+    st.subheader("🍕 Pizzadiagram(ok)")
+    pizza_mode = st.radio("🍕 Pizza nézet", ["Összes egyben", "Játékosonként"], horizontal=True)
+    with diag.stage("pizza (ábra + küldés)", rows=len(player_avg)):
+        max_val = max_values(player_cube)[selected_metrics].max()
+        if pizza_mode == "Összes egyben":
+            team_avg = team_means(player_cube).reindex(selected_metrics)
+            benchmark_r = (benchmarks["level"][selected_metrics] / max_val * 100).tolist()
+            fig = cached_figure("pizza", data_key, lambda: plot_pizza(player_avg, team_avg, benchmark_r, max_val, selected_metrics),
+                                metrics=selected_metrics, **filter_state)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            for p in selected_players:
+                fig = cached_figure("pizza-jatekos", data_key, lambda: plot_player_pizza(p, player_avg.loc[p], max_val),
+                                    player=p, metrics=selected_metrics, **filter_state)
+                st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def similarity_section(season, selected_players, selected_metrics, tipus):
+    st.subheader("🧭 Hasonló terhelési profilok")
+    controls = st.columns(4)
+    player = controls[0].selectbox("Referencia játékos", selected_players)
+    window = controls[1].radio("Időszak", [f"Utolsó {WINDOW_DAYS} nap", "Teljes szezon"])
+    method = controls[2].radio("Távolság", list(SIMILARITY_METHODS), format_func=SIMILARITY_METHODS.get)
+    k = controls[3].number_input("Találatok", min_value=1, max_value=50, value=10, step=1)
+    scale = st.radio("Profil skálázás", list(SCALES), format_func=SCALE_MODES.get, horizontal=True)
+    all_seasons = st.checkbox("Keresés a tár összes szezonjában", value=True)
+    if player is None or not selected_metrics:
+        return
+    seasons = list_seasons()
+    with diag.stage("hasonlóság") as stage:
+        index, distances = cached_similarity(store_key(seasons), seasons, selected_metrics,
+                                             WINDOW_DAYS if window.startswith("Utolsó") else None,
+                                             None if tipus == "Mind" else tipus, scale, method)
+        stage.rows = len(index["profiles"])
+    try:
+        table = similarity_table(index, distances, season, player, k, method, None if all_seasons else [season])
+    except KeyError as error:
+        st.info(error.args[0])
+        return
+    st.dataframe(table.round(2), hide_index=True)
 
+@st.fragment
+def anomaly_section(data_key, season, selected_players, selected_metrics):
+    st.subheader("🚨 Terhelési riasztások")
+    with diag.stage("anomáliák") as stage:
+        scores, weekly = load_anomalies(data_key, season)
+        stage.rows = len(scores)
+    limits = st.columns(3)
+    z_limit = limits[0].number_input("Z küszöb", min_value=1.0, max_value=10.0, value=Z_LIMIT, step=0.5)
+    mad_limit = limits[1].number_input("Robusztus Z küszöb", min_value=1.0, max_value=10.0, value=MAD_LIMIT, step=0.5)
+    spike_pct = limits[2].number_input("Heti ugrás küszöb (%)", min_value=5.0, max_value=500.0, value=SPIKE_PCT, step=5.0)
+    table = alerts(scores, weekly, z_limit, mad_limit, spike_pct, selected_players, selected_metrics)
+    if table.empty:
+        st.success("Nincs a küszöböt átlépő érték.")
+        return
+    st.caption(f"{len(table)} jelzés – {(table[KIND] == OUTLIER).sum()} kiugró foglalkozás, {(table[KIND] == SPIKE).sum()} heti ugrás")
+    st.dataframe(table.round(dict.fromkeys(NUMERIC_COLUMNS, 2)), hide_index=True, use_container_width=True)
+
+@st.fragment
+def acwr_section(data_key, season, selected_players):
+    st.subheader("📉 Akut:krónikus terhelés (ACWR)")
+    with diag.stage("ACWR") as stage:
+        acwr_df = load_acwr(data_key, season)
+        stage.rows = len(acwr_df)
+    if acwr_df.empty:
+        st.info("Az ACWR-hez „Kezdési idő” oszlop és terhelés mutató (pl. Edzésterhelés) kell.")
+        return
+    acwr_metric = st.selectbox("ACWR mutató", acwr_df[METRIC].unique().tolist())
+    acwr_ratio = st.radio("Arány", [RATIO, EWMA_RATIO], horizontal=True)
+    fig = cached_figure("acwr", data_key, lambda: plot_acwr(acwr_df, acwr_metric, selected_players, acwr_ratio),
+                        metric=acwr_metric, ratio=acwr_ratio, players=selected_players)
+    st.plotly_chart(fig, use_container_width=True)
+    acwr_latest = latest(acwr_df)
+    acwr_latest = acwr_latest[(acwr_latest[METRIC] == acwr_metric) & acwr_latest[PLAYER].isin(selected_players)]
+    st.dataframe(acwr_latest.drop(columns=[METRIC]).round(dict.fromkeys(RESULT_COLUMNS, 2)), hide_index=True)
+
+season = st.sidebar.text_input("Szezon", value=DEFAULT_SEASON)
 uploaded_files = st.file_uploader("📁 Excel fájl(ok) feltöltése", type="xlsx", accept_multiple_files=True)
 
-if uploaded_files:
-    dfs = []
-    for file in uploaded_files:
-        xls = pd.ExcelFile(file)
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
-            df["Hét"] = sheet
-            df["Típus"] = "Meccs" if "meccs" in sheet.lower() else "Edzés"
-            dfs.append(df)
-    data = pd.concat(dfs, ignore_index=True)
-
-    numeric_columns = data.select_dtypes(include=np.number).columns.tolist()
-    all_players = sorted(data["Játékos neve"].dropna().unique())
-    all_weeks = sorted(data["Hét"].unique())
-    metrics = [col for col in numeric_columns if col in BENCHMARK_ARANY]
+data_key = season_key(season)
+upload_panel(uploaded_files, season, data_key)
+
+if data_key:
+    with diag.stage("betöltés + kocka") as stage:
+        cube = load_cube(data_key, season)
+        stage.rows = len(cube)
+
+    numeric_columns = cube["sum"].columns.tolist()
+    all_players = sorted(cube.index.get_level_values("Játékos neve").dropna().unique())
+    all_weeks = sorted(cube.index.get_level_values("Hét").unique())
 
     st.sidebar.header("🎛 Szűrés")
+    profiles = list_profiles()
+    profile = load_profile(st.sidebar.selectbox("Benchmark profil", profiles, index=profiles.index(DEFAULT_PROFILE) if DEFAULT_PROFILE in profiles else 0))
+    metrics = [col for col in numeric_columns if col in profile.values]
     selected_players = st.sidebar.multiselect("Játékos(ok)", all_players, default=all_players)
     selected_weeks = st.sidebar.multiselect("Hét(ek)", all_weeks, default=all_weeks)
     selected_metrics = st.sidebar.multiselect("Mutatók", metrics, default=metrics[:3])
     tipus = st.sidebar.radio("Típus", ["Mind", "Edzés", "Meccs"])
-    pizza_mode = st.sidebar.radio("🍕 Pizza nézet", ["Összes egyben", "Játékosonként"])
 
-    df = data[data["Hét"].isin(selected_weeks)]
-    if tipus != "Mind":
-        df = df[df["Típus"] == tipus]
-    filtered_df = df[df["Játékos neve"].isin(selected_players)]
+    # A szűrők a kocka szeletelésével – a nyers sorok újraolvasása nélkül
+    with diag.stage("szűrés") as stage:
+        week_cube = slice_cube(cube, weeks=selected_weeks, tipus=None if tipus == "Mind" else tipus)
+        player_cube = slice_cube(week_cube, players=selected_players)
+        player_avg = player_means(week_cube).reindex(index=selected_players, columns=selected_metrics)
+        team_avg_all = team_means(week_cube).reindex(selected_metrics)
+        team_weekly = weekly_means(week_cube)
+        stage.rows = len(week_cube)
+
+    filter_state = dict(players=selected_players, weeks=selected_weeks, tipus=tipus, profile=profile.key)
+
+    # Az összes mutató benchmarkja egyszer (adathalmaz + profil + hét/típus szűrő); minden szekció ebből
+    with diag.stage("benchmark"):
+        benchmarks = cached_benchmarks(data_key, profile, week_cube, weeks=selected_weeks, tipus=tipus)
+
+    anomaly_section(data_key, season, selected_players, selected_metrics)
 
     st.subheader("📊 Összehasonlító oszlopdiagram")
     for metric in selected_metrics:
-        team_avg = df[metric].mean()
-        benchmark = BENCHMARK_ARANY.get(metric, 1.0) * df[df["Típus"] == "Meccs"][metric].mean()
-        chart_data = []
-        for p in selected_players:
-            p_val = df[df["Játékos neve"] == p][metric].mean()
-            chart_data.append({"Játékos": p, "Érték": p_val, "Típus": "Játékos"})
-        chart_data.append({"Játékos": "Csapatátlag", "Érték": team_avg, "Típus": "Csapatátlag"})
-        chart_data.append({"Játékos": "Benchmark", "Érték": benchmark, "Típus": "Benchmark"})
-        fig = px.bar(pd.DataFrame(chart_data), x="Játékos", y="Érték", color="Típus", barmode="group",
-                     title=f"{metric} – játékos vs csapat vs benchmark")
-        st.plotly_chart(fig, use_container_width=True)
+        benchmark = benchmarks["level"][metric]
+        with diag.stage(f"oszlop ábra – {metric}", rows=len(player_avg)):
+            fig = cached_figure("oszlop", data_key, lambda: plot_bar(metric, player_avg[metric], team_avg_all[metric], benchmark),
+                                metric=metric, **filter_state)
+        with diag.stage(f"oszlop küldés – {metric}"):
+            st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("📈 Trenddiagram (játékos + csapatátlag + benchmark)")
     for metric in selected_metrics:
-        pivot = df[df["Játékos neve"].isin(selected_players)].pivot_table(index="Hét", columns="Játékos neve", values=metric).reset_index()
-        fig = px.line(pivot, x="Hét", y=pivot.columns[1:], markers=True, title=f"{metric} – trend")
-        team_avg = df.groupby("Hét")[metric].mean().reset_index()
-        fig.add_scatter(x=team_avg["Hét"], y=team_avg[metric], mode="lines+markers", name="Csapatátlag")
-        bm_series = df[df["Típus"] == "Meccs"].groupby("Hét")[metric].mean() * BENCHMARK_ARANY.get(metric, 1.0)
-        fig.add_scatter(x=bm_series.index, y=bm_series.values, mode="lines", name="Benchmark", line=dict(dash="dot"))
-        st.plotly_chart(fig, use_container_width=True)
-
-    st.subheader("🍕 Pizzadiagram(ok)")
-    max_val = filtered_df[selected_metrics].max().max()
-    if pizza_mode == "Összes egyben":
-        fig = px.line_polar(r=[], theta=[], line_close=True)
-        for p in selected_players:
-            values = filtered_df[filtered_df["Játékos neve"] == p][selected_metrics].mean()
-            fig.add_scatterpolar(r=(values / max_val * 100).values, theta=values.index, fill='toself', name=p)
-        team_avg = filtered_df[selected_metrics].mean()
-        fig.add_scatterpolar(r=(team_avg / max_val * 100).values, theta=team_avg.index, name="Csapatátlag")
-        meccs_df = df[df["Típus"] == "Meccs"]
-        benchmark_r = [(BENCHMARK_ARANY.get(m, 1.0) * meccs_df[m].mean()) / max_val * 100 for m in selected_metrics]
-        fig.add_scatterpolar(r=benchmark_r, theta=selected_metrics, name="Benchmark", line=dict(dash="dot"))
-        fig.update_layout(title="Pizza – összes játékos")
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        for p in selected_players:
-            fig = px.line_polar(r=[], theta=[], line_close=True)
-            values = filtered_df[filtered_df["Játékos neve"] == p][selected_metrics].mean()
-            fig.add_scatterpolar(r=(values / max_val * 100).values, theta=values.index, fill='toself', name=p)
-            fig.update_layout(title=f"{p} – pizzadiagram")
+        bm_series = benchmarks["weekly"][metric]
+        with diag.stage(f"trend ábra – {metric}", rows=len(player_cube)):
+            fig = cached_figure("trend", data_key, lambda: plot_trend(metric, weekly_means(player_cube, metric), team_weekly[metric], bm_series),
+                                metric=metric, **filter_state)
+        with diag.stage(f"trend küldés – {metric}"):
             st.plotly_chart(fig, use_container_width=True)
 
+    pizza_section(data_key, player_cube, player_avg, benchmarks, selected_players, selected_metrics, filter_state)
+    similarity_section(season, selected_players, selected_metrics, tipus)
+    acwr_section(data_key, season, selected_players)
+
     st.subheader("📋 Benchmark táblázat")
-    benchmark_table = []
-    for metric in selected_metrics:
-        meccs_avg = df[df["Típus"] == "Meccs"][metric].mean()
-        benchmark_val = BENCHMARK_ARANY.get(metric, 1.0) * meccs_avg
-        benchmark_table.append({
-            "Mutató": metric,
-            "Meccsátlag": round(meccs_avg, 2),
-            "Benchmark szorzó": BENCHMARK_ARANY.get(metric, 1.0),
-            "Benchmark érték": round(benchmark_val, 2)
-        })
-    st.dataframe(pd.DataFrame(benchmark_table))
+    st.dataframe(benchmark_table(benchmarks, selected_metrics))
+
+    st.sidebar.caption(format_figure_stats())
 else:
     st.info("📂 Tölts fel legalább egy heti Excel-fájlt több munkalappal (edzések + meccs).")
+
+render_panel(diag)
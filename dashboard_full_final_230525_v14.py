@@ -3,103 +3,286 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import os
-from io import BytesIO
+
+from acwr import EWMA_RATIO, METRIC, PLAYER, RATIO, RESULT_COLUMNS, latest, update_season
+from aggregation import PLAYER_COL, player_means, slice_cube, store_cube, team_means, weekly_means
+from anomalies import KIND, MAD_LIMIT, NUMERIC_COLUMNS, OUTLIER, SPIKE, SPIKE_PCT, Z_LIMIT, alerts, update_anomalies
+from arrow_store import load, season_columns, unique_values
+from benchmarks import benchmark_table, cached_benchmarks, list_profiles, load_profile
+from charts import TREND_PAGE_SIZE, plot_acwr, plot_session_panel, plot_trend_panel
+from downsample import METHODS
+from export import FORMATS, export_file_name, export_tables
+from figure_cache import cached_figure, format_figure_stats
+from ingest_queue import upload_panel
+from instrumentation import diagnostics, render_panel
+from normalization import SCALE_MODES, scale_matrix
+from schema import metric_columns
+from season_store import DEFAULT_SEASON, list_seasons, season_key, season_sheets
+from shared_cache import DATASETS, format_stats, freeze, shared_cache
+from similarity import METHODS as SIMILARITY_METHODS, SCALES, WINDOW_DAYS, cached_similarity, similarity_table, store_key
+
+# A v14 alapértelmezése a korábbi, beégetett abszolút értékek profilja
+V14_PROFILE = "felnott_abszolut"
 
 st.set_page_config(layout="wide")
 st.title("Edzésterhelés – Teljes Elemző Rendszer v14")
 
 # ========== HELPER FÜGGVÉNYEK ==========
 
-@st.cache_data
-def load_data(uploaded_files):
-    dfs = []
-    for file in uploaded_files:
-        excel = pd.ExcelFile(file)
-        for sheet_name in excel.sheet_names:
-            df = excel.parse(sheet_name)
-            df["Forrás"] = sheet_name
-            dfs.append(df)
-    return pd.concat(dfs, ignore_index=True)
-
-def normalize_series(series):
-    min_val = series.min()
-    max_val = series.max()
-    if max_val - min_val == 0:
-        return series * 0
-    return (series - min_val) / (max_val - min_val)
-
-def plot_pizza(df, selected_players, selected_features, benchmark_dict, team_avg_df, chart_type="combined"):
-    fig = go.Figure()
-    angles = list(range(len(selected_features)))
+# A játékos szűrő választéka: csak a játékos oszlop olvasódik a tárból
+@shared_cache("jatekosok-v14")
+def load_players(dataset_key, season):
+    return unique_values(season, PLAYER_COL)
+
+# Játékos × hét aggregátum-kocka a kiválasztott hetekre, közvetlenül az Arrow tárból: a hét szűrő
+# a fájlok szintjén fut, és egyszerre csak egy munkafüzet sorai vannak a memóriában – a szezon
+# sorai nem töltődnek be. A "meccs" lapok típusa is a kockába kerül a meccsátlag-arányos profilokhoz
+def load_cube(dataset_key, season, weeks, features):
+    def compute():
+        cube = store_cube(season, features, sources=weeks)
+        return cube[cube.index.get_level_values(PLAYER_COL).notna()]
+    return DATASETS.get_or_compute(("kocka-v14", dataset_key, freeze(dict(weeks=weeks, features=features))), compute)
+
+# Foglalkozásonkénti idősorhoz: csak a kiválasztott játékosok, hetek és mutatók sorai – a szűrés
+# az Arrow tár leképezett fájljain fut, így a teljes szezon nem másolódik. Érvényes kezdési idejű sorok időrendben
+def load_sessions(dataset_key, season, players, weeks, features):
+    def compute():
+        df = load(season, sources=weeks, players=players, columns=["Játékos neve", "Forrás", "Kezdési idő", *features])
+        if "Kezdési idő" not in df.columns:
+            return df.iloc[:0]
+        return df.dropna(subset=["Kezdési idő"]).sort_values("Kezdési idő", kind="stable")
+    return DATASETS.get_or_compute(("foglalkozasok-v14", dataset_key, freeze(dict(players=players, weeks=weeks, features=features))),
+                                   compute)
+
+# Napi ACWR/EWMA a szezon tárból – új hétnél csak az új napok számolódnak
+@shared_cache("acwr-v14")
+def load_acwr(season_key, season):
+    return update_season(season, "Játékos neve")
+
+# Foglalkozásonkénti kiugró értékek és heti ugrások – új hétnél csak az új foglalkozások számolódnak
+@shared_cache("anomalia-v14")
+def load_anomalies(season_key, season):
+    return update_anomalies(season, "Játékos neve")
+
+def plot_pizza(player_avg, team_avg, selected_features, benchmark_dict, chart_type="combined", scale_mode="minmax"):
     labels = selected_features
+    benchmark_values = pd.Series([benchmark_dict.get(col, 0) for col in selected_features], index=selected_features)
+    # A teljes játékos × mutató mátrix egy lépésben skálázva; csapatátlag és benchmark ugyanazzal
+    references = pd.DataFrame([team_avg[selected_features], benchmark_values], index=["Csapatátlag", "Benchmark"])
+    scaled, scaled_refs = scale_matrix(player_avg[selected_features], scale_mode,
+                                       benchmark=benchmark_values, extra=references)
+    if scale_mode == "benchmark":
+        radial_max = max(1.0, float(np.nanmax(np.append(scaled.to_numpy(), scaled_refs.to_numpy()), initial=0)))
+    else:
+        # A keret tartományán kívül eső referenciák (pl. abszolút benchmark) a skála szélére kerülnek
+        radial_max = 1.0
+        scaled_refs = scaled_refs.clip(0, 1)
 
     if chart_type == "combined":
-        for player in selected_players:
-            player_values = df[df["Név"] == player][selected_features].mean()
-            fig.add_trace(go.Scatterpolar(
-                r=normalize_series(player_values),
-                theta=labels,
-                fill='toself',
-                name=player
-            ))
+        fig = go.Figure()
+        cells = [(None, None)] * len(scaled.index)
     else:
-        for player in selected_players:
-            player_values = df[df["Név"] == player][selected_features].mean()
-            fig.add_trace(go.Scatterpolar(
-                r=normalize_series(player_values),
-                theta=labels,
-                fill='toself',
-                name=player
-            ))
-
-    # Team average
-    team_avg = team_avg_df[selected_features].mean()
-    fig.add_trace(go.Scatterpolar(
-        r=normalize_series(team_avg),
-        theta=labels,
-        fill='toself',
-        name="Csapatátlag",
-        line=dict(color="black", dash="dash")
-    ))
-
-    # Benchmark
-    benchmark_values = pd.Series([benchmark_dict.get(col, 0) for col in selected_features], index=selected_features)
-    fig.add_trace(go.Scatterpolar(
-        r=normalize_series(benchmark_values),
-        theta=labels,
-        name="Benchmark",
-        line=dict(color="green", dash="dot")
-    ))
-
-    fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 1])), showlegend=True)
-    return fig
+        # Játékosonként egy polár alábra – a teljes keret egyetlen ábrában
+        cols = min(4, max(len(scaled.index), 1))
+        rows = max(1, -(-len(scaled.index) // cols))
+        fig = make_subplots(rows=rows, cols=cols, specs=[[{"type": "polar"}] * cols] * rows,
+                            subplot_titles=[str(player) for player in scaled.index])
+        cells = [(i // cols + 1, i % cols + 1) for i in range(len(scaled.index))]
 
-def plot_trend(df, selected_players, feature, benchmark_value):
-    fig = go.Figure()
-    for player in selected_players:
-        player_data = df[df["Név"] == player]
-        fig.add_trace(go.Scatter(x=player_data["Forrás"], y=player_data[feature], mode="lines+markers", name=player))
+    for (player, r), (row, col) in zip(zip(scaled.index, scaled.to_numpy()), cells):
+        fig.add_trace(go.Scatterpolar(r=r, theta=labels, fill='toself', name=player), row=row, col=col)
 
-    # Benchmark vonal
-    fig.add_trace(go.Scatter(
-        x=df["Forrás"].unique(), y=[benchmark_value] * len(df["Forrás"].unique()),
-        mode="lines", name="Benchmark", line=dict(color="green", dash="dash")
-    ))
+    # Team average + Benchmark – minden (al)ábrán, egy jelmagyarázat bejegyzéssel
+    for i, (row, col) in enumerate(list(dict.fromkeys(cells)) or [(None, None)]):
+        fig.add_trace(go.Scatterpolar(
+            r=scaled_refs.loc["Csapatátlag"].to_numpy(),
+            theta=labels,
+            fill='toself',
+            name="Csapatátlag",
+            legendgroup="Csapatátlag",
+            showlegend=i == 0,
+            line=dict(color="black", dash="dash")
+        ), row=row, col=col)
+        fig.add_trace(go.Scatterpolar(
+            r=scaled_refs.loc["Benchmark"].to_numpy(),
+            theta=labels,
+            name="Benchmark",
+            legendgroup="Benchmark",
+            showlegend=i == 0,
+            line=dict(color="green", dash="dot")
+        ), row=row, col=col)
 
-    fig.update_layout(title=f"Trend – {feature}", xaxis_title="Hét", yaxis_title=feature)
+    fig.update_polars(radialaxis=dict(visible=True, range=[0, radial_max]))
+    fig.update_layout(showlegend=True)
+    if chart_type != "combined":
+        fig.update_layout(height=380 * rows)
     return fig
 
+# ========== SZEKCIÓK ==========
+# A saját vezérlővel bíró szekciók fragmentek: a vezérlőjük változása csak a szekciót futtatja
+# újra; a bemeneteiket (szűrt aggregátumok) a legutóbbi teljes futás paramétereiként kapják.
+
+@st.fragment
+def pizza_section(data_key, player_avg, team_avg, selected_features, benchmark_dict, filter_state):
+    st.header("Pizzadiagram")
+    pizza_view = st.radio("Pizza nézet", ["Egy pizza", "Játékosonként külön"], horizontal=True)
+    pizza_chart_type = "combined" if pizza_view == "Egy pizza" else "per_player"
+    scale_mode = st.radio("Skálázás", list(SCALE_MODES), format_func=SCALE_MODES.get, horizontal=True)
+    with diag.stage("pizza ábra", rows=len(player_avg)):
+        pizza_fig = cached_figure("pizza", data_key, lambda: plot_pizza(player_avg, team_avg, selected_features, benchmark_dict, pizza_chart_type, scale_mode),
+                                  features=selected_features, chart_type=pizza_chart_type, scale_mode=scale_mode, **filter_state)
+    with diag.stage("pizza küldés (Plotly)"):
+        st.plotly_chart(pizza_fig, use_container_width=True)
+
+# Egyetlen felosztott WebGL ábra; csak az aktuális oldal mutatói kerülnek a böngészőbe
+@st.fragment
+def trend_section(data_key, season, player_cube, selected_features, benchmark_dict, selected_players, filter_state):
+    st.header("Trenddiagramok (mutatónként)")
+    page_count = max(1, -(-len(selected_features) // TREND_PAGE_SIZE))
+    trend_page = st.number_input("Oldal", min_value=1, max_value=page_count, value=1, step=1) if page_count > 1 else 1
+    visible_features = selected_features[(trend_page - 1) * TREND_PAGE_SIZE:trend_page * TREND_PAGE_SIZE]
+    if not visible_features:
+        return
+    resolution = st.radio("Felbontás", ["Heti átlag", "Foglalkozásonként"], horizontal=True)
+    if resolution == "Foglalkozásonként":
+        session_trend(data_key, season, visible_features, benchmark_dict, selected_players, filter_state)
+        return
+    with diag.stage("trend ábra", rows=len(player_cube)):
+        trend_fig = cached_figure(
+            "trend", data_key,
+            lambda: plot_trend_panel({feature: weekly_means(player_cube, feature, sort=False) for feature in visible_features},
+                                     benchmark_dict, selected_players),
+            features=visible_features, **filter_state)
+    with diag.stage("trend küldés (Plotly)"):
+        st.plotly_chart(trend_fig, use_container_width=True)
+
+# Foglalkozásonkénti pontok a kiválasztott időszakban, szerveroldalon pontkeretre ritkítva:
+# szűkebb időszak → ugyanannyi pont, több részlet
+def session_trend(data_key, season, visible_features, benchmark_dict, selected_players, filter_state):
+    sessions = load_sessions(data_key, season, selected_players, filter_state["weeks"], visible_features)
+    if "Kezdési idő" not in sessions.columns:
+        st.info("A foglalkozásonkénti nézethez „Kezdési idő” oszlop kell.")
+        return
+    if sessions.empty:
+        st.info("A kiválasztott játékosokhoz és hetekhez nincs foglalkozás.")
+        return
+    start, end = (value.to_pydatetime() for value in (sessions["Kezdési idő"].min(), sessions["Kezdési idő"].max()))
+    if start < end:
+        zoom = st.slider("Látható időszak", min_value=start, max_value=end, value=(start, end), format="YYYY-MM-DD")
+    else:
+        zoom = (start, end)
+    method = st.radio("Ritkítás", list(METHODS), format_func=METHODS.get, horizontal=True)
+    with diag.stage("foglalkozás trend ábra", rows=len(sessions)):
+        session_fig, total, sent = cached_figure(
+            "trend-foglalkozas", data_key,
+            lambda: plot_session_panel(sessions[sessions["Kezdési idő"].between(*zoom)], visible_features, benchmark_dict,
+                                       selected_players, "Kezdési idő", "Játékos neve", method),
+            features=visible_features, zoom=zoom, method=method, **filter_state)
+    st.caption(f"{sent} / {total} pont megjelenítve ({METHODS[method]})")
+    with diag.stage("foglalkozás trend küldés (Plotly)"):
+        st.plotly_chart(session_fig, use_container_width=True)
+
+# A tár összes szezonjának játékosai egy mátrixban; a mátrix és a távolságok szűrőállapotonként
+# egyszer számolódnak, a játékos vagy a találatszám váltása csak egy sor rendezése
+@st.fragment
+def similarity_section(season, selected_players, selected_features):
+    st.header("Hasonló terhelési profilok")
+    controls = st.columns(4)
+    player = controls[0].selectbox("Referencia játékos", selected_players)
+    window = controls[1].radio("Időszak", [f"Utolsó {WINDOW_DAYS} nap", "Teljes szezon"])
+    method = controls[2].radio("Távolság", list(SIMILARITY_METHODS), format_func=SIMILARITY_METHODS.get)
+    k = controls[3].number_input("Találatok", min_value=1, max_value=50, value=10, step=1)
+    scale = st.radio("Profil skálázás", list(SCALES), format_func=SCALE_MODES.get, horizontal=True)
+    all_seasons = st.checkbox("Keresés a tár összes szezonjában", value=True)
+    if player is None or not selected_features:
+        return
+    seasons = list_seasons()
+    with diag.stage("hasonlóság") as stage:
+        index, distances = cached_similarity(store_key(seasons), seasons, selected_features,
+                                             WINDOW_DAYS if window.startswith("Utolsó") else None, None, scale, method)
+        stage.rows = len(index["profiles"])
+    try:
+        table = similarity_table(index, distances, season, player, k, method, None if all_seasons else [season])
+    except KeyError as error:
+        st.info(error.args[0])
+        return
+    st.dataframe(table.round(2), hide_index=True, use_container_width=True)
+
+# A küszöbök a tárolt pontszámokat szűrik – állításuk nem számol újra
+@st.fragment
+def anomaly_section(data_key, season, selected_players, selected_features):
+    st.header("Terhelési riasztások")
+    with diag.stage("anomáliák") as stage:
+        scores, weekly = load_anomalies(data_key, season)
+        stage.rows = len(scores)
+    limits = st.columns(3)
+    z_limit = limits[0].number_input("Z küszöb", min_value=1.0, max_value=10.0, value=Z_LIMIT, step=0.5)
+    mad_limit = limits[1].number_input("Robusztus Z küszöb", min_value=1.0, max_value=10.0, value=MAD_LIMIT, step=0.5)
+    spike_pct = limits[2].number_input("Heti ugrás küszöb (%)", min_value=5.0, max_value=500.0, value=SPIKE_PCT, step=5.0)
+    table = alerts(scores, weekly, z_limit, mad_limit, spike_pct, selected_players, selected_features)
+    if table.empty:
+        st.success("Nincs a küszöböt átlépő érték.")
+        return
+    st.caption(f"{len(table)} jelzés – {(table[KIND] == OUTLIER).sum()} kiugró foglalkozás, {(table[KIND] == SPIKE).sum()} heti ugrás")
+    st.dataframe(table.round(dict.fromkeys(NUMERIC_COLUMNS, 2)), hide_index=True, use_container_width=True)
+
+@st.fragment
+def acwr_section(data_key, season, selected_players):
+    st.header("Akut:krónikus terhelés (ACWR)")
+    with diag.stage("ACWR") as stage:
+        acwr_df = load_acwr(data_key, season)
+        stage.rows = len(acwr_df)
+    if acwr_df.empty:
+        st.info("Az ACWR-hez „Kezdési idő” oszlop és terhelés mutató (pl. Edzésterhelés) kell.")
+        return
+    acwr_metric = st.selectbox("ACWR mutató", acwr_df[METRIC].unique().tolist())
+    acwr_ratio = st.radio("Arány", [RATIO, EWMA_RATIO], horizontal=True)
+    acwr_fig = cached_figure("acwr", data_key, lambda: plot_acwr(acwr_df, acwr_metric, selected_players, acwr_ratio),
+                             metric=acwr_metric, ratio=acwr_ratio, players=selected_players)
+    st.plotly_chart(acwr_fig, use_container_width=True)
+    acwr_latest = latest(acwr_df)
+    acwr_latest = acwr_latest[(acwr_latest[METRIC] == acwr_metric) & acwr_latest[PLAYER].isin(selected_players)]
+    st.dataframe(acwr_latest.drop(columns=[METRIC]).round(dict.fromkeys(RESULT_COLUMNS, 2)), hide_index=True, use_container_width=True)
+
+# A fájl a letöltés kattintásakor, külön szálon, darabonként íródik lemezre – nem blokkolja
+# a futást, és a méretével nem nő a memóriaigény
+@st.fragment
+def export_section(data_key, season, player_avg, player_cube, benchmarks, benchmark_dict, selected_features, selected_players):
+    st.header("Export")
+    export_format = st.radio("Formátum", list(FORMATS), format_func=lambda fmt: FORMATS[fmt][0], horizontal=True)
+
+    def build():
+        tables = {"Játékosátlagok": player_avg[selected_features],
+                  "Benchmark": benchmark_table(benchmarks, benchmark_dict)}
+        for feature in selected_features:
+            tables[f"Heti – {feature}"] = weekly_means(player_cube, feature, sort=False)
+        acwr_df = load_acwr(data_key, season)
+        tables["ACWR"] = acwr_df[acwr_df[PLAYER].isin(selected_players)] if not acwr_df.empty else None
+        return export_tables(tables, export_format)
+
+    st.download_button("Szűrt aggregátumok letöltése", build, file_name=export_file_name(f"edzesterheles_{season}", export_format),
+                       mime=FORMATS[export_format][1], on_click="ignore")
+
 # ========== ADATBETÖLTÉS ==========
 
+# Lépésenkénti idő/sor/memória mérés – kikapcsolva gyakorlatilag ingyenes
+diag = diagnostics("v14")
+season = st.sidebar.text_input("Szezon", value=DEFAULT_SEASON)
 uploaded_files = st.file_uploader("Excel fájl(ok) feltöltése", type=["xlsx"], accept_multiple_files=True)
 
-if uploaded_files:
-    df_raw = load_data(uploaded_files)
-    df_raw = df_raw.dropna(subset=["Név"])
-    all_players = df_raw["Név"].unique().tolist()
-    all_features = df_raw.select_dtypes(include='number').columns.tolist()
-    weeks = df_raw["Forrás"].unique().tolist()
+# A feltöltés a háttérsorba kerül; a már betöltött hetek rögtön megjelennek
+data_key = season_key(season)
+upload_panel(uploaded_files, season, data_key)
+
+if data_key:
+    # A szűrők választéka a tár sémájából, manifestjéből és a játékos oszlopból – a betöltés sorrendjében
+    with diag.stage("szűrő választék") as stage:
+        all_players = load_players(data_key, season)
+        all_features = metric_columns(season_columns(season))
+        weeks = season_sheets(season)
+        stage.rows = len(all_players)
 
     # ========== SZŰRŐK OLDALSÁVBAN ==========
 
@@ -108,44 +291,48 @@ if uploaded_files:
         selected_players = st.multiselect("Játékosok", all_players, default=all_players)
         selected_features = st.multiselect("Mutatók", all_features, default=all_features)
         selected_weeks = st.multiselect("Hetek", weeks, default=weeks)
+        profiles = list_profiles()
+        profile = load_profile(st.selectbox("Benchmark profil", profiles,
+                                            index=profiles.index(V14_PROFILE) if V14_PROFILE in profiles else 0))
+        st.caption(format_stats())
 
-    df_filtered = df_raw[df_raw["Név"].isin(selected_players) & df_raw["Forrás"].isin(selected_weeks)]
-    team_avg_df = df_raw[df_raw["Forrás"].isin(selected_weeks)]
+    with diag.stage("kocka") as stage:
+        week_cube = load_cube(data_key, season, selected_weeks, all_features)
+        stage.rows = len(week_cube)
 
-    # ========== BENCHMARK DICTIONARY ==========
+    # A játékos szűrő a kocka szeletelésével – a csapatátlag és a benchmark a teljes keretből
+    with diag.stage("szűrés") as stage:
+        player_cube = slice_cube(week_cube, players=selected_players)
+        player_avg = player_means(player_cube).reindex(selected_players).dropna(how="all")
+        team_avg = team_means(week_cube)
+        stage.rows = len(player_cube)
 
-    benchmark_dict = {
-        "Teljes táv (m)": 15000,
-        "Táv/perc": 100,
-        "Táv zóna 4 (m)": 1200,
-        "Táv zóna 5 (m)": 300,
-        "Sprintek száma": 25,
-        "Gyorsulások száma": 50,
-        "Izomterhelés": 80,
-        "Edzésterhelés": 300,
-        "Max sebesség": 32
-    }
+    # ========== BENCHMARK ==========
 
-    st.header("Pizzadiagram")
-    pizza_view = st.radio("Pizza nézet", ["Egy pizza", "Játékosonként külön"], horizontal=True)
-    pizza_chart_type = "combined" if pizza_view == "Egy pizza" else "per_player"
-    st.plotly_chart(plot_pizza(df_filtered, selected_players, selected_features, benchmark_dict, team_avg_df, pizza_chart_type), use_container_width=True)
-
-    # ========== TREND DIAGRAM ==========
+    # Az összes mutató benchmarkja egyszer (adathalmaz + profil + hét szűrő), a profilban nem szereplők nélkül
+    with diag.stage("benchmark"):
+        benchmarks = cached_benchmarks(data_key, profile, week_cube, weeks=selected_weeks)
+    benchmark_dict = benchmarks["level"].dropna().to_dict()
 
-    st.header("Trenddiagramok (mutatónként)")
-    for feature in selected_features:
-        benchmark_value = benchmark_dict.get(feature, 0)
-        st.plotly_chart(plot_trend(df_filtered, selected_players, feature, benchmark_value), use_container_width=True)
+    # Az ábrák a szezon kulcsa + a rájuk ható szűrők szerint cache-elődnek
+    filter_state = dict(players=selected_players, weeks=selected_weeks, profile=profile.key)
+    anomaly_section(data_key, season, selected_players, selected_features)
+    pizza_section(data_key, player_avg, team_avg, selected_features, benchmark_dict, filter_state)
+    similarity_section(season, selected_players, selected_features)
+    trend_section(data_key, season, player_cube, selected_features, benchmark_dict, selected_players, filter_state)
+    acwr_section(data_key, season, selected_players)
 
     # ========== BENCHMARK TÁBLÁZAT ==========
 
     st.header("Benchmark táblázat")
-    bench_df = pd.DataFrame({
-        "Mutató": list(benchmark_dict.keys()),
-        "Benchmark érték": list(benchmark_dict.values())
-    })
-    st.dataframe(bench_df, use_container_width=True)
+    st.dataframe(benchmark_table(benchmarks, benchmark_dict), use_container_width=True)
+
+    export_section(data_key, season, player_avg, player_cube, benchmarks, benchmark_dict, selected_features, selected_players)
+
+    # Az ábra cache statisztikája a futás végén – már az ebben a futásban épített ábrákkal
+    st.sidebar.caption(format_figure_stats())
 
 else:
-    st.info("Kérlek, tölts fel legalább egy Excel fájlt.")
+    st.info("Kérlek, tölts fel legalább egy Excel fájlt – a szezon tára még üres.")
+
+render_panel(diag)
@@ -0,0 +1,70 @@
+# ========== IDŐSOR RITKÍTÁS ==========
+# Sűrű (foglalkozásonkénti) idősorok ritkítása a szerveren, rögzített pontkeretre – a
+# böngészőbe nyomvonalanként legfeljebb ennyi pont kerül, bármekkora a látható tartomány.
+# LTTB (Largest-Triangle-Three-Buckets): vödrönként az a pont marad, amely az előzőleg
+# megtartott pont és a következő vödör átlaga által alkotott háromszöget a legnagyobbra
+# nyitja, így a csúcsok és völgyek – a vonal alakja – megmaradnak. A min/max vödrözés
+# gyorsabb, és a szélsőértékeket garantáltan megtartja.
+
+import numpy as np
+import pandas as pd
+
+LTTB = "lttb"
+MINMAX = "minmax"
+METHODS = {LTTB: "LTTB (alakhű)", MINMAX: "Min/max vödrök"}
+# Ábrázolt mutatónként (alábránként) a böngészőbe küldött pontok felső korlátja
+POINT_BUDGET = 2000
+# Ennél kevesebb pontra egy nyomvonalat sem ritkítunk
+MIN_TRACE_POINTS = 60
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, threshold):
+    # A megtartott pontok indexei (növekvő x szerint rendezett bemenet); az első és az utolsó pont mindig marad
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x, y = _as_float(x), np.asarray(y, dtype=np.float64)
+    # threshold − 2 vödör az első és az utolsó pont között
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax_indices(y, threshold):
+    # Vödrönként a minimum és a maximum helye, eredeti sorrendben
+    n = len(y)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+    buckets = np.arange(n) * (threshold // 2) // n
+    grouped = pd.Series(np.asarray(y, dtype=np.float64)).groupby(buckets)
+    return np.unique(np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy()]))
+
+
+def downsample(x, y, threshold, method=LTTB):
+    # (x, y) → ritkított (x, y); a hiányzó értékek kimaradnak, a bemenet x szerint rendezett
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    idx = minmax_indices(y, threshold) if method == MINMAX else lttb_indices(x, y, threshold)
+    return x[idx], y[idx]
+
+
+def trace_budget(traces, budget=POINT_BUDGET):
+    # Az alábra pontkerete egyenlően a nyomvonalak között
+    return max(MIN_TRACE_POINTS, budget // max(traces, 1))
@@ -0,0 +1,123 @@
+# ========== EXPORT ==========
+# A szűrt aggregátumok (játékosátlagok, heti pivotok, benchmark, ACWR sorok) kiírása
+# több munkalapos Excelbe, vagy táblánként egy CSV / Parquet fájlba egy zip archívumban.
+# A kiírás darabonként, lemezen lévő ideiglenes fájlba történik: az xlsxwriter
+# constant_memory módban soronként ír, a CSV és a Parquet CHUNK_ROWS soros részletekben,
+# így egy több szezonos, több keretes export sem tölti a teljes fájlt a memóriába.
+
+import re
+import tempfile
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+XLSX = "xlsx"
+CSV = "csv"
+PARQUET = "parquet"
+# Formátum → (felirat, MIME típus, kiterjesztés)
+FORMATS = {
+    XLSX: ("Excel (munkalaponként egy tábla)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    CSV: ("CSV (zip, táblánként egy fájl)", "application/zip", "csv.zip"),
+    PARQUET: ("Parquet (zip, táblánként egy fájl)", "application/zip", "parquet.zip"),
+}
+CHUNK_ROWS = 10_000
+# Az Excel munkalapnév legfeljebb 31 karakter, néhány karakter tiltott
+SHEET_NAME_MAX = 31
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def _flat(df):
+    # Az index oszlopként kerül ki; a címkék szöveggé alakulnak
+    df = df.reset_index() if any(name is not None for name in df.index.names) else df.reset_index(drop=True)
+    df.columns = [" / ".join(map(str, col)) if isinstance(col, tuple) else str(col) for col in df.columns]
+    return df
+
+
+def _chunks(df, size=CHUNK_ROWS):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def _sheet_names(names):
+    used = set()
+    result = []
+    for name in names:
+        base = _INVALID_SHEET_CHARS.sub("_", str(name))[:SHEET_NAME_MAX] or "Tábla"
+        candidate, i = base, 2
+        while candidate.lower() in used:
+            suffix = f" ({i})"
+            candidate, i = base[:SHEET_NAME_MAX - len(suffix)] + suffix, i + 1
+        used.add(candidate.lower())
+        result.append(candidate)
+    return result
+
+
+def _cells(chunk):
+    # Excelbe írható Python értékek; a hiányzó cella None (üresen marad)
+    chunk = chunk.copy(deep=False)
+    for col in chunk.columns:
+        if pd.api.types.is_timedelta64_dtype(chunk[col]):
+            chunk[col] = chunk[col].astype(str).where(chunk[col].notna())
+    return chunk.astype(object).where(chunk.notna(), None)
+
+
+def write_xlsx(tables, target):
+    # Soronkénti írás constant_memory módban: munkalaponként csak az aktuális sor van a memóriában
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True})
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"})
+    header_format = workbook.add_format({"bold": True})
+    for sheet, df in zip(_sheet_names(tables), tables.values()):
+        df = _flat(df)
+        worksheet = workbook.add_worksheet(sheet)
+        worksheet.write_row(0, 0, list(df.columns), header_format)
+        dates = [i for i, dtype in enumerate(df.dtypes) if pd.api.types.is_datetime64_any_dtype(dtype)]
+        for col in dates:
+            worksheet.set_column(col, col, 18, date_format)
+        row = 1
+        for chunk in _chunks(df):
+            for values in _cells(chunk).itertuples(index=False, name=None):
+                worksheet.write_row(row, 0, values)
+                row += 1
+    workbook.close()
+
+
+def write_csv_zip(tables, target):
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, df in zip(_sheet_names(tables), tables.values()):
+            with archive.open(f"{name}.csv", "w", force_zip64=True) as entry:
+                # utf-8-sig: az Excel így ismeri fel az ékezeteket
+                entry.write("\ufeff".encode("utf-8"))
+                for i, chunk in enumerate(_chunks(_flat(df))):
+                    entry.write(chunk.to_csv(index=False, header=i == 0).encode("utf-8"))
+
+
+def write_parquet_zip(tables, target):
+    # Parquet fájlonként CHUNK_ROWS soros sorcsoportok
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, df in zip(_sheet_names(tables), tables.values()):
+            df = _flat(df)
+            schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+            with archive.open(f"{name}.parquet", "w", force_zip64=True) as entry:
+                with pq.ParquetWriter(pa.PythonFile(entry, mode="w"), schema) as writer:
+                    for chunk in _chunks(df):
+                        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS = {XLSX: write_xlsx, CSV: write_csv_zip, PARQUET: write_parquet_zip}
+
+
+def export_tables(tables, fmt=XLSX):
+    # tables: {név: DataFrame}; visszaad egy az elejére tekert, lemezen lévő ideiglenes fájlt
+    if fmt not in WRITERS:
+        raise ValueError(f"Ismeretlen export formátum: {fmt}")
+    target = tempfile.TemporaryFile()
+    WRITERS[fmt]({name: df for name, df in tables.items() if df is not None}, target)
+    target.seek(0)
+    return target
+
+
+def export_file_name(stem, fmt):
+    return f"{stem}.{FORMATS[fmt][2]}"
@@ -0,0 +1,36 @@
+# ========== ÁBRA CACHE ==========
+# A kész Plotly ábrák az adathalmaz kulcsa + a releváns szűrők szerint tárolódnak,
+# így egy változatlan diagramot (pl. csak a pizza nézet váltásakor) nem építünk újra.
+# A Streamlit a megjelenítéshez másolatot készít az ábráról, ezért megosztható.
+
+import os
+
+import plotly.graph_objects as go
+
+from shared_cache import LRUCache, freeze, object_size
+
+
+def figure_size(value):
+    # Az ábra a szerializált (JSON) méretével számít – ennyit küld a Streamlit a böngészőnek
+    if isinstance(value, go.Figure):
+        return len(value.to_json().encode())
+    if isinstance(value, (tuple, list)):
+        return sum(figure_size(item) for item in value)
+    return object_size(value)
+
+
+FIGURES = LRUCache(int(os.environ.get("EDZES_FIGURE_CACHE_MB", "128")) * 1024 * 1024, sizeof=figure_size)
+
+
+def cached_figure(kind, dataset_key, build, **filters):
+    return FIGURES.get_or_compute((kind, dataset_key, freeze(filters)), build)
+
+
+def format_figure_stats(cache=FIGURES):
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = 100 * stats["hits"] / lookups if lookups else 0
+    return (
+        f"📈 Ábra cache: {stats['hits']} találat / {stats['misses']} hiány / {stats['evictions']} kiürítés "
+        f"({hit_rate:.0f}%) – {stats['items']} ábra, {stats['bytes'] / 1e6:.1f} / {stats['max_bytes'] / 1e6:.0f} MB"
+    )
@@ -0,0 +1,208 @@
+# ========== PÁRHUZAMOS MUNKAFÜZET-BETÖLTÉS ==========
+# A munkafüzeteket openpyxl read-only (streaming) módban nyitjuk meg, és a
+# fájlokat – egyetlen fájl esetén a lapokat – folyamatkészletben dolgozzuk fel.
+# A már ismert fájlok az ingest_cache-ből jönnek, Excel-olvasás nélkül.
+# fields megadásakor (schema) csak a kért oszlopok készülnek el, egységes néven és
+# végső típussal – a széles GPS exportok többi oszlopából nem lesz DataFrame.
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from ingest_cache import content_hash, get_workbook, put_workbook, read_bytes, stringify_mixed
+from schema import convert, detect_format, field_kind, fields_key, select_columns
+
+MAX_WORKERS = int(os.environ.get("EDZES_INGEST_WORKERS", os.cpu_count() or 1))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # Egyetlen, folyamatonként újrahasznált készlet – a worker indítás költsége csak egyszer jelentkezik
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _rows_to_frame(rows):
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    data = [list(row) for row in rows]
+
+    # A read_excel-hez hasonlóan levágjuk a záró üres sorokat és oszlopokat
+    while data and all(value is None for value in data[-1]):
+        data.pop()
+    width = len(header)
+    while width and header[width - 1] is None and all(row[width - 1] is None for row in data):
+        width -= 1
+    columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header[:width])]
+    df = pd.DataFrame([row[:width] for row in data], columns=columns).infer_objects()
+    # Az üres cellák a read_excel-hez hasonlóan NaN-ként jelenjenek meg
+    object_cols = df.columns[df.dtypes == object]
+    df[object_cols] = df[object_cols].astype(object).where(df[object_cols].notna(), np.nan)
+    # Ugyanaz a típus, mint a cache-ből visszaolvasva
+    return stringify_mixed(df)
+
+
+def _typed_frame(ws, fields, formats):
+    # Csak a kért mezők oszlopai, a fejléc utáni sorokból közvetlenül a végső típusba.
+    # formats: mező → felismert időformátum, a munkafüzet lapjai között megosztva
+    # A lap XML-je egyszer kerül feldolgozásra: a fejléc ugyanabból a bejárásból jön
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    selected = select_columns(header, fields)
+    if not selected:
+        return pd.DataFrame()
+    data = list(rows)
+    while data and all(i >= len(data[-1]) or data[-1][i] is None for i, _ in selected):
+        data.pop()
+    columns = {}
+    for i, name in selected:
+        values = [row[i] if i < len(row) else None for row in data]
+        kind = field_kind(name)
+        if formats.get(name) is None:
+            formats[name] = detect_format(values, kind)
+        columns[name] = convert(values, kind, formats[name])
+    return pd.DataFrame(columns)
+
+
+def _parse_sheet(wb, name, fields, formats):
+    if fields is not None:
+        return _typed_frame(wb[name], fields, formats)
+    return _rows_to_frame(wb[name].iter_rows(values_only=True))
+
+
+def _open(data):
+    return openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+
+
+def _parse_sheets(data, sheet_names=None, fields=None):
+    wb = _open(data)
+    try:
+        names = sheet_names if sheet_names is not None else wb.sheetnames
+        formats = {}
+        return {name: _parse_sheet(wb, name, fields, formats) for name in names}
+    finally:
+        wb.close()
+
+
+def _sheet_names(data):
+    wb = openpyxl.load_workbook(BytesIO(data), read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _cache_key(file_hash, fields):
+    # A típusos, szűkített olvasat külön cache bejegyzés
+    return file_hash if fields is None else f"{file_hash}-{fields_key(fields)}"
+
+
+def _error_text(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def read_workbooks(files, workers=None, fields=None):
+    # Visszaad egy listát a fájlok sorrendjében, elemenként {lapnév: DataFrame}.
+    # fields: egységes mezőnevek (schema) – None esetén minden oszlop, nyers típusokkal
+    workers = workers or MAX_WORKERS
+    contents = [read_bytes(file) for file in files]
+    hashes = [_cache_key(content_hash(data), fields) for data in contents]
+    results = [get_workbook(file_hash) for file_hash in hashes]
+    missing = [i for i, sheets in enumerate(results) if sheets is None]
+
+    if missing:
+        if workers <= 1:
+            for i in missing:
+                results[i] = _parse_sheets(contents[i], fields=fields)
+        elif len(missing) >= workers:
+            # Sok fájl: fájlonként egy feladat, minden munkafüzetet egyszer nyitunk meg
+            pool = _get_pool()
+            futures = {i: pool.submit(_parse_sheets, contents[i], None, fields) for i in missing}
+            for i, future in futures.items():
+                results[i] = future.result()
+        else:
+            # Kevés fájl: lapok szerint is szétosztjuk a munkát
+            pool = _get_pool()
+            futures = {}
+            for i in missing:
+                for name in _sheet_names(contents[i]):
+                    futures[(i, name)] = pool.submit(_parse_sheets, contents[i], [name], fields)
+            for i in missing:
+                results[i] = {}
+            for (i, name), future in futures.items():
+                results[i].update(future.result())
+
+        for i in missing:
+            put_workbook(hashes[i], results[i])
+
+    return results
+
+
+def read_workbook(file, fields=None):
+    return read_workbooks([file], fields=fields)[0]
+
+
+def _iter_parsed(data, fields, workers):
+    if workers <= 1:
+        wb = _open(data)
+        try:
+            formats = {}
+            for name in wb.sheetnames:
+                try:
+                    yield name, _parse_sheet(wb, name, fields, formats), None
+                except Exception as error:
+                    yield name, None, _error_text(error)
+        finally:
+            wb.close()
+        return
+    pool = _get_pool()
+    futures = [(name, pool.submit(_parse_sheets, data, [name], fields)) for name in _sheet_names(data)]
+    for name, future in futures:
+        try:
+            yield name, future.result()[name], None
+        except Exception as error:
+            yield name, None, _error_text(error)
+
+
+def iter_workbook(data, fields=None, workers=None):
+    # Egy munkafüzet lapjai egyenként, a munkafüzet sorrendjében (haladásjelzéshez):
+    # (lapnév, DataFrame, None), hibás lapnál (lapnév, None, hibaüzenet) – egy rossz lap
+    # nem állítja meg a többit. Csak hibátlan munkafüzet kerül a cache-be.
+    key = _cache_key(content_hash(data), fields)
+    cached = get_workbook(key)
+    if cached is not None:
+        for name, df in cached.items():
+            yield name, df, None
+        return
+    sheets = {}
+    failed = False
+    for name, df, error in _iter_parsed(data, fields, workers or MAX_WORKERS):
+        if error is None:
+            sheets[name] = df
+        else:
+            failed = True
+        yield name, df, error
+    if not failed:
+        put_workbook(key, sheets)
+
+
+def dataset_key(files):
+    # A feltöltött fájlok együttes tartalmi azonosítója (sorrendfüggő, mint a betöltés)
+    return content_hash("".join(content_hash(read_bytes(file)) for file in files).encode("ascii"))
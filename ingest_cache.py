@@ -0,0 +1,134 @@
+# ========== OSZLOPOS BETÖLTÉSI CACHE ==========
+# A feltöltött munkafüzetek lapjait Parquet formában tároljuk lemezen, a fájl
+# tartalmának hash-e + a lapnév szerint kulcsolva. Ismert fájl újrafeltöltésekor
+# nem kell újra az openpyxl-en keresztül olvasni az Excelt.
+
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get(
+    "EDZES_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ingest_cache"),
+)
+# Méretkorlát MB-ban; túllépéskor a legrégebben használt munkafüzetek törlődnek (LRU)
+CACHE_MAX_BYTES = int(os.environ.get("EDZES_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def read_bytes(file):
+    # Streamlit UploadedFile, fájlszerű objektum vagy elérési út
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if hasattr(file, "read"):
+        data = file.read()
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return data
+    with open(file, "rb") as f:
+        return f.read()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _sheet_path(file_hash, sheet_name):
+    sheet_key = hashlib.sha1(str(sheet_name).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{file_hash}_{sheet_key}.parquet")
+
+
+def _manifest_path(file_hash):
+    return os.path.join(CACHE_DIR, f"{file_hash}.json")
+
+
+def stringify_mixed(df):
+    # Vegyes típusú (pl. szám + szöveg) object oszlopokat az Arrow nem tud tárolni, ezek
+    # szövegként kerülnek a táblába (a hiányzó értékek maradnak). A friss beolvasás is ezt
+    # alkalmazza, így a cache-ből pontosan ugyanaz jön vissza, mint az Excelből
+    mixed = [col for col in df.columns[df.dtypes == object]
+             if pd.api.types.infer_dtype(df[col], skipna=True).startswith("mixed")]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str)).infer_objects()
+    return df
+
+
+def write_parquet(df, path):
+    tmp_path = path + ".tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except Exception:
+        try:
+            stringify_mixed(df).to_parquet(tmp_path, index=False)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def get_workbook(file_hash):
+    manifest_path = _manifest_path(file_hash)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            sheet_names = json.load(f)["sheets"]
+        sheets = {name: pd.read_parquet(_sheet_path(file_hash, name)) for name in sheet_names}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # LRU: a használat idejét a fájlok módosítási idejében tartjuk nyilván
+    for path in [manifest_path] + [_sheet_path(file_hash, name) for name in sheet_names]:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return sheets
+
+
+def put_workbook(file_hash, sheets):
+    with _lock:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for name, df in sheets.items():
+            if not write_parquet(df, _sheet_path(file_hash, name)):
+                return False
+        tmp_path = _manifest_path(file_hash) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sheets": list(sheets.keys())}, f, ensure_ascii=False)
+        os.replace(tmp_path, _manifest_path(file_hash))
+        _evict()
+    return True
+
+
+def _evict():
+    # Munkafüzetenként csoportosítjuk a fájlokat, és a legrégebben használtakat töröljük,
+    # amíg a teljes méret a korlát alá nem kerül
+    groups = {}
+    for entry in os.scandir(CACHE_DIR):
+        if not entry.is_file() or entry.name.endswith(".tmp"):
+            continue
+        file_hash = entry.name.split("_")[0].split(".")[0]
+        stat = entry.stat()
+        size, last_used, paths = groups.get(file_hash, (0, 0.0, []))
+        groups[file_hash] = (size + stat.st_size, max(last_used, stat.st_mtime), paths + [entry.path])
+
+    total = sum(size for size, _, _ in groups.values())
+    for file_hash, (size, _, paths) in sorted(groups.items(), key=lambda item: item[1][1]):
+        if total <= CACHE_MAX_BYTES:
+            break
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
@@ -0,0 +1,143 @@
+# ========== HÁTTÉR BETÖLTÉSI SOR ==========
+# A feltöltött munkafüzeteket egy háttérszál dolgozza fel (a lapokat az ingest
+# folyamatkészlete olvassa), munkafüzetenként a szezon tárba írva – a dashboard
+# közben használható, és a már betöltött hetek rögtön megjelennek. Fájlonként és
+# laponként követhető állapot; egy hibás lap vagy fájl nem állítja meg a többit.
+# Hibás lapú munkafüzet nem kerül a tárba (a tartalmi kulcsa sem), így javítás vagy
+# újrafeltöltés után a teljes munkafüzet újra betölthető.
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from ingest import iter_workbook
+from ingest_cache import content_hash, read_bytes
+from schema import ALL_FIELDS
+from season_store import add_workbook, season_key, season_workbooks
+
+PENDING = "vár"
+RUNNING = "folyamatban"
+DONE = "kész"
+FAILED = "hiba"
+SKIPPED = "már a tárban"
+# Ennyi lezárt feladatot tartunk meg az állapotkijelzéshez
+HISTORY_SIZE = 50
+POLL_SECONDS = 1.0
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-queue")
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+
+class FileStatus:
+    def __init__(self, name):
+        self.name = name
+        self.state = PENDING
+        self.sheets = {}  # lapnév → None (rendben) vagy hibaüzenet
+        self.error = None
+
+
+class Job:
+    def __init__(self, season, names):
+        self.season = season
+        self.files = [FileStatus(name) for name in names]
+
+    @property
+    def finished(self):
+        return all(status.state not in (PENDING, RUNNING) for status in self.files)
+
+    @property
+    def has_errors(self):
+        return any(status.error or any(status.sheets.values()) for status in self.files)
+
+    def progress(self):
+        return sum(status.state not in (PENDING, RUNNING) for status in self.files) / max(len(self.files), 1)
+
+
+def _run(job, contents):
+    for status, data in zip(job.files, contents):
+        file_hash = content_hash(data)
+        if any(workbook["hash"] == file_hash for workbook in season_workbooks(job.season)):
+            status.state = SKIPPED
+            continue
+        status.state = RUNNING
+        try:
+            sheets = {}
+            for sheet, df, error in iter_workbook(data, fields=ALL_FIELDS):
+                status.sheets[sheet] = error
+                if error is None:
+                    sheets[sheet] = df
+            failed = [sheet for sheet, error in status.sheets.items() if error]
+            if failed:
+                raise ValueError(f"{len(failed)} lap hibás – a munkafüzet nem került a tárba, újrafeltöltéssel újrapróbálható")
+            if not sheets:
+                raise ValueError("egyetlen lap sem olvasható")
+            if add_workbook(job.season, file_hash, status.name, sheets):
+                status.state = DONE
+            elif any(workbook["hash"] == file_hash for workbook in season_workbooks(job.season)):
+                # Közben egy másik feltöltés már a tárba írta
+                status.state = SKIPPED
+            else:
+                raise OSError("a munkafüzet tárba írása nem sikerült")
+        except Exception as error:
+            status.state, status.error = FAILED, f"{type(error).__name__}: {error}"
+
+
+def submit(files, season):
+    # Ugyanaz a feltöltés (szezon + tartalom + feltöltés azonosító) csak egyszer kerül a sorba –
+    # a Streamlit újrafutásai ugyanazt a Job-ot kapják vissza, egy újrafeltöltés viszont új
+    # feladat: a hibás munkafüzetek újrapróbálódnak, a tárban lévők kimaradnak
+    contents = [read_bytes(file) for file in files]
+    names = [getattr(file, "name", None) or f"munkafüzet {i + 1}" for i, file in enumerate(files)]
+    uploads = tuple(getattr(file, "file_id", None) for file in files)
+    key = (season, content_hash("".join(content_hash(data) for data in contents).encode("ascii")), uploads)
+    with _lock:
+        if key in _jobs:
+            return _jobs[key]
+        job = _jobs[key] = Job(season, names)
+        while len(_jobs) > HISTORY_SIZE and next(iter(_jobs.values())).finished:
+            _jobs.popitem(last=False)
+    _executor.submit(_run, job, contents)
+    return job
+
+
+# ---------- állapotkijelzés ----------
+
+_ICONS = {PENDING: "⏳", RUNNING: "🔄", DONE: "✅", FAILED: "❌", SKIPPED: "↩️"}
+
+
+def _render_job(job):
+    st.progress(job.progress(), text=f"Betöltés: {sum(s.state == DONE for s in job.files)} / {len(job.files)} munkafüzet")
+    for status in job.files:
+        line = f"{_ICONS[status.state]} {status.name} – {status.state}"
+        if status.sheets:
+            ok = sum(error is None for error in status.sheets.values())
+            line += f" ({ok} / {len(status.sheets)} lap)"
+        st.caption(line)
+        if status.error:
+            st.error(f"{status.name}: {status.error}")
+        for sheet, error in status.sheets.items():
+            if error:
+                st.warning(f"{status.name} / {sheet}: {error}")
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _progress_fragment(job, data_key):
+    _render_job(job)
+    # Új hét került a tárba, vagy végzett a sor: teljes újrafutás, hogy az ábrák frissüljenek
+    if job.finished or season_key(job.season) != data_key:
+        st.rerun()
+
+
+def upload_panel(files, season, data_key):
+    # Feltöltés a háttérsorba + állapot; amíg fut, másodpercenként frissül (csak ez a rész)
+    if not files:
+        return
+    job = submit(files, season)
+    if job.finished:
+        with st.expander("📥 Betöltés állapota", expanded=job.has_errors):
+            _render_job(job)
+    else:
+        _progress_fragment(job, data_key)
@@ -0,0 +1,151 @@
+# ========== LÉPÉSMÉRÉS ÉS DIAGNOSZTIKA ==========
+# A dashboard futásonként lépésenként rögzíti a falióra-időt, a feldolgozott sorok
+# számát és a csúcs memóriát (tracemalloc). Kikapcsolva a stage() egy közös,
+# üres kontextuskezelőt ad vissza – nincs időmérés, nincs memóriakövetés.
+# A tracemalloc folyamatszintű: egyidejű munkamenetek csúcsai összemosódhatnak, ezért
+# addig fut, amíg legalább egy munkamenetben be van kapcsolva a diagnosztika.
+# A fragmentek önálló újrafutásai nem mérődnek: a futás panelje ilyenkor nem rajzolódik
+# újra, így a lépéseik a teljes futás lezárása után kimaradnak.
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+ENABLED = os.environ.get("EDZES_DIAGNOSTICS", "0") == "1"
+# Ha meg van adva, minden futás lépései ide is kiíródnak (JSON lines)
+LOG_PATH = os.environ.get("EDZES_DIAGNOSTICS_LOG")
+# A munkamenetben megőrzött lépésrekordok száma (JSONL exporthoz)
+HISTORY_SIZE = 2000
+
+# A bekapcsolt diagnosztikájú munkamenetek; az utolsó kikapcsolásakor áll le a követés
+_enabled_sessions = set()
+_tracing_owned = False
+_tracing_lock = threading.Lock()
+
+
+def _start_tracing():
+    global _tracing_owned
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _tracing_owned = True
+
+
+def _set_session_tracing(session, enabled):
+    # Kikapcsoláskor a saját indítású követést leállítjuk – különben minden foglalás lassabb marad –,
+    # de csak ha már egyetlen munkamenet sem mér
+    global _tracing_owned
+    with _tracing_lock:
+        if enabled:
+            _enabled_sessions.add(session)
+            _start_tracing()
+        else:
+            _enabled_sessions.discard(session)
+            if not _enabled_sessions and _tracing_owned and tracemalloc.is_tracing():
+                tracemalloc.stop()
+                _tracing_owned = False
+
+
+class Stage:
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.seconds = None
+        self.peak_bytes = None
+
+
+_NULL_STAGE = nullcontext(Stage("kikapcsolva"))
+
+
+class Diagnostics:
+    def __init__(self, script, enabled=ENABLED, log_path=LOG_PATH, session=None):
+        self.script = script
+        self.enabled = enabled
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.stages = []
+        self.finished = False
+        _set_session_tracing(session, enabled)
+
+    def stage(self, name, rows=None):
+        # with diag.stage("betöltés") as s: ...; s.rows = len(df)
+        # A lezárt futás (fragment újrafutás) lépései nem mérődnek
+        if not self.enabled or self.finished:
+            return _NULL_STAGE
+        return self._measure(name, rows)
+
+    @contextmanager
+    def _measure(self, name, rows):
+        stage = Stage(name, rows)
+        _start_tracing()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - start
+            stage.peak_bytes = max(tracemalloc.get_traced_memory()[1] - base, 0)
+            self.stages.append(stage)
+
+    def records(self):
+        return [
+            {
+                "run": self.run_id,
+                "started": self.started,
+                "script": self.script,
+                "stage": stage.name,
+                "seconds": round(stage.seconds, 6),
+                "rows": stage.rows,
+                "peak_mb": round(stage.peak_bytes / 1e6, 3),
+            }
+            for stage in self.stages
+        ]
+
+    def finish(self):
+        # A futás végén: a lépések a naplófájlba (ha van) – visszaadja a rekordokat
+        records = self.records()
+        self.finished = True
+        if self.enabled and self.log_path and records:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        return records
+
+
+def to_jsonl(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def diagnostics(script):
+    # Oldalsávi kapcsoló + a futás mérője; a kapcsoló alapértéke az EDZES_DIAGNOSTICS
+    enabled = st.sidebar.toggle("🩺 Diagnosztika", value=ENABLED)
+    ctx = get_script_run_ctx()
+    return Diagnostics(script, enabled=enabled, session=ctx.session_id if ctx else None)
+
+
+def render_panel(diag):
+    # Összecsukható oldalsávi panel az aktuális futással + JSONL letöltés a munkamenet előzményeiből
+    if not diag.enabled:
+        return
+    records = diag.finish()
+    history = st.session_state.setdefault("diagnostics_history", [])
+    history.extend(records)
+    del history[:-HISTORY_SIZE]
+
+    with st.sidebar.expander("🩺 Lépések (utolsó futás)", expanded=False):
+        if records:
+            table = pd.DataFrame(records)[["stage", "seconds", "rows", "peak_mb"]]
+            table.columns = ["Lépés", "Idő (s)", "Sorok", "Csúcs (MB)"]
+            st.dataframe(table, hide_index=True, use_container_width=True)
+            st.caption(f"Összesen: {sum(record['seconds'] for record in records):.3f} s")
+        st.download_button("⬇️ JSONL export", to_jsonl(history), file_name="diagnosztika.jsonl",
+                           mime="application/json")
@@ -0,0 +1,67 @@
+# ========== MÁTRIX NORMALIZÁLÁS ==========
+# A teljes játékos × mutató mátrixot egyszerre skálázzuk (NumPy), így a pizza/radar
+# diagramok minden játékos vektorát egy műveletben kapják meg. A referencia sorok
+# (csapatátlag, benchmark) ugyanazokkal a paraméterekkel skálázódnak, mint a keret.
+
+import numpy as np
+import pandas as pd
+
+SCALE_MODES = {
+    "minmax": "Min–max (mutatónként)",
+    "percentile": "Csapat percentilis",
+    "benchmark": "Benchmark-arány",
+}
+
+
+def _minmax(values, extra):
+    if not len(values):
+        # Üres kijelölés (nincs játékos / hét): nincs tartomány, a referenciák sem skálázhatók
+        return values, np.full(extra.shape, np.nan)
+    low = np.nanmin(values, axis=0)
+    span = np.nanmax(values, axis=0) - low
+    # Ha egy mutató minden játékosnál azonos, 0-ra skálázunk (mint a normalize_series)
+    span = np.where(span == 0, np.nan, span)
+    scale = lambda x: np.where(np.isnan(span), np.where(np.isnan(x), np.nan, 0.0), (x - low) / span)
+    return scale(values), scale(extra)
+
+
+def _percentile(values, extra):
+    # Hányadrészénél nagyobb vagy egyenlő az érték a keret (nem hiányzó) értékeinek, mutatónként
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    def rank(x):
+        below = (values[None, :, :] <= x[:, None, :]) & valid[None, :, :]
+        ranks = below.sum(axis=1) / np.where(counts == 0, np.nan, counts)
+        return np.where(np.isnan(x), np.nan, ranks)
+    return rank(values), rank(extra)
+
+
+def _benchmark(values, extra, benchmark):
+    benchmark = np.where(benchmark == 0, np.nan, benchmark)
+    return values / benchmark, extra / benchmark
+
+
+def scale_matrix(matrix, mode="minmax", benchmark=None, extra=None):
+    # matrix: játékos × mutató DataFrame; extra: további sorok (pl. csapatátlag, benchmark)
+    # Visszaadja a skálázott mátrixot és a skálázott extra sorokat
+    metrics = matrix.columns
+    values = matrix.to_numpy(dtype=np.float64, na_value=np.nan)
+    extra = pd.DataFrame(columns=metrics, dtype=np.float64) if extra is None else extra.reindex(columns=metrics)
+    extra_values = extra.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    if mode == "minmax":
+        scaled, scaled_extra = _minmax(values, extra_values)
+    elif mode == "percentile":
+        scaled, scaled_extra = _percentile(values, extra_values)
+    elif mode == "benchmark":
+        if benchmark is None:
+            raise ValueError("A benchmark-arányos skálázáshoz benchmark értékek kellenek.")
+        bench_values = pd.Series(benchmark).reindex(metrics).to_numpy(dtype=np.float64, na_value=np.nan)
+        scaled, scaled_extra = _benchmark(values, extra_values, bench_values)
+    else:
+        raise ValueError(f"Ismeretlen skálázási mód: {mode}")
+
+    return (
+        pd.DataFrame(scaled, index=matrix.index, columns=metrics),
+        pd.DataFrame(scaled_extra, index=extra.index, columns=metrics),
+    )
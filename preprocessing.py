@@ -0,0 +1,60 @@
+# ========== ELŐFELDOLGOZÁS ==========
+# A heti export típuskonverziói (időpont, időtartam, mutatók) – az app_safe és a
+# teljesítménymérés közösen használja. Sémás (fields) betöltés után az oszlopok
+# már a végső típusúak – ilyenkor a konverziók üres lépések. Az időformátumot
+# (timeparse) táblánként egyszer ismerjük fel. A preprocess_workbooks eredménye a
+# nyers lapok mellett az ingest cache-be kerül: csak az új fájlok fizetik meg az árát.
+
+import pandas as pd
+
+from ingest import read_workbooks
+from ingest_cache import content_hash, get_workbook, put_workbook, read_bytes
+from schema import fields_key
+from timeparse import detect_datetime_format, detect_duration_format, parse_datetimes, parse_durations
+
+CONVERT_COLUMNS = [
+    "Átlagos pulzus [bpm]", "Izomterhelés", "HRV (RMSSD)",
+    "Max sebesség [km/h]", "Sprintek száma", "Zóna 5 gyorsulás",
+    "Zóna 5 lassulás", "Zóna 5-6 táv"
+]
+# Az előfeldolgozáshoz (és az app_safe-hez) szükséges oszlopok – a betöltés csak ezeket olvassa
+PREPROCESS_FIELDS = ["Játékos neve", "Kezdési idő", "Időtartam"] + CONVERT_COLUMNS
+# A preprocess kimenetének változásakor növelendő – a cache kulcsának része
+PREPROCESS_VERSION = 1
+
+
+def safe_convert(df, col):
+    if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def preprocess(df):
+    # Az üres nevű sorok szűrése már új táblát ad; ha nincs ilyen, elég egy sekély másolat
+    # (az oszlopok cseréje nem írja felül a hívó tábláját)
+    named = df["Játékos neve"].notna()
+    df = df[named] if not named.all() else df.copy(deep=False)
+    if "Kezdési idő" in df.columns:
+        start = df["Kezdési idő"]
+        df["Kezdési idő"] = parse_datetimes(start, detect_datetime_format(start))
+    for col in CONVERT_COLUMNS:
+        df = safe_convert(df, col)
+
+    if "Időtartam" in df.columns:
+        duration = df["Időtartam"]
+        df["Időtartam"] = parse_durations(duration, detect_duration_format(duration))
+        df["Időtartam perc"] = df["Időtartam"].dt.total_seconds() / 60
+
+    return df
+
+
+def preprocess_workbooks(files, fields=PREPROCESS_FIELDS):
+    # Fájlonként {lapnév: előfeldolgozott tábla}, a fájlok sorrendjében
+    keys = [f"{content_hash(read_bytes(file))}-{fields_key(fields)}-p{PREPROCESS_VERSION}" for file in files]
+    results = [get_workbook(key) for key in keys]
+    missing = [i for i, sheets in enumerate(results) if sheets is None]
+    if missing:
+        for i, sheets in zip(missing, read_workbooks([files[i] for i in missing], fields=fields)):
+            results[i] = {name: preprocess(df) for name, df in sheets.items() if "Játékos neve" in df.columns}
+            put_workbook(keys[i], results[i])
+    return results
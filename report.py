@@ -0,0 +1,180 @@
+# ========== PARANCSSORI RIPORT ==========
+# Heti munkafüzetekből játékosonként egy statikus HTML riport + csapatösszesítő,
+# Streamlit nélkül. A betöltés (ingest), a kocka (aggregation), a benchmark és az
+# ábraépítők ugyanazok, mint a dashboardban; a renderelés folyamatkészletben fut.
+#
+#   python report.py het1.xlsx het2.xlsx --out riportok
+#   python report.py --squad U19 u19/*.xlsx --squad U17 u17/*.xlsx --out riportok
+#   python report.py --squad U19 u19/*.xlsx --profile felnott_abszolut --profile U19=u19
+
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from aggregation import build_cube, max_values, player_means, tag_weeks, team_means, weekly_means
+from benchmarks import DEFAULT_PROFILE, benchmark_table, compute_benchmarks, list_profiles, load_profile
+from charts import plot_bar, plot_player_pizza, plot_pizza, plot_trend
+from ingest import MAX_WORKERS, read_workbooks
+from schema import ALL_FIELDS, canonical_name, metric_columns
+
+PLOTLY_JS = "plotly.min.js"
+
+
+def _slug(name):
+    return re.sub(r"[^\w.-]+", "_", str(name))
+
+
+def load_squad(files, metrics=None, profile=None):
+    # Ugyanaz a betöltés, mint a V11–V13 dashboardokban: lapnév = hét, "meccs" lap = meccs,
+    # csak a séma oszlopai, egységes néven
+    frames = []
+    for sheets in read_workbooks(files, fields=ALL_FIELDS):
+        for sheet, df in sheets.items():
+            df["Forrás"] = sheet
+            frames.append(df)
+    data = tag_weeks(pd.concat(frames, ignore_index=True))
+    cube = build_cube(data, metric_columns(data.columns))
+
+    profile = profile or load_profile()
+    benchmarks = compute_benchmarks(profile, cube)
+    numeric_columns = cube["sum"].columns.tolist()
+    metrics = [canonical_name(m) for m in metrics if canonical_name(m) in numeric_columns] if metrics else \
+        [col for col in numeric_columns if col in profile.values] or numeric_columns
+    players = sorted(cube.index.get_level_values("Játékos neve").dropna().unique())
+    return {
+        "metrics": metrics,
+        "players": players,
+        "player_avg": player_means(cube).reindex(index=players, columns=metrics),
+        "team_avg": team_means(cube).reindex(metrics),
+        "benchmarks": benchmarks,
+        "benchmark": benchmarks["level"].reindex(metrics),
+        "team_weekly": weekly_means(cube).reindex(columns=metrics),
+        "bm_weekly": benchmarks["weekly"].reindex(columns=metrics),
+        "pivots": {metric: weekly_means(cube, metric) for metric in metrics},
+        "max_val": max_values(cube)[metrics].max(),
+    }
+
+
+def _page(title, body, js_path):
+    return (
+        f'<!DOCTYPE html>\n<html lang="hu"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+        f'<script src="{js_path}"></script>'
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}</style></head>"
+        f"<body><h1>{html.escape(title)}</h1>{body}</body></html>\n"
+    )
+
+
+def _figure(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+
+def _write(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def render_player(squad, player, out_dir, data):
+    # data: a load_squad eredményének a játékosra szűkített része
+    parts = [f'<p><a href="index.html">← {html.escape(squad)} összesítő</a></p>']
+    table = pd.DataFrame({
+        "Játékos": data["values"],
+        "Csapatátlag": data["team_avg"],
+        "Benchmark": data["benchmark"],
+    }).round(2)
+    parts.append("<h2>Átlagok</h2>" + table.to_html())
+    parts.append(_figure(plot_player_pizza(player, data["values"], data["max_val"])))
+    parts.append("<h2>Trendek</h2>")
+    for metric, pivot in data["pivots"].items():
+        parts.append(_figure(plot_trend(metric, pivot, data["team_weekly"][metric], data["bm_weekly"][metric])))
+    return _write(os.path.join(out_dir, f"{_slug(player)}.html"),
+                  _page(f"{squad} – {player}", "".join(parts), f"../{PLOTLY_JS}"))
+
+
+def render_team(squad, out_dir, data):
+    links = "".join(
+        f'<li><a href="{html.escape(_slug(player))}.html">{html.escape(str(player))}</a></li>'
+        for player in data["players"]
+    )
+    parts = [f"<h2>Játékosok</h2><ul>{links}</ul>"]
+    parts.append("<h2>Benchmark táblázat</h2>" + benchmark_table(data["benchmarks"], data["metrics"]).to_html(index=False))
+    benchmark_r = (data["benchmark"] / data["max_val"] * 100).tolist()
+    parts.append(_figure(plot_pizza(data["player_avg"], data["team_avg"], benchmark_r, data["max_val"], data["metrics"])))
+    for metric in data["metrics"]:
+        parts.append(_figure(plot_bar(metric, data["player_avg"][metric], data["team_avg"][metric], data["benchmark"][metric])))
+    return _write(os.path.join(out_dir, "index.html"),
+                  _page(f"{squad} – csapatösszesítő", "".join(parts), f"../{PLOTLY_JS}"))
+
+
+def _player_data(data, player):
+    return {
+        "values": data["player_avg"].loc[player],
+        "team_avg": data["team_avg"],
+        "benchmark": data["benchmark"],
+        "max_val": data["max_val"],
+        "team_weekly": data["team_weekly"],
+        "bm_weekly": data["bm_weekly"],
+        "pivots": {metric: pivot[[player]] for metric, pivot in data["pivots"].items() if player in pivot.columns},
+    }
+
+
+def generate_reports(squads, out_dir, metrics=None, workers=None, profiles=None):
+    # squads: {csapatnév: [munkafüzetek]}; profiles: {csapatnév vagy None (alap): profilnév};
+    # visszaadja a megírt fájlok listáját
+    profiles = profiles or {}
+    os.makedirs(out_dir, exist_ok=True)
+    _write(os.path.join(out_dir, PLOTLY_JS), get_plotlyjs())
+
+    with ProcessPoolExecutor(max_workers=workers or MAX_WORKERS,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = []
+        for squad, files in squads.items():
+            data = load_squad(files, metrics, load_profile(profiles.get(squad) or profiles.get(None) or DEFAULT_PROFILE))
+            squad_dir = os.path.join(out_dir, _slug(squad))
+            os.makedirs(squad_dir, exist_ok=True)
+            futures.append(pool.submit(render_team, squad, squad_dir, data))
+            for player in data["players"]:
+                futures.append(pool.submit(render_player, squad, player, squad_dir, _player_data(data, player)))
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statikus HTML riportok heti edzésterhelés munkafüzetekből.")
+    parser.add_argument("files", nargs="*", help="heti .xlsx munkafüzetek (egy csapat)")
+    parser.add_argument("--squad", nargs="+", action="append", metavar=("NÉV", "FÁJL"),
+                        help="csapat neve és munkafüzetei; többször is megadható")
+    parser.add_argument("--out", default="riportok", help="kimeneti könyvtár (alap: riportok)")
+    parser.add_argument("--metrics", nargs="+", help="mutatók (alap: a benchmarkkal rendelkezők)")
+    parser.add_argument("--profile", action="append", default=[], metavar="[CSAPAT=]PROFIL",
+                        help=f"benchmark profil (benchmark_profiles/), csapatonként is; alap: {DEFAULT_PROFILE}")
+    parser.add_argument("--workers", type=int, help=f"renderelő folyamatok száma (alap: {MAX_WORKERS})")
+    args = parser.parse_args(argv)
+
+    squads = {squad[0]: squad[1:] for squad in args.squad or []}
+    if args.files:
+        squads.setdefault("csapat", []).extend(args.files)
+    if not squads or not all(squads.values()):
+        parser.error("legalább egy munkafüzet kell (csapatonként is)")
+
+    start = time.perf_counter()
+    profiles = {}
+    for item in args.profile:
+        squad, _, name = item.rpartition("=")
+        profiles[squad or None] = name
+    missing = sorted(set(profiles.values()) - set(list_profiles()))
+    if missing:
+        parser.error(f"ismeretlen benchmark profil: {', '.join(missing)}")
+    paths = generate_reports(squads, args.out, args.metrics, args.workers, profiles)
+    print(f"{len(paths)} riport elkészült ({len(squads)} csapat) {time.perf_counter() - start:.1f} s alatt: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
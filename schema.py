@@ -0,0 +1,126 @@
+# ========== OSZLOPSÉMA ==========
+# A heti exportok két oszlopnév-generációja (v14: "Név", "Teljes táv (m)", ...;
+# V12/V13/app_safe: "Játékos neve", "Teljes táv [m]", ...) egységes nevekre és
+# típusokra képezve. A betöltés ez alapján csak a szükséges oszlopokat olvassa,
+# és rögtön a végső típusra alakítja őket. Új oszlop = új sor a FIELDS-ben.
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from timeparse import detect_datetime_format, detect_duration_format, parse_datetimes, parse_durations
+
+TEXT = "text"
+DATETIME = "datetime"
+DURATION = "duration"
+FLOAT = "float"
+INT = "int"
+
+# Egységes név → (régi/alternatív nevek, típus)
+FIELDS = {
+    "Játékos neve": (("Név",), TEXT),
+    "Kezdési idő": ((), DATETIME),
+    "Időtartam": ((), DURATION),
+    "Teljes táv [m]": (("Teljes táv (m)",), FLOAT),
+    "Táv/perc [m/min]": (("Táv/perc",), FLOAT),
+    "Táv zóna 4 [m]": (("Táv zóna 4 (m)",), FLOAT),
+    "Táv zóna 5 [m]": (("Táv zóna 5 (m)",), FLOAT),
+    "Sprint szám": ((), INT),
+    "Sprintek száma": ((), INT),
+    "Gyorsulások száma": ((), INT),
+    "Lassítások száma": ((), INT),
+    "Izomterhelés": ((), FLOAT),
+    "Edzésterhelés": ((), FLOAT),
+    "Max sebesség [km/h]": (("Max sebesség",), FLOAT),
+    "Átlagos pulzus [bpm]": ((), INT),
+    "HRV (RMSSD)": ((), FLOAT),
+    "Zóna 5 gyorsulás": ((), INT),
+    "Zóna 5 lassulás": ((), INT),
+    "Zóna 5-6 táv": ((), FLOAT),
+}
+# A séma változásakor növelendő – a betöltési cache kulcsának része
+SCHEMA_VERSION = 1
+
+ALL_FIELDS = list(FIELDS)
+METRICS = [name for name, (_, kind) in FIELDS.items() if kind in (FLOAT, INT)]
+
+_CANONICAL = {alias: name for name, (aliases, _) in FIELDS.items() for alias in (name, *aliases)}
+
+
+def canonical_name(column):
+    return _CANONICAL.get(column, column)
+
+
+def metric_columns(columns):
+    # A táblában meglévő mutatók a regiszter sorrendjében
+    present = set(columns)
+    return [name for name in METRICS if name in present]
+
+
+def select_columns(header, fields=ALL_FIELDS):
+    # [(oszlopindex, egységes név)] a kért mezőkre; ismétlődő név esetén az első nyer
+    wanted = set(fields)
+    selected = {}
+    for i, column in enumerate(header):
+        name = _CANONICAL.get(column)
+        if name in wanted and name not in selected:
+            selected[name] = i
+    return [(i, name) for name, i in selected.items()]
+
+
+def source_columns(available, fields):
+    # A fájlban ténylegesen szereplő oszlopnevek a kért egységes mezőkhöz (régi tárakhoz is)
+    wanted = {canonical_name(field) for field in fields}
+    return [column for column in available if canonical_name(column) in wanted]
+
+
+def canonicalize(df):
+    # Régi nevű oszlopok átnevezése (ütközésnél az egységes nevű oszlop marad)
+    renames = {col: canonical_name(col) for col in df.columns if canonical_name(col) != col}
+    renames = {old: new for old, new in renames.items() if new not in df.columns}
+    return df.rename(columns=renames) if renames else df
+
+
+def fields_key(fields):
+    # Rövid azonosító a mezőlistához + sémaverzióhoz (cache kulcs)
+    text = f"{SCHEMA_VERSION}:" + ",".join(fields)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+
+
+def _to_float(values):
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Szöveges cellák: ami nem szám, az NaN (mint a korábbi safe_convert)
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def detect_format(values, kind):
+    # Időpont/időtartam mezőknél a cellák formátuma (fájlonként egyszer); más mezőnél None
+    if kind == DATETIME:
+        return detect_datetime_format(values)
+    if kind == DURATION:
+        return detect_duration_format(values)
+    return None
+
+
+def convert(values, kind, fmt=None):
+    # Nyers cellaértékek listája → a mező végső típusú oszlopa; fmt: a detect_format eredménye
+    if kind == FLOAT:
+        return _to_float(values)
+    if kind == INT:
+        array = _to_float(values)
+        if not np.isnan(array).any() and np.array_equal(array, np.round(array)):
+            return array.astype(np.int64)
+        return array
+    if kind == DATETIME:
+        return parse_datetimes(values, fmt)
+    if kind == DURATION:
+        return parse_durations(values, fmt)
+    series = pd.Series(values, dtype=object)
+    return series.where(series.notna(), np.nan)
+
+
+def field_kind(name):
+    return FIELDS[name][1]
@@ -0,0 +1,156 @@
+# ========== SZEZON TÁR ==========
+# A teljes szezon helyi Parquet adathalmazban él: munkafüzetenként egy fájl
+# (az összes lapjával, "Forrás" = lapnév), plusz egy manifest. Új hét feltöltésekor
+# csak az új munkafüzet lapjait olvassuk be és fűzzük hozzá; a dashboard feltöltés
+# nélkül is megnyitható a tárból. A tár egységes (schema) oszlopneveket és típusokat
+# tárol; a régebbi, nyers nevű munkafüzeteket olvasáskor nevezzük át.
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from ingest import read_workbooks
+from ingest_cache import content_hash, read_bytes, write_parquet
+from schema import ALL_FIELDS, canonicalize, source_columns
+
+STORE_DIR = os.environ.get(
+    "EDZES_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".season_store"),
+)
+DEFAULT_SEASON = "alap"
+
+_lock = threading.Lock()
+
+
+def _season_dir(season):
+    return os.path.join(STORE_DIR, re.sub(r"[^\w.-]+", "_", season))
+
+
+def _manifest_path(season):
+    return os.path.join(_season_dir(season), "manifest.json")
+
+
+def _read_manifest(season):
+    try:
+        with open(_manifest_path(season), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"season": season, "workbooks": []}
+
+
+def _write_manifest(season, manifest):
+    tmp_path = _manifest_path(season) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, _manifest_path(season))
+
+
+def _file_name(file):
+    return os.path.basename(getattr(file, "name", None) or str(file))
+
+
+def list_seasons():
+    if not os.path.isdir(STORE_DIR):
+        return []
+    return sorted(
+        _read_manifest(entry.name)["season"]
+        for entry in os.scandir(STORE_DIR)
+        if entry.is_dir() and os.path.exists(os.path.join(entry.path, "manifest.json"))
+    )
+
+
+def season_workbooks(season):
+    return _read_manifest(season)["workbooks"]
+
+
+def season_sheets(season):
+    # A szezon lapnevei ("Forrás") tárbeli sorrendben, a manifestből – sorok olvasása nélkül
+    return list(dict.fromkeys(sheet for workbook in season_workbooks(season) for sheet in workbook["sheets"]))
+
+
+def season_key(season):
+    # A tár tartalmi azonosítója – cache kulcsnak; üres szezonra None
+    hashes = [workbook["hash"] for workbook in season_workbooks(season)]
+    return content_hash("".join(hashes).encode("ascii")) if hashes else None
+
+
+def append_workbooks(files, season=DEFAULT_SEASON):
+    # Csak a tárban még nem szereplő munkafüzeteket olvassuk be; visszaadja az újak számát
+    with _lock:
+        manifest = _read_manifest(season)
+        known = {workbook["hash"] for workbook in manifest["workbooks"]}
+        new_files = []
+        for file in files:
+            file_hash = content_hash(read_bytes(file))
+            if file_hash not in known:
+                known.add(file_hash)
+                new_files.append((file, file_hash))
+        if not new_files:
+            return 0
+
+        parsed = read_workbooks([file for file, _ in new_files], fields=ALL_FIELDS)
+        added = sum(_store_workbook(manifest, season, file_hash, _file_name(file), sheets)
+                    for (file, file_hash), sheets in zip(new_files, parsed))
+        _write_manifest(season, manifest)
+        return added
+
+
+def _store_workbook(manifest, season, file_hash, name, sheets):
+    os.makedirs(_season_dir(season), exist_ok=True)
+    frames = []
+    for sheet, df in sheets.items():
+        df["Forrás"] = sheet
+        frames.append(df)
+    path = os.path.join(_season_dir(season), f"{file_hash}.parquet")
+    if not write_parquet(pd.concat(frames, ignore_index=True), path):
+        return False
+    manifest["workbooks"].append({
+        "hash": file_hash,
+        "name": name,
+        "sheets": list(sheets.keys()),
+        "added": datetime.now().isoformat(timespec="seconds"),
+    })
+    return True
+
+
+def add_workbook(season, file_hash, name, sheets):
+    # Egy már beolvasott munkafüzet ({lapnév: tábla}) hozzáadása – a háttérsor
+    # munkafüzetenként hívja, így a kész hetek rögtön láthatók. False, ha már a tárban van
+    with _lock:
+        manifest = _read_manifest(season)
+        if any(workbook["hash"] == file_hash for workbook in manifest["workbooks"]):
+            return False
+        if not _store_workbook(manifest, season, file_hash, name, sheets):
+            return False
+        _write_manifest(season, manifest)
+        return True
+
+
+def season_path(season, name):
+    # Származtatott állományok (pl. ACWR állapot) helye a szezon könyvtárában
+    os.makedirs(_season_dir(season), exist_ok=True)
+    return os.path.join(_season_dir(season), name)
+
+
+def load_workbooks(season, hashes, columns=None):
+    # A megadott munkafüzetek sorai; columns esetén csak a munkafüzetben meglévő oszlopok
+    frames = []
+    for file_hash in hashes:
+        path = os.path.join(_season_dir(season), f"{file_hash}.parquet")
+        if columns is not None:
+            names = pq.read_schema(path).names
+            frames.append(canonicalize(pd.read_parquet(path, columns=source_columns(names, columns))))
+        else:
+            frames.append(canonicalize(pd.read_parquet(path)))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_season(season=DEFAULT_SEASON, columns=None):
+    return load_workbooks(season, [workbook["hash"] for workbook in season_workbooks(season)], columns)
@@ -0,0 +1,125 @@
+# ========== KÖZÖS, KORLÁTOS CACHE ==========
+# A Streamlit egy folyamatban szolgálja ki az összes munkamenetet; ez a modul-szintű
+# cache tartalmi hash szerint osztja meg az adathalmazokat a munkamenetek között,
+# globális memóriakerettel és LRU kiürítéssel. A visszaadott objektumok közösek –
+# a hívók nem módosíthatják őket helyben.
+
+import functools
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def object_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(object_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    def __init__(self, max_bytes, sizeof=object_size):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.total_bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._items[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        # Kulcsonkénti zár: ha két munkamenet ugyanazt kéri, csak az egyik számol. A zár
+        # [zár, várakozók] párként él, és az utolsó használója veszi ki – találatnál és
+        # hibás számolásnál is, így a zártábla nem nő a kulcsokkal
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                with self._lock:
+                    if key in self._items:
+                        self._items.move_to_end(key)
+                        self.hits += 1
+                        return self._items[key][0]
+                    self.misses += 1
+                return self.put(key, compute())
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    self._key_locks.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+DATASETS = LRUCache(int(os.environ.get("EDZES_SHARED_CACHE_MB", "1024")) * 1024 * 1024)
+
+
+def shared_cache(namespace, cache=DATASETS):
+    # Dekorátor: az első pozicionális argumentum a tartalmi kulcs (pl. dataset_key / season_key)
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(key, *args, **kwargs):
+            return cache.get_or_compute((namespace, key), lambda: func(key, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def freeze(value):
+    # Szűrőállapot (listák, szótárak) → hash-elhető cache kulcs
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return tuple(sorted(freeze(item) for item in value))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def format_stats(cache=DATASETS):
+    stats = cache.stats()
+    return (
+        f"🗄️ Közös cache: {stats['hits']} találat / {stats['misses']} hiány / "
+        f"{stats['evictions']} kiürítés – {stats['bytes'] / 1e6:.1f} / {stats['max_bytes'] / 1e6:.0f} MB"
+    )
@@ -0,0 +1,140 @@
+# ========== JÁTÉKOS HASONLÓSÁG ==========
+# "Kinek a terhelési profilja hasonlít leginkább X-éhez?" – a tár összes szezonjának
+# (keretének) játékosai egy (szezon, játékos) × mutató átlagmátrixban. A mátrix
+# szűrőállapotonként (időszak, típus, mutatók, skálázás) egyszer készül el és egyszer
+# skálázódik; a távolságmátrix módszerenként egyszer számolódik, a közös cache-ben
+# tárolva. Egy lekérdezés így csak egy sor részleges rendezése.
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+
+from arrow_store import PLAYER_COL, TIME_COL, scan
+from normalization import scale_matrix
+from season_store import list_seasons, season_key
+from shared_cache import DATASETS, freeze
+
+COSINE = "cosine"
+EUCLIDEAN = "euclidean"
+METHODS = {COSINE: "Koszinusz (profil alakja)", EUCLIDEAN: "Euklideszi (szint + alak)"}
+# A pizza skálázásai közül a keretfüggetlen benchmark-arány nem értelmezhető szezonok között
+SCALES = ("minmax", "percentile")
+# "Utolsó hónap": szezononként a legutolsó foglalkozás előtti ennyi nap
+WINDOW_DAYS = 30
+# Ennél kevesebb foglalkozással rendelkező játékos nem kerül a mátrixba
+MIN_SESSIONS = 3
+
+SEASON = "Szezon"
+PLAYER = "Játékos"
+SESSIONS = "Foglalkozások"
+DISTANCE = "Távolság"
+SIMILARITY = "Hasonlóság"
+
+
+def store_key(seasons=None):
+    # A tár (vagy a megadott szezonok) tartalmi azonosítója – új hét bármelyik szezonban → új kulcs
+    seasons = list_seasons() if seasons is None else seasons
+    return tuple((season, season_key(season)) for season in seasons)
+
+
+def _periods(seasons, window_days):
+    # Szezononként (kezdet, vég): a szezon utolsó foglalkozásáig visszamenő ablak
+    periods = {}
+    for season in seasons:
+        table = scan(season, columns=[TIME_COL])
+        last = pc.max(table[TIME_COL]).as_py() if TIME_COL in table.column_names else None
+        if last is not None:
+            periods[season] = (last - pd.Timedelta(days=window_days), last)
+    return periods
+
+
+def player_profiles(seasons, metrics, window_days=None, tipus=None, player_col=PLAYER_COL):
+    # (szezon, játékos) × mutató foglalkozásátlag + foglalkozásszám; az átlagolás az Arrow
+    # táblán fut, csak a kért oszlopok és időszak sorai kerülnek a memóriába
+    period = _periods(seasons, window_days) if window_days else None
+    frames = []
+    for season in seasons:
+        if period is not None and season not in period:
+            continue
+        table = scan(season, tipus=tipus, columns=[player_col, *metrics], period=period)
+        present = [metric for metric in metrics if metric in table.column_names]
+        if player_col not in table.column_names or not table.num_rows:
+            continue
+        table = table.filter(pc.is_valid(table[player_col]))
+        grouped = table.group_by(player_col).aggregate([(metric, "mean") for metric in present] + [([], "count_all")])
+        df = grouped.to_pandas().rename(columns={f"{metric}_mean": metric for metric in present})
+        df = df.rename(columns={player_col: PLAYER, "count_all": SESSIONS})
+        df.insert(0, SEASON, season)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=[SEASON, PLAYER, SESSIONS, *metrics]).set_index([SEASON, PLAYER])
+    profiles = pd.concat(frames, ignore_index=True).set_index([SEASON, PLAYER]).sort_index()
+    return profiles.reindex(columns=[SESSIONS, *metrics])
+
+
+def build_index(profiles, metrics, scale="minmax", min_sessions=MIN_SESSIONS):
+    # Skálázott vektorok: a minden játékosnál hiányzó mutató kimarad, az egyes hiányzó
+    # értékek a mutató átlagát kapják (nem húzzák egyik irányba sem a távolságot)
+    profiles = profiles[profiles[SESSIONS] >= min_sessions]
+    metrics = [metric for metric in metrics if profiles[metric].notna().any()]
+    if profiles.empty or not metrics:
+        return {"profiles": profiles, "metrics": metrics, "vectors": np.zeros((len(profiles), len(metrics)))}
+    scaled, _ = scale_matrix(profiles[metrics], scale)
+    vectors = scaled.to_numpy(dtype=np.float64, na_value=np.nan)
+    vectors = np.where(np.isnan(vectors), np.nanmean(vectors, axis=0, keepdims=True), vectors)
+    return {"profiles": profiles, "metrics": metrics, "vectors": np.nan_to_num(vectors)}
+
+
+def distance_matrix(vectors, method=COSINE):
+    # Teljes n × n távolságmátrix egy mátrixszorzással
+    if method == COSINE:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = vectors / np.where(norms == 0, 1, norms)
+        return np.clip(1 - unit @ unit.T, 0, 2)
+    if method == EUCLIDEAN:
+        squared = (vectors ** 2).sum(axis=1)
+        return np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2 * vectors @ vectors.T, 0))
+    raise ValueError(f"Ismeretlen hasonlósági módszer: {method}")
+
+
+def cached_similarity(key, seasons, metrics, window_days=None, tipus=None, scale="minmax", method=COSINE):
+    # key: store_key(seasons). Visszaadja (index, távolságmátrix); a mátrix szűrőállapotonként,
+    # a távolság ezen felül módszerenként egyszer számolódik
+    state = freeze(dict(metrics=list(metrics), window_days=window_days, tipus=tipus, scale=scale))
+    index = DATASETS.get_or_compute(
+        ("hasonlosag", key, state),
+        lambda: build_index(player_profiles(seasons, metrics, window_days, tipus), metrics, scale))
+    distances = DATASETS.get_or_compute(("hasonlosag-tavolsag", key, state, method),
+                                        lambda: distance_matrix(index["vectors"], method))
+    return index, distances
+
+
+def nearest(index, distances, season, player, k=10, seasons=None):
+    # A (szezon, játékos) k legközelebbi szomszédja, önmaga nélkül; seasons: a keresés szűkítése
+    profiles = index["profiles"]
+    position = profiles.index.get_indexer([(season, player)])[0]
+    if position < 0:
+        raise KeyError(f"Nincs elég foglalkozás a hasonlósághoz: {player} ({season})")
+    row = distances[position].copy()
+    row[position] = np.inf
+    if seasons is not None:
+        row[~profiles.index.get_level_values(SEASON).isin(seasons)] = np.inf
+    k = min(k, int(np.isfinite(row).sum()))
+    if k <= 0:
+        return profiles.iloc[:0].reset_index().assign(**{DISTANCE: []})
+    candidates = np.argpartition(row, k - 1)[:k]
+    order = candidates[np.argsort(row[candidates], kind="stable")]
+    result = profiles.iloc[order].reset_index()
+    result.insert(2, DISTANCE, row[order])
+    return result
+
+
+def similarity_table(index, distances, season, player, k=10, method=COSINE, seasons=None):
+    # A megjelenítendő tábla: a referencia játékos az első sorban, koszinusznál hasonlósággal (1 − távolság)
+    neighbours = nearest(index, distances, season, player, k, seasons)
+    reference = index["profiles"].loc[[(season, player)]].reset_index()
+    reference.insert(2, DISTANCE, 0.0)
+    result = pd.concat([reference, neighbours], ignore_index=True)
+    if method == COSINE:
+        result.insert(2, SIMILARITY, 1 - result.pop(DISTANCE))
+    return result[[SEASON, PLAYER, result.columns[2], SESSIONS, *index["metrics"]]]
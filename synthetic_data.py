@@ -0,0 +1,121 @@
+# ========== SZINTETIKUS HETI MUNKAFÜZETEK ==========
+# Valósághű, de kitalált heti exportok a teljesítménymérésekhez és kipróbáláshoz:
+# hetente egy munkafüzet, lapjai az edzések + a meccs, soronként egy játékos egy
+# foglalkozása, a valódi oszlopnevekkel ("Játékos neve", "Kezdési idő", ...).
+#
+#   python synthetic_data.py minta --players 25 --weeks 10
+
+import argparse
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Oszlopnév → (átlag, szórás, egész?, terhelés?) – a terhelés jellegű mutatók meccsen nagyobbak
+METRICS = {
+    "Teljes táv [m]": (6000, 900, False, True),
+    "Táv/perc [m/min]": (70, 8, False, False),
+    "Táv zóna 4 [m]": (450, 120, False, True),
+    "Táv zóna 5 [m]": (150, 60, False, True),
+    "Sprint szám": (15, 6, True, True),
+    "Gyorsulások száma": (40, 10, True, True),
+    "Lassítások száma": (38, 10, True, True),
+    "Izomterhelés": (60, 12, False, True),
+    "Edzésterhelés": (250, 50, False, True),
+    "Max sebesség [km/h]": (29, 2.5, False, False),
+    "Átlagos pulzus [bpm]": (145, 12, True, False),
+    "HRV (RMSSD)": (55, 15, False, False),
+    "Sprintek száma": (12, 5, True, True),
+    "Zóna 5 gyorsulás": (8, 4, True, True),
+    "Zóna 5 lassulás": (8, 4, True, True),
+    "Zóna 5-6 táv": (300, 120, False, True),
+}
+# A v14 export régebbi oszlopnevei
+V14_NAMES = {
+    "Játékos neve": "Név",
+    "Teljes táv [m]": "Teljes táv (m)",
+    "Táv/perc [m/min]": "Táv/perc",
+    "Táv zóna 4 [m]": "Táv zóna 4 (m)",
+    "Táv zóna 5 [m]": "Táv zóna 5 (m)",
+    "Sprint szám": "Sprintek száma",
+    "Max sebesség [km/h]": "Max sebesség",
+}
+MATCH_FACTOR = 1.6
+SEASON_START = datetime(2025, 1, 6)
+
+
+def metric_names(count):
+    names = list(METRICS)[:count]
+    return names + [f"Mutató {i}" for i in range(len(names) + 1, count + 1)]
+
+
+def sheet_names(count, week=0):
+    # Az utolsó lap a meccs, a többi edzés; a lapnév a hetet is hordozza (a dashboardok a lapnévből képzik a hetet)
+    prefix = f"H{week + 1:02d}"
+    return [f"{prefix} Edzés {i}" for i in range(1, count)] + [f"{prefix} Meccs"]
+
+
+def generate_week(week, players, sheets=6, metrics=10, seed=0, schema="v13"):
+    # {lapnév: DataFrame} egy hétre; ugyanaz a seed + hét mindig ugyanazt adja
+    rng = np.random.default_rng([seed, week])
+    names = metric_names(metrics)
+    # Játékosonként állandó "képesség" – a játékosok között így valódi különbség van
+    ability = np.random.default_rng(seed).normal(1.0, 0.1, (len(players), len(names)))
+    week_start = SEASON_START + timedelta(weeks=week)
+
+    result = {}
+    for day, sheet in enumerate(sheet_names(sheets, week)):
+        is_match = sheet.endswith("Meccs")
+        frame = {
+            "Játékos neve": players,
+            "Kezdési idő": [week_start + timedelta(days=day, hours=10 if not is_match else 17)] * len(players),
+            "Időtartam": [f"{int(m) // 60:02d}:{int(m) % 60:02d}:00" for m in rng.normal(95 if is_match else 80, 10, len(players))],
+        }
+        for j, name in enumerate(names):
+            mean, sd, integer, load = METRICS.get(name, (100, 20, False, True))
+            factor = MATCH_FACTOR if is_match and load else 1.0
+            values = np.clip(rng.normal(mean * factor, sd, len(players)) * ability[:, j], 0, None)
+            frame[name] = values.round().astype(int) if integer else values.round(1)
+        df = pd.DataFrame(frame)
+        if schema == "v14":
+            df = df.rename(columns={old: new for old, new in V14_NAMES.items() if new not in df.columns})
+        result[sheet] = df
+    return result
+
+
+def write_workbook(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return path
+
+
+def generate_season(out_dir, players=25, weeks=10, sheets=6, metrics=10, seed=0, schema="v13", first_week=0):
+    # Hetente egy munkafüzet; visszaadja a fájlok listáját
+    os.makedirs(out_dir, exist_ok=True)
+    names = [f"Játékos {i + 1}" for i in range(players)]
+    return [
+        write_workbook(os.path.join(out_dir, f"het_{week + 1:03d}.xlsx"),
+                       generate_week(week, names, sheets, metrics, seed, schema))
+        for week in range(first_week, first_week + weeks)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Szintetikus heti edzésterhelés munkafüzetek.")
+    parser.add_argument("out", help="kimeneti könyvtár")
+    parser.add_argument("--players", type=int, default=25)
+    parser.add_argument("--weeks", type=int, default=10)
+    parser.add_argument("--sheets", type=int, default=6, help="lapok hetente (az utolsó a meccs)")
+    parser.add_argument("--metrics", type=int, default=10, help="mutató oszlopok száma")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--schema", choices=["v13", "v14"], default="v13", help="oszlopnevek generációja")
+    args = parser.parse_args(argv)
+
+    paths = generate_season(args.out, args.players, args.weeks, args.sheets, args.metrics, args.seed, args.schema)
+    print(f"{len(paths)} munkafüzet: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# A modulok a repó gyökerében vannak – a tesztek onnan importálnak
+import inspect
+import os
+import shutil
+import sys
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import season_store  # noqa: E402
+from ingest_cache import content_hash  # noqa: E402
+from synthetic_data import generate_week  # noqa: E402
+
+PLAYERS = [f"Játékos {i + 1}" for i in range(6)]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Üres, ideiglenes szezon tár; add(szezon, hetek) a szintetikus heteket munkafüzetenként tárolja
+    monkeypatch.setattr(season_store, "STORE_DIR", str(tmp_path))
+
+    def add(season, weeks, seed=7):
+        for week in weeks:
+            sheets = generate_week(week, PLAYERS, sheets=5, metrics=10, seed=seed)
+            assert season_store.add_workbook(season, content_hash(f"{seed}-{week}".encode()), f"het_{week + 1:03d}.xlsx", sheets)
+    return add
+
+
+PLAYER_COL = "Játékos neve"
+WEEKS = 8
+
+
+def assert_same(result, expected):
+    # Egy tábla vagy táblák sorozata (pl. pontszámok + heti változások)
+    if isinstance(expected, pd.DataFrame):
+        result, expected = [result], [expected]
+    for frame, full in zip(result, expected):
+        pd.testing.assert_frame_equal(frame, full, rtol=1e-9)
+
+
+@pytest.fixture
+def incremental(store, monkeypatch):
+    # Közös keret a tárolt állapotból folytató motorokhoz (acwr, anomalies): module.update(szezon,
+    # játékos oszlop) az eredmény, module.compute(..., state=None) a számolás, module._paths az állapot fájljai
+    def full(update):
+        store("teljes", range(WEEKS))
+        return update("teljes", PLAYER_COL)
+
+    def stepwise(module, update, steps, season="lepesenkent"):
+        # A hetek lépésenként (steps: hetek listái) kerülnek a tárba; visszaadja az utolsó eredményt
+        # és hívásonként, hogy a compute kapott-e tárolt állapotot
+        resumed = []
+        compute = module.compute
+
+        def spy(*args, **kwargs):
+            resumed.append(inspect.signature(compute).bind(*args, **kwargs).arguments.get("state") is not None)
+            return compute(*args, **kwargs)
+        monkeypatch.setattr(module, "compute", spy)
+        for weeks in steps:
+            store(season, weeks)
+            result = update(season, PLAYER_COL)
+        monkeypatch.setattr(module, "compute", compute)
+        return result, resumed
+
+    def interrupted(module, update, kept, season="felbeszakadt"):
+        # Az utolsó hét frissítése után a kept állapotfájlok (pl. a meta, a véglegesítés) visszaállnak
+        # az előző hétre – mintha a frissítés e fájlok kiírása előtt szakadt volna meg
+        store(season, range(WEEKS - 1))
+        update(season, PLAYER_COL)
+        paths = module._paths(season)
+        for name in kept:
+            shutil.copy(paths[name], paths[name] + ".mentes")
+        store(season, [WEEKS - 1])
+        update(season, PLAYER_COL)
+        for name in kept:
+            shutil.move(paths[name] + ".mentes", paths[name])
+        return update(season, PLAYER_COL)
+
+    return SimpleNamespace(full=full, stepwise=stepwise, interrupted=interrupted)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import acwr
+from acwr import ACUTE_DAYS, CHRONIC_DAYS, DATE, EWMA_RATIO, METRIC, PLAYER, RATIO, compute, daily_loads, update_season
+from conftest import PLAYER_COL, WEEKS, assert_same
+
+
+def _daily(loads):
+    # Egy nap × (játékos, mutató) tábla 2025-01-01-től; loads: játékos → napi terhelések
+    days = pd.date_range("2025-01-01", periods=len(next(iter(loads.values()))), freq="D", name=DATE)
+    columns = pd.MultiIndex.from_product([list(loads), ["Edzésterhelés"]], names=[PLAYER, METRIC])
+    return pd.DataFrame(np.column_stack(list(loads.values())).astype(np.float64), index=days, columns=columns)
+
+
+def test_known_28_day_series():
+    # 21 nap 100, majd 7 nap 200: a 28. napon akut 200, krónikus 125, arány 1,6
+    results, state = compute(_daily({"A": [100.0] * 21 + [200.0] * 7, "B": [0.0] * 28}))
+    a = ("A", "Edzésterhelés")
+    assert results["Akut"][a].iloc[ACUTE_DAYS - 1] == 100
+    assert results["Krónikus"][a].iloc[:CHRONIC_DAYS - 1].isna().all()
+    assert results["Akut"][a].iloc[-1] == 200 and results["Krónikus"][a].iloc[-1] == 125
+    assert results[RATIO][a].iloc[-1] == pytest.approx(1.6)
+    # EWMA (λ = 2 / (N + 1)) egy 100-as szintről 7 napja 200-ra ugrott terhelésen: 200 − 100·(1 − λ)^7
+    acute = 200 - 100 * (1 - 2 / (ACUTE_DAYS + 1)) ** 7
+    chronic = 200 - 100 * (1 - 2 / (CHRONIC_DAYS + 1)) ** 7
+    assert results["EWMA akut"][a].iloc[-1] == pytest.approx(acute)
+    assert results[EWMA_RATIO][a].iloc[-1] == pytest.approx(acute / chronic)
+    # Terhelés nélküli játékosnál nincs arány; az állapot az utolsó 27 nap
+    assert results[RATIO][("B", "Edzésterhelés")].isna().all()
+    assert len(state["tail"]) == CHRONIC_DAYS - 1 and state["last_date"] == pd.Timestamp("2025-01-28")
+
+
+def test_daily_loads_sum_sessions_and_fill_rest_days():
+    df = pd.DataFrame({
+        PLAYER_COL: ["A", "A", "A", None],
+        "Kezdési idő": ["2025-01-01 09:00", "2025-01-01 17:00", "2025-01-04 10:00", "2025-01-02 10:00"],
+        "Edzésterhelés": [100, 50, 80, 999],
+    })
+    daily = daily_loads(df, PLAYER_COL, ["Edzésterhelés"])
+    assert daily[("A", "Edzésterhelés")].tolist() == [150, 0, 0, 80]
+
+
+@pytest.mark.parametrize("steps", [[[week] for week in range(WEEKS)], [range(5), [5], [6, 7]]])
+def test_incremental_matches_full_recompute(incremental, steps):
+    full = incremental.full(update_season)
+    result, resumed = incremental.stepwise(acwr, update_season, steps)
+    assert resumed == [False] + [True] * (len(steps) - 1)
+    assert full[DATE].nunique() > CHRONIC_DAYS
+    assert_same(result, full)
+
+
+def test_interrupted_update_is_not_duplicated(incremental):
+    # A napi eredmény és az állapot már kiíródott, a meta (a véglegesítés) nem
+    full = incremental.full(update_season)
+    assert_same(incremental.interrupted(acwr, update_season, ["meta"]), full)
+
+
+def test_unchanged_store_returns_stored_result(store):
+    store("s", range(3))
+    first = update_season("s", PLAYER_COL)
+    pd.testing.assert_frame_equal(update_season("s", PLAYER_COL), first)
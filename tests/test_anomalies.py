@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import anomalies
+from anomalies import (CHANGE, KIND, MAD_SCALE, OUTLIER, ROBUST_Z, SPIKE, VALUE, WEEK_NO, Z, alerts, compute,
+                       session_table, update_anomalies, week_order)
+from conftest import PLAYER_COL, WEEKS, assert_same
+
+LOAD = "Edzésterhelés"
+SPEED = "Max sebesség [km/h]"
+
+
+@pytest.fixture
+def scored():
+    # Kézzel épített szezon egy játékossal: 0. hét 5 edzés + egy 300-as meccs, 1. hét 5 edzés,
+    # 2. hét három edzés (100, 150, 400). A sebesség (intenzitás) hetente átlagolódik
+    sessions = [(0, f"Edzés {i}", value) for i, value in enumerate([100, 102, 98, 101, 99])] + [(0, "Meccs", 300)]
+    sessions += [(1, f"Edzés {i}", value) for i, value in enumerate([100, 103, 97, 100, 100])]
+    sessions += [(2, f"Edzés {i}", value) for i, value in enumerate([100, 150, 400])]
+    df = pd.DataFrame({
+        PLAYER_COL: "A",
+        "Kezdési idő": pd.date_range("2025-01-06", periods=len(sessions), freq="D"),
+        "Forrás": [sheet for _, sheet, _ in sessions],
+        WEEK_NO: [week for week, _, _ in sessions],
+        LOAD: [value for _, _, value in sessions],
+        SPEED: [30.0] * 11 + [30.0, 30.0, 39.0],
+    })
+    wide, dates = session_table(df, PLAYER_COL, [LOAD, SPEED])
+    scores, weekly, _ = compute(wide, dates, {0: "H1", 1: "H2", 2: "H3"})
+    return scores, weekly
+
+
+def test_z_and_mad_against_the_previous_sessions(scored):
+    scores, _ = scored
+    load = scores[scores["Mutató"] == LOAD].set_index(VALUE)
+    # A 150 alapvonala az előző 11 edzés (a meccs nélkül): átlag 100, szórás √2,8, medián 100, MAD 1
+    assert load.loc[150, Z] == pytest.approx(50 / np.sqrt(2.8))
+    assert load.loc[150, ROBUST_Z] == pytest.approx(MAD_SCALE * 50)
+    # Kevesebb mint MIN_BASELINE előzmény: nincs pontszám; a meccs saját (üres) alapvonalat kap
+    assert load.loc[[102, 98], Z].isna().all() and np.isnan(load.loc[300, Z])
+    # Állandó sebességnél a szórás és a MAD 0 – nincs pontszám
+    assert scores.loc[scores["Mutató"] == SPEED, [Z, ROBUST_Z]].isna().all().all()
+
+
+def test_weekly_change_sums_loads_and_averages_intensity(scored):
+    _, weekly = scored
+    change = weekly.set_index([WEEK_NO, "Mutató"])[CHANGE]
+    assert change[(1, LOAD)] == pytest.approx(-37.5)
+    assert change[(2, LOAD)] == pytest.approx(30.0)
+    assert change[(2, SPEED)] == pytest.approx(10.0)
+    assert np.isnan(change[(0, LOAD)])
+
+
+def test_alert_thresholds(scored):
+    scores, weekly = scored
+    table = alerts(scores, weekly)
+    assert sorted(table.loc[table[KIND] == OUTLIER, VALUE]) == [150, 400]
+    # A heti ugrás küszöbe ≥: a pontosan 30%-os növekedés jelez, a 10%-os sebesség nem
+    spikes = table[table[KIND] == SPIKE]
+    assert spikes["Mutató"].tolist() == [LOAD] and spikes["Súlyosság"].iloc[0] == pytest.approx(1.0)
+    assert table["Súlyosság"].is_monotonic_decreasing
+    # Magasabb küszöbökkel a 150 (z ≈ 29,9, robusztus z ≈ 33,7) és a heti ugrás kiesik
+    table = alerts(scores, weekly, z_limit=30, mad_limit=34, spike_pct=31)
+    assert table[VALUE].tolist() == [400]
+
+
+def test_week_order_follows_first_session():
+    starts = [pd.Timestamp("2025-01-13"), pd.NaT, pd.Timestamp("2025-01-06"), pd.Timestamp("2025-01-13")]
+    assert week_order(starts) == [2, 0, 1, 3]
+
+
+@pytest.mark.parametrize("steps", [[[week] for week in range(WEEKS)], [range(6), [6, 7]], [range(2), range(2, 5), range(5, 8)]])
+def test_incremental_matches_full_recompute(incremental, steps):
+    # A tárolt ablakból (utolsó foglalkozások, előző heti érték) folytatva ugyanazok a pontszámok
+    # és heti változások jönnek ki, mint egyben újraszámolva
+    full = incremental.full(update_anomalies)
+    result, resumed = incremental.stepwise(anomalies, update_anomalies, steps)
+    assert resumed == [False] + [True] * (len(steps) - 1)
+    # Több hét kell, mint az alapablak, hogy az állapotból áthozott ablak is számítson
+    assert full[0][WEEK_NO].nunique() == WEEKS and len(full[1])
+    assert_same(result, full)
+
+
+@pytest.mark.parametrize("kept", [["meta"], ["meta", "tail", "last_week"]])
+def test_interrupted_update_is_not_duplicated(incremental, kept):
+    # A pontszámok (és esetleg az állapot) már kiíródtak, a meta nem: az újrafuttatás nem
+    # duplikál és nem az előrefutott állapotból folytat
+    full = incremental.full(update_anomalies)
+    assert_same(incremental.interrupted(anomalies, update_anomalies, kept), full)
+
+
+def test_weeks_uploaded_out_of_order_are_scored_in_calendar_order(incremental):
+    # Egy utólag feltöltött korábbi hét a naptári helyére kerül: ugyanaz jön ki, mint sorrendben
+    # feltöltve, és a tárolt állapot helyett teljes újraszámolás indul
+    full = incremental.full(update_anomalies)
+    result, resumed = incremental.stepwise(anomalies, update_anomalies, [[0, 1, 3], [2], [4, 5], [7], [6]])
+    assert resumed == [False, False, True, True, False]
+    assert_same(result, full)
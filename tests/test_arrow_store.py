@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from aggregation import build_cube, slice_cube, store_cube, tag_weeks
+from arrow_store import load, load_season, scan, unique_values
+from conftest import PLAYERS
+from schema import metric_columns
+from season_store import season_sheets
+
+
+@pytest.fixture
+def season(store):
+    store("s", range(3))
+    return "s"
+
+
+def test_week_filter_reads_only_the_selected_workbooks(season):
+    df = load(season, weeks=[2])
+    assert set(df["Forrás"]) == {sheet for sheet in season_sheets(season) if sheet.startswith("H02")}
+    assert len(df) == len(PLAYERS) * 5
+
+
+def test_source_and_type_filters(season):
+    full = load_season(season)
+    sources = ["H01 Edzés 2", "H03 Meccs"]
+    pd.testing.assert_frame_equal(load(season, sources=sources),
+                                  full[full["Forrás"].isin(sources)].reset_index(drop=True), check_dtype=False)
+    assert set(load(season, tipus="Meccs")["Forrás"]) == {"H01 Meccs", "H02 Meccs", "H03 Meccs"}
+    assert not load(season, tipus="Edzés")["Forrás"].str.contains("Meccs").any()
+
+
+def test_player_filter_and_column_projection(season):
+    df = load(season, players=PLAYERS[:2], columns=["Játékos neve", "Edzésterhelés", "nincs ilyen"])
+    assert list(df.columns) == ["Játékos neve", "Edzésterhelés"]
+    assert set(df["Játékos neve"]) == set(PLAYERS[:2]) and len(df) == 2 * 3 * 5
+
+
+def test_empty_player_list_selects_nothing(season):
+    # Az üres lista null típusú halmaz lenne – a mező típusára kell hozni (41b2bf0)
+    table = scan(season, players=[], columns=["Játékos neve", "Edzésterhelés"])
+    assert table.num_rows == 0 and table.column_names == ["Játékos neve", "Edzésterhelés"]
+
+
+def test_unique_values_in_load_order(season):
+    assert unique_values(season, "Játékos neve") == PLAYERS
+
+
+def test_store_cube_matches_cube_of_loaded_rows(season):
+    df = load_season(season)
+    metrics = metric_columns(df.columns)
+    cube = build_cube(tag_weeks(df), metrics)
+    pd.testing.assert_frame_equal(store_cube(season, metrics), cube, check_dtype=False)
+    weeks = season_sheets(season)[3:7]
+    pd.testing.assert_frame_equal(store_cube(season, metrics, sources=weeks), slice_cube(cube, weeks=weeks),
+                                  check_dtype=False)
+    assert store_cube(season, metrics, players=[]).empty
+
+
+def test_store_cube_merges_sheets_shared_by_workbooks(store):
+    # Azonos lapnevek több munkafüzetben: a részkockák összevonódnak, mint a teljes táblán
+    store("s", range(2))
+    store("s", range(2), seed=8)
+    df = load_season("s")
+    metrics = metric_columns(df.columns)
+    pd.testing.assert_frame_equal(store_cube("s", metrics), build_cube(tag_weeks(df), metrics), check_dtype=False)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from aggregation import build_cube, tag_weeks
+from compact import compact_frame
+from conftest import PLAYERS
+from synthetic_data import generate_week
+
+
+def _frame():
+    sheets = generate_week(0, PLAYERS, sheets=4, metrics=10, seed=3)
+    df = pd.concat([sheet.assign(**{"Forrás": name}) for name, sheet in sheets.items()], ignore_index=True)
+    # Kis egész értékek (int8-ba is beférnének) és egy lebegőpontos, float32-ben pontos oszlop
+    df["Ugrások"] = np.arange(len(df)) % 100
+    df["Fél"] = np.arange(len(df)) / 2
+    return df
+
+
+def test_values_round_trip_exactly():
+    df = _frame()
+    compact, before, after = compact_frame(df)
+    assert after < before
+    for col in df.select_dtypes(include="number").columns:
+        assert compact[col].dtype.itemsize >= 4
+        np.testing.assert_array_equal(compact[col].to_numpy(dtype=np.float64), df[col].to_numpy(dtype=np.float64))
+
+
+def test_arithmetic_does_not_overflow():
+    df = _frame()
+    compact = compact_frame(df)[0]
+    for col in ["Ugrások", "Sprint szám"]:
+        for op in (lambda s: s * 100, lambda s: s.diff(), lambda s: s.cumsum() * 1000):
+            np.testing.assert_array_equal(op(compact[col]).to_numpy(dtype=np.float64), op(df[col]).to_numpy(dtype=np.float64))
+
+
+def test_aggregates_match_uncompacted_frame():
+    df = _frame()
+    metrics = ["Ugrások", "Fél", "Sprint szám", "Teljes táv [m]", "Edzésterhelés"]
+    cube = build_cube(tag_weeks(df.copy()), metrics)
+    compact_cube = build_cube(tag_weeks(compact_frame(df)[0]), metrics)
+    # A kulcsok kategóriák lettek – az értékek és a sorrend ugyanaz
+    assert list(compact_cube.index) == list(cube.index) and compact_cube.columns.equals(cube.columns)
+    np.testing.assert_allclose(compact_cube.to_numpy(dtype=np.float64), cube.to_numpy(dtype=np.float64), rtol=1e-6)
+    pd.testing.assert_series_equal(compact_frame(df)[0][metrics].sum().astype(np.float64), df[metrics].sum().astype(np.float64), rtol=1e-6)
@@ -0,0 +1,25 @@
+import plotly.graph_objects as go
+
+from figure_cache import figure_size
+from shared_cache import LRUCache
+
+
+def _figure(points):
+    return go.Figure(go.Scatter(x=list(range(points)), y=list(range(points))))
+
+
+def test_figures_sized_by_serialized_bytes():
+    small, large = _figure(10), _figure(10_000)
+    assert figure_size(small) == len(small.to_json().encode())
+    assert figure_size(large) > 10 * figure_size(small)
+    # A munkamenet-ábra (ábra, összes, elküldött) hármasként tárolódik
+    assert figure_size((small, 5, 3)) >= figure_size(small)
+
+
+def test_byte_budget_evicts_large_figures():
+    small = _figure(10)
+    cache = LRUCache(3 * figure_size(small), sizeof=figure_size)
+    cache.put("a", small)
+    cache.put("b", _figure(10_000))
+    stats = cache.stats()
+    assert cache.get("b") is None and stats["bytes"] <= stats["max_bytes"]
@@ -0,0 +1,33 @@
+import openpyxl
+import pandas as pd
+import pytest
+
+import ingest_cache
+from ingest import iter_workbook, read_workbooks
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    # Egy lap vegyes típusú oszloppal (szám + szöveg), üres ideiglenes cache
+    monkeypatch.setattr(ingest_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Edzés 1"
+    for row in [("Név", "Táv", "Megjegyzés"), ("A", 12, "ok"), ("B", "n/a", None), ("C", None, "x")]:
+        ws.append(row)
+    path = tmp_path / "het.xlsx"
+    wb.save(path)
+    return path
+
+
+def test_mixed_column_is_the_same_fresh_and_cached(workbook):
+    fresh = read_workbooks([workbook], workers=1)[0]
+    cached = read_workbooks([workbook], workers=1)[0]
+    assert fresh["Edzés 1"]["Táv"].tolist()[:2] == ["12", "n/a"]
+    pd.testing.assert_frame_equal(cached["Edzés 1"], fresh["Edzés 1"])
+
+
+def test_iter_workbook_fresh_and_cached(workbook):
+    fresh = {name: df for name, df, _ in iter_workbook(workbook.read_bytes(), workers=1)}
+    cached = {name: df for name, df, _ in iter_workbook(workbook.read_bytes(), workers=1)}
+    pd.testing.assert_frame_equal(cached["Edzés 1"], fresh["Edzés 1"])
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from normalization import SCALE_MODES, scale_matrix
+
+METRICS = ["Teljes táv [m]", "Edzésterhelés"]
+
+
+@pytest.mark.parametrize("mode", list(SCALE_MODES))
+def test_empty_selection(mode):
+    # Egy játékos / hét sincs kijelölve: üres, de hibátlan eredmény
+    empty = pd.DataFrame(columns=METRICS, dtype=np.float64)
+    references = pd.DataFrame([[5000.0, 300.0]], index=["Csapatátlag"], columns=METRICS)
+    scaled, scaled_refs = scale_matrix(empty, mode, benchmark=dict(zip(METRICS, [6000.0, 400.0])), extra=references)
+    assert scaled.shape == (0, len(METRICS))
+    assert list(scaled_refs.index) == ["Csapatátlag"]
+
+
+def test_minmax_range():
+    matrix = pd.DataFrame({"a": [1.0, 3.0, 2.0], "b": [5.0, 5.0, np.nan]}, index=["x", "y", "z"])
+    scaled, _ = scale_matrix(matrix, "minmax")
+    assert scaled["a"].tolist() == [0.0, 1.0, 0.5]
+    assert scaled["b"].tolist()[:2] == [0.0, 0.0] and np.isnan(scaled.loc["z", "b"])
@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from shared_cache import LRUCache
+
+
+def test_key_locks_released_on_hit_and_error():
+    cache = LRUCache(1 << 20)
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.get_or_compute("a", lambda: 2) == 1
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("b", lambda: (_ for _ in ()).throw(RuntimeError("hiba")))
+    assert cache._key_locks == {}
+
+
+def test_concurrent_requests_compute_once():
+    cache = LRUCache(1 << 20)
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.wait(1)
+        return "kész"
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=("k", compute)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert cache._key_locks == {}
@@ -0,0 +1,150 @@
+# ========== IDŐPONT ÉS IDŐTARTAM FELDOLGOZÁS ==========
+# A "Kezdési idő" és "Időtartam" cellák formátumát fájlonként egyszer, egy kis mintán
+# ismerjük fel, utána az egész oszlop explicit, gyors úton konvertálódik (nincs elemenkénti
+# formátumkitalálás). Ami a felismert formátumba nem illik, az általános úton megy át.
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_SIZE = 20
+# A gyártói exportokban előforduló időbélyeg formátumok, a gyakoribbak elöl
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y.%m.%d %H:%M:%S",
+    "%Y.%m.%d %H:%M",
+    "%Y. %m. %d. %H:%M:%S",
+    "%Y. %m. %d. %H:%M",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%Y-%m-%d",
+]
+# Excel sorszámú dátum / nap-tört időtartam
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+NATIVE = "native"
+TIME = "time"
+HMS = "hh:mm:ss"
+SERIAL = "serial"
+
+
+def _sample(values):
+    sample = []
+    for value in values:
+        if value is not None and value == value and value != "":
+            sample.append(value)
+            if len(sample) == SAMPLE_SIZE:
+                break
+    return sample
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+def detect_datetime_format(values):
+    # NATIVE (datetime cellák), SERIAL (Excel sorszám), egy strptime formátum, vagy None
+    sample = _sample(values)
+    if not sample:
+        return None
+    if all(isinstance(value, (dt.datetime, pd.Timestamp)) for value in sample):
+        return NATIVE
+    if all(_is_number(value) for value in sample):
+        return SERIAL
+    if all(isinstance(value, str) for value in sample):
+        for fmt in DATETIME_FORMATS:
+            try:
+                for value in sample:
+                    dt.datetime.strptime(value.strip(), fmt)
+            except ValueError:
+                continue
+            return fmt
+    return None
+
+
+def detect_duration_format(values):
+    # NATIVE (timedelta), TIME (datetime.time cellák), HMS ("01:30:00"), SERIAL (nap-tört), vagy None
+    sample = _sample(values)
+    if not sample:
+        return None
+    if all(isinstance(value, (dt.timedelta, pd.Timedelta)) for value in sample):
+        return NATIVE
+    if all(isinstance(value, dt.time) for value in sample):
+        return TIME
+    if all(_is_number(value) for value in sample):
+        return SERIAL
+    if all(isinstance(value, str) and len(value) == 8 and value[2] == value[5] == ":" for value in sample):
+        return HMS
+    return None
+
+
+def _generic_datetimes(series):
+    return pd.to_datetime(series, errors="coerce")
+
+
+def _generic_durations(series):
+    # openpyxl: "01:30:00" szöveg, datetime.time vagy timedelta – szövegként mind értelmezhető
+    return pd.to_timedelta(series.where(series.isna(), series.astype(str)), errors="coerce")
+
+
+def _fill_failed(result, series, generic):
+    # A felismert formátumba nem illő, de nem üres cellák az általános úton
+    failed = result.isna() & series.notna() & (series != "")
+    if failed.any():
+        result = result.copy()
+        result[failed] = generic(series[failed])
+    return result
+
+
+def parse_datetimes(values, fmt=None):
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if fmt is None:
+        return _generic_datetimes(series)
+    if fmt == NATIVE:
+        result = pd.to_datetime(series, errors="coerce")
+    elif fmt == SERIAL:
+        days = pd.to_numeric(series, errors="coerce")
+        # A lebegőpontos nap-tört miatt ezredmásodpercre kerekítve
+        result = (EXCEL_EPOCH + pd.to_timedelta(days, unit="D").dt.round("ms")).astype("datetime64[us]")
+    else:
+        result = pd.to_datetime(series, format=fmt, errors="coerce")
+    return _fill_failed(result, series, _generic_datetimes)
+
+
+def _hms_seconds(series):
+    # Fix szélességű "HH:MM:SS" szöveg → másodperc a karakterkódokból, NumPy-jal
+    text = np.array([value if isinstance(value, str) and len(value) == 8 else "" for value in series], dtype="U8")
+    codes = text.view(np.uint32).reshape(len(text), 8).astype(np.int64) - ord("0")
+    digits = codes[:, [0, 1, 3, 4, 6, 7]]
+    ok = ((digits >= 0) & (digits <= 9)).all(axis=1) & (codes[:, 2] == ord(":") - ord("0")) \
+        & (codes[:, 5] == ord(":") - ord("0"))
+    seconds = (digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 2] * 10 + digits[:, 3]) * 60 \
+        + digits[:, 4] * 10 + digits[:, 5]
+    return np.where(ok, seconds, np.nan)
+
+
+def parse_durations(values, fmt=None):
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_timedelta64_dtype(series):
+        return series
+    if fmt is None:
+        return _generic_durations(series)
+    if fmt == NATIVE:
+        result = pd.to_timedelta(series, errors="coerce")
+    elif fmt == TIME:
+        seconds = [value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6
+                   if isinstance(value, dt.time) else np.nan for value in series]
+        result = pd.to_timedelta(pd.Series(seconds, index=series.index), unit="s")
+    elif fmt == SERIAL:
+        result = pd.to_timedelta(pd.to_numeric(series, errors="coerce"), unit="D").dt.round("ms")
+    else:
+        result = pd.to_timedelta(pd.Series(_hms_seconds(series), index=series.index), unit="s")
+    # Egységes felbontás, mint az időpontoknál
+    return _fill_failed(result.astype("timedelta64[us]"), series, _generic_durations)